@@ -18,7 +18,12 @@ export const API_ENDPOINTS = {
   // Paginated endpoints
   ALL_EVENTS: '/api/events/',
   ALL_EVENTS_CHART: '/api/events/chart/',
+  EVENT_MINIMAP: '/api/events/minimap/',
+  EVENT_MINIMAP_DETAIL: '/api/events/minimap/detail/',
+  FIRST_TOUCHPOINTS: '/api/events/first-touchpoints/',
   ALL_PEOPLE: '/api/people/',
+  EVENT_CHANGES: '/api/events/changes/',
+  EVENT_STREAM: '/api/events/stream/',
 } as const;
 
 // Default values from the actual data
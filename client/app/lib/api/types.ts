@@ -49,12 +49,23 @@ export interface DashboardStats {
   };
 }
 
+// Time bucketing (bucket / tz / split_by query parameters)
+export type BucketUnit = 'hour' | 'day' | 'week' | 'month';
+
+export interface BucketInfo {
+  unit: BucketUnit;
+  timezone: string;
+  split_by: 'direction' | 'channel' | 'status' | null;
+}
+
 // Activity Timeline Types
 export interface ActivityTimeline {
   timeline: Array<{
     day: string;
     count: number;
+    series?: Record<string, number>;
   }>;
+  bucket: BucketInfo;
   date_range: {
     start: string;
     end: string;
@@ -125,6 +136,18 @@ export interface PaginatedEventsResponse {
 export interface AllPersonsResponse {
   results: Person[];
   count: number;
+  page_size: number;
+  has_next: boolean;
+  next_cursor: string | null;
+}
+
+// Request parameters for the keyset-paginated people directory
+export interface AllPersonsParams {
+  customer_org_id: string;
+  q?: string;
+  cursor?: string;
+  page_size?: number;
+  fields?: string;
 }
 
 // Request parameters for paginated events
@@ -148,10 +171,64 @@ export interface ChartEventsResponse {
   daily_counts: Array<{
     date: string;
     count: number;
+    series?: Record<string, number>;
   }>;
+  bucket: BucketInfo;
   total_count: number;
   date_range: {
     start: string | null;
     end: string | null;
   };
-}
\ No newline at end of file
+}
+
+// Minimap (/api/events/minimap/ and /api/events/minimap/detail/)
+export interface MinimapResponse {
+  level: BucketUnit | null;
+  width: number;
+  source_points: number;
+  total_count: number;
+  range: {
+    start: string | null;
+    end: string | null;
+  };
+  points: Array<{
+    date: string;
+    count: number;
+  }>;
+}
+
+// First touchpoints (/api/events/first-touchpoints/)
+export interface FirstTouchpoint {
+  person_id: string;
+  event_id: number;
+  timestamp: string;
+  channel: string;
+}
+
+export interface FirstTouchpointsResponse {
+  customer_org_id: string;
+  account_id: string;
+  count: number;
+  results: FirstTouchpoint[];
+}
+
+// Delta sync (/api/events/changes/)
+export interface EventTombstone {
+  id: number;
+  touchpoint_id: string;
+  change_seq: number;
+}
+
+export interface EventChangesResponse {
+  changes: Array<ActivityEvent & { change_seq: number }>;
+  tombstones: EventTombstone[];
+  watermark: number;
+  has_more: boolean;
+}
+
+export interface EventChangesParams {
+  customer_org_id: string;
+  account_id: string;
+  since?: number;
+  limit?: number;
+}
@@ -0,0 +1,133 @@
+"""Cold-tier storage for archived ``ActivityEvent`` partitions.
+
+Each archive run writes one zstd-compressed Parquet file per month under
+``EVENT_ARCHIVE_DIR/<YYYY-MM>/``. Parquet is columnar, so the aggregate queries
+in ``api.partitions`` read only the handful of columns they group by and skip
+row groups whose org/timestamp statistics cannot match.
+
+Requires the ``pyarrow`` package; it is imported lazily so the hot path does
+not pay for it until an archived partition is actually read.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .models import ActivityEvent
+
+JSON_FIELDS = ("people", "involved_team_ids", "related_opportunity_ids")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:  # pragma: no cover -- optional dependency
+        raise ImproperlyConfigured(
+            "Archived event partitions require the 'pyarrow' package."
+        ) from exc
+    return pyarrow
+
+
+def schema():
+    pa = _pyarrow()
+    fields = []
+    for field in ActivityEvent._meta.concrete_fields:
+        if field.name == "timestamp":
+            fields.append(pa.field(field.name, pa.timestamp("ms", tz="UTC")))
+        elif field.name == "partition_month":
+            fields.append(pa.field(field.name, pa.date32()))
+        elif field.get_internal_type() in ("BigAutoField", "BigIntegerField"):
+            fields.append(pa.field(field.name, pa.int64()))
+        else:
+            # Char/Text columns, plus JSON columns stored as JSON text.
+            fields.append(pa.field(field.name, pa.string()))
+    return pa.schema(fields)
+
+
+def month_dir(month):
+    return Path(settings.EVENT_ARCHIVE_DIR) / f"{month:%Y-%m}"
+
+
+def files_for(month):
+    directory = month_dir(month)
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob("*.parquet"))
+
+
+def write_partition(month, rows, row_group_size):
+    """Write ``rows`` (dicts from ``.values()``) for ``month`` to a new file.
+
+    Rows are buffered into row groups of ``row_group_size`` so memory stays
+    bounded. The file is written under a temporary name and renamed into place
+    only once complete. Returns ``(path, row_count)``.
+    """
+    pa = _pyarrow()
+    arrow_schema = schema()
+    directory = month_dir(month)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"part-{len(files_for(month)):05d}.parquet"
+    tmp_path = path.with_suffix(".parquet.tmp")
+
+    count = 0
+    buffer = []
+    with pa.parquet.ParquetWriter(tmp_path, arrow_schema, compression="zstd") as writer:
+        for row in rows:
+            for name in JSON_FIELDS:
+                row[name] = json.dumps(row[name])
+            buffer.append(row)
+            if len(buffer) >= row_group_size:
+                writer.write_table(pa.Table.from_pylist(buffer, schema=arrow_schema))
+                count += len(buffer)
+                buffer.clear()
+        if buffer:
+            writer.write_table(pa.Table.from_pylist(buffer, schema=arrow_schema))
+            count += len(buffer)
+
+    os.replace(tmp_path, path)
+    return path, count
+
+
+def count_rows(path):
+    pa = _pyarrow()
+    return pa.parquet.ParquetFile(path).metadata.num_rows
+
+
+def read(month, columns, filters):
+    """Read ``columns`` of an archived month as a single ``pyarrow.Table``.
+
+    ``filters`` uses the pyarrow DNF filter syntax, e.g.
+    ``[("customer_org_id", "=", org_id)]``.
+    """
+    pa = _pyarrow()
+    tables = [
+        pa.parquet.read_table(path, columns=list(columns), filters=filters)
+        for path in files_for(month)
+    ]
+    if not tables:
+        return schema().empty_table().select(list(columns))
+    return pa.concat_tables(tables)
+
+
+def scan(month, columns, filters, batch_size):
+    """Yield ``pyarrow.RecordBatch`` es of ``columns`` matching ``filters``.
+
+    Streaming counterpart of ``read``: at most one batch per file is held in
+    memory, and row groups that cannot match are skipped.
+    """
+    pa = _pyarrow()
+    import pyarrow.dataset
+
+    paths = files_for(month)
+    if not paths:
+        return
+    dataset = pa.dataset.dataset([str(path) for path in paths], schema=schema(), format="parquet")
+    yield from dataset.to_batches(
+        columns=list(columns),
+        filter=pa.parquet.filters_to_expression(filters),
+        batch_size=batch_size,
+    )
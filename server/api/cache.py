@@ -0,0 +1,135 @@
+"""Response caching keyed by organisation data version.
+
+``cached_response`` stores the JSON body of a successful response together with
+its compressed variants, so a hot response is serialized once and compressed
+once per encoding instead of on every hit. Entries are keyed by the view, the
+normalized query string and the organisation's ``OrgDataVersion``; ingesting
+data bumps the version and thereby retires every stale entry at once.
+"""
+
+import hashlib
+from functools import partial, wraps
+
+from django.core.cache import caches
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponse, QueryDict
+from django.utils.cache import patch_vary_headers
+
+from . import compression
+from .models import OrgDataVersion
+
+
+def data_version(customer_org_id):
+    """Return the current data version of an organisation (0 if never bumped)."""
+    return (
+        OrgDataVersion.objects.filter(customer_org_id=customer_org_id)
+        .values_list("version", flat=True)
+        .first()
+        or 0
+    )
+
+
+def bump_data_version(customer_org_id):
+    """Invalidate every cached response of an organisation.
+
+    Inside a transaction the bump waits for the commit: bumping earlier would
+    let a concurrent request cache the old rows under the new version.
+    """
+    transaction.on_commit(partial(_bump, customer_org_id))
+
+
+def _bump(customer_org_id):
+    if not OrgDataVersion.objects.filter(customer_org_id=customer_org_id).update(
+        version=F("version") + 1
+    ):
+        _, created = OrgDataVersion.objects.get_or_create(
+            customer_org_id=customer_org_id, defaults={"version": 1}
+        )
+        if not created:
+            OrgDataVersion.objects.filter(customer_org_id=customer_org_id).update(
+                version=F("version") + 1
+            )
+
+
+def cache_key(view_name, customer_org_id, version, params):
+    """Build the cache key for a view invocation.
+
+    ``params`` is a ``QueryDict``; keys and repeated values are sorted so that
+    equivalent query strings share an entry.
+    """
+    normalized = "&".join(
+        f"{key}={value}" for key in sorted(params) for value in sorted(params.getlist(key))
+    )
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+    return f"api:{view_name}:{customer_org_id}:{version}:{digest}"
+
+
+def response_cache():
+    return caches[settings.API_RESPONSE_CACHE_ALIAS]
+
+
+def prime(view_name, customer_org_id, version, params, content,
+          content_type="application/json"):
+    """Store ``content`` as ``view_name``'s 200 response to ``params``.
+
+    ``version`` must be the data version read before ``content`` was computed,
+    so that a write landing meanwhile retires the entry. The entry holds every
+    supported encoding up front, as ``cached_response`` would after one request
+    per encoding.
+    """
+    query = QueryDict(mutable=True)
+    query.update(params)
+    key = cache_key(view_name, customer_org_id, version, query)
+    entry = {"content_type": content_type, "identity": content}
+    for encoding in compression.SUPPORTED_ENCODINGS:
+        entry[encoding] = compression.compress(content, encoding)
+    response_cache().set(key, entry, settings.API_RESPONSE_CACHE_TIMEOUT)
+
+
+def cached_response(view):
+    """Cache a GET view's 200 responses and their compressed encodings.
+
+    The view must take ``customer_org_id`` from the query string; requests
+    without it (which the view rejects anyway) bypass the cache.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        customer_org_id = request.GET.get("customer_org_id")
+        if request.method != "GET" or not customer_org_id:
+            return view(request, *args, **kwargs)
+
+        cache = response_cache()
+        key = cache_key(
+            view.__name__, customer_org_id, data_version(customer_org_id), request.GET
+        )
+        entry = cache.get(key)
+        hit = entry is not None
+        dirty = not hit
+        if not hit:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            entry = {"content_type": response["Content-Type"], "identity": response.content}
+
+        encoding = compression.negotiate(
+            request.headers.get("Accept-Encoding"), len(entry["identity"])
+        )
+        if encoding is not None and encoding not in entry:
+            # First request for this encoding: compress once, keep it.
+            entry[encoding] = compression.compress(entry["identity"], encoding)
+            dirty = True
+        if dirty:
+            cache.set(key, entry, settings.API_RESPONSE_CACHE_TIMEOUT)
+
+        body = entry[encoding] if encoding is not None else entry["identity"]
+        response = HttpResponse(body, content_type=entry["content_type"])
+        if encoding is not None:
+            response["Content-Encoding"] = encoding
+        response["X-Response-Cache"] = "HIT" if hit else "MISS"
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+    return wrapper
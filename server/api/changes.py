@@ -0,0 +1,67 @@
+"""Per-account change sequence used by ``/api/events/changes/``.
+
+Every insert, update or delete of an ``ActivityEvent`` takes the next number
+from its account's ``AccountChangeSequence`` counter: inserts and updates store
+it on ``ActivityEvent.change_seq``, deletes on an ``ActivityEventTombstone``.
+A client that remembers the highest number it has seen (its watermark) can then
+ask for exactly the rows that changed since.
+
+Numbers must become visible in order, otherwise a client could advance its
+watermark past a row that has not committed yet. Allocation therefore starts
+with an ``UPDATE`` of the counter row, which holds the row (Postgres) or the
+database (SQLite) write lock until the surrounding transaction commits. Callers
+must allocate inside the same ``transaction.atomic()`` block that writes the
+rows; ``ActivityEvent.save`` wraps itself in one for the ``pre_save`` stamp.
+The organisation's data version is bumped once that block commits.
+
+``QuerySet.update()`` bypasses model signals and so does not bump
+``change_seq``; use ``save()`` or ``stamp()`` + ``bulk_update()`` instead.
+"""
+
+from collections import defaultdict
+
+from django.db.models import F
+
+from .cache import bump_data_version
+from .models import AccountChangeSequence, ActivityEventTombstone
+
+
+def allocate(customer_org_id, account_id, count=1):
+    """Reserve ``count`` consecutive sequence numbers and return the first."""
+    counter = AccountChangeSequence.objects.filter(
+        customer_org_id=customer_org_id, account_id=account_id
+    )
+    if not counter.update(last_seq=F("last_seq") + count):
+        AccountChangeSequence.objects.get_or_create(
+            customer_org_id=customer_org_id, account_id=account_id
+        )
+        counter.update(last_seq=F("last_seq") + count)
+    return counter.values_list("last_seq", flat=True).get() - count + 1
+
+
+def stamp(events):
+    """Assign fresh ``change_seq`` values to unsaved or modified events."""
+    grouped = defaultdict(list)
+    for event in events:
+        grouped[(event.customer_org_id, event.account_id)].append(event)
+    for (customer_org_id, account_id), group in grouped.items():
+        seq = allocate(customer_org_id, account_id, len(group))
+        for event in group:
+            event.change_seq = seq
+            seq += 1
+    # Every change also retires the organisation's cached responses.
+    for customer_org_id in {org_id for org_id, _ in grouped}:
+        bump_data_version(customer_org_id)
+    return events
+
+
+def record_deletion(event):
+    """Write the tombstone for a deleted event."""
+    bump_data_version(event.customer_org_id)
+    return ActivityEventTombstone.objects.create(
+        customer_org_id=event.customer_org_id,
+        account_id=event.account_id,
+        touchpoint_id=event.touchpoint_id,
+        event_id=event.pk,
+        change_seq=allocate(event.customer_org_id, event.account_id),
+    )
@@ -0,0 +1,61 @@
+"""Content-Encoding negotiation and compression for API responses.
+
+gzip is always available; brotli is used when the optional ``brotli`` package
+is installed. Bodies smaller than ``API_COMPRESSION_MIN_BYTES`` are sent as-is:
+below roughly one MTU compression saves no round trips and only costs CPU.
+"""
+
+import gzip
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover -- optional dependency
+    brotli = None
+
+# Preference order when the client accepts several encodings equally.
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def parse_accept_encoding(header):
+    """Return ``{coding: q}`` for an ``Accept-Encoding`` header value."""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(header, size):
+    """Pick the encoding for a ``size``-byte body, or ``None`` for identity."""
+    if size < settings.API_COMPRESSION_MIN_BYTES:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, encoding):
+    """Compress ``body`` with ``encoding`` at the configured level."""
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.API_COMPRESSION_BROTLI_QUALITY)
+    if encoding == "gzip":
+        # mtime=0 keeps the output deterministic so cached bodies are stable.
+        return gzip.compress(body, compresslevel=settings.API_COMPRESSION_GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
@@ -0,0 +1,56 @@
+"""Normalized, indexed tables derived from ActivityEvent's JSON list columns.
+
+The JSON columns stay the source of truth; the tables here are rebuilt from
+them whenever an event is written, so filters and breakdowns can use plain
+B-tree indexes instead of scanning JSON on every row.
+
+* ``EventTeam`` - one row per entry in ``involved_team_ids``.
+* ``EventOpportunity`` - one row per entry in ``related_opportunity_ids``.
+"""
+
+from .models import EventOpportunity, EventTeam
+
+
+def team_rows(event):
+    return [
+        EventTeam(
+            event_id=event.pk,
+            team_id=team_id,
+            customer_org_id=event.customer_org_id,
+            account_id=event.account_id,
+            timestamp=event.timestamp,
+            channel=event.channel,
+        )
+        for team_id in dict.fromkeys(event.involved_team_ids or [])
+    ]
+
+
+def opportunity_rows(event):
+    return [
+        EventOpportunity(
+            event_id=event.pk,
+            opportunity_id=opportunity_id,
+            customer_org_id=event.customer_org_id,
+            timestamp=event.timestamp,
+            channel=event.channel,
+        )
+        for opportunity_id in dict.fromkeys(event.related_opportunity_ids or [])
+    ]
+
+
+def sync(events, replace=True):
+    """Rebuild the dimension rows of saved ``events``.
+
+    ``replace=False`` skips deleting existing rows, for events that are known
+    to be new. Call inside the transaction that wrote the events.
+    """
+    events = [event for event in events if event.pk is not None]
+    if not events:
+        return
+    event_ids = [event.pk for event in events]
+    for model, rows_for in ((EventTeam, team_rows), (EventOpportunity, opportunity_rows)):
+        if replace:
+            model.objects.filter(event_id__in=event_ids).delete()
+        model.objects.bulk_create(
+            [row for event in events for row in rows_for(event)], batch_size=1000
+        )
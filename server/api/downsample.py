@@ -0,0 +1,48 @@
+"""Shape-preserving downsampling of time series for display.
+
+``lttb`` implements Largest-Triangle-Three-Buckets (Steinarsson, 2013): the
+first and last points are kept, the rest are split into ``threshold - 2``
+equal buckets, and from each bucket the point forming the largest triangle
+with the previously kept point and the mean of the next bucket is kept. Peaks
+and dips survive, unlike with averaging or striding.
+"""
+
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """Return the sorted indices of the ``threshold`` points of ``(x, y)`` to keep.
+
+    ``x`` must be increasing and ``threshold`` at least 3. Series of
+    ``threshold`` points or fewer are kept whole.
+    """
+    if threshold < 3:
+        raise ValueError("LTTB needs a threshold of at least 3 points.")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+
+    # Bucket boundaries over the interior points 1 .. n-2.
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        mean_x = x[next_lo:next_hi].mean()
+        mean_y = y[next_lo:next_hi].mean()
+        # Twice the triangle areas; the constant factor does not change the argmax.
+        areas = np.abs(
+            (x[previous] - mean_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (mean_y - y[previous])
+        )
+        previous = lo + int(areas.argmax())
+        kept[i + 1] = previous
+    return kept
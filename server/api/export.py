@@ -0,0 +1,291 @@
+"""Streaming bulk export of events and people as CSV or Parquet.
+
+``events`` and ``people`` return a ``StreamingHttpResponse`` whose body is
+produced while the rows are read, so memory stays flat however many rows an
+export has:
+
+* rows come from ``QuerySet.iterator()`` (a server-side cursor on Postgres,
+  ``fetchmany`` batches on SQLite) and, for archived months, from Parquet
+  record batches (``api.archive.scan``);
+* CSV is emitted every ``CHUNK_ROWS`` rows; Parquet is written one row group of
+  ``PARQUET_ROW_GROUP_ROWS`` rows at a time into a sink that is drained after
+  each group.
+
+The JSON list columns of ``ActivityEvent`` are flattened: ``people`` becomes
+``people_count`` plus aligned ``people_ids`` / ``people_roles`` lists. In CSV
+lists are joined with ``;``; in Parquet they are ``list<string>`` columns.
+
+Django buffers a synchronous streaming body completely when serving over ASGI,
+so under ASGI the chunks are pulled one at a time through ``sync_to_async``.
+"""
+
+import csv
+import io
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+from . import archive, partitions
+from .models import ActivityEvent, EventPartition
+
+FORMATS = ("csv", "parquet")
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "parquet": "application/vnd.apache.parquet"}
+CHUNK_ROWS = 2000
+PARQUET_ROW_GROUP_ROWS = 20_000
+LIST_SEPARATOR = ";"
+
+EVENT_FIELDS = (
+    "id",
+    "customer_org_id",
+    "account_id",
+    "touchpoint_id",
+    "timestamp",
+    "activity",
+    "channel",
+    "status",
+    "direction",
+    "record_type",
+    "source_record_type",
+    "source_record_id",
+    "campaign_id",
+    "campaign_name",
+    "activity_grouping_id",
+)
+EVENT_JSON_FIELDS = ("people", "involved_team_ids", "related_opportunity_ids")
+EVENT_COLUMNS = EVENT_FIELDS + (
+    "people_count",
+    "people_ids",
+    "people_roles",
+    "involved_team_ids",
+    "related_opportunity_ids",
+)
+LIST_COLUMNS = ("people_ids", "people_roles", "involved_team_ids", "related_opportunity_ids")
+
+PERSON_COLUMNS = ("id", "customer_org_id", "first_name", "last_name", "email_address", "job_title")
+# Person ids per query when exporting the people of one account.
+PERSON_ID_BATCH = 500
+
+COLUMNS = {"events": EVENT_COLUMNS, "people": PERSON_COLUMNS}
+
+
+def _schema(kind):
+    import pyarrow as pa
+
+    fields = []
+    for name in COLUMNS[kind]:
+        if name == "id" and kind == "events":
+            fields.append(pa.field(name, pa.int64()))
+        elif name == "timestamp":
+            fields.append(pa.field(name, pa.timestamp("ms", tz="UTC")))
+        elif name == "people_count":
+            fields.append(pa.field(name, pa.int32()))
+        elif name in LIST_COLUMNS:
+            fields.append(pa.field(name, pa.list_(pa.string())))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+# -------------------------------------------------------------------------
+# Rows
+# -------------------------------------------------------------------------
+
+def _strings(value):
+    return [str(item) for item in value] if isinstance(value, list) else []
+
+
+def _flatten_event(values):
+    """Turn ``EVENT_FIELDS + EVENT_JSON_FIELDS`` values into an ``EVENT_COLUMNS`` row."""
+    scalars = values[: len(EVENT_FIELDS)]
+    people, team_ids, opportunity_ids = values[len(EVENT_FIELDS):]
+    people = [p for p in people if isinstance(p, dict)] if isinstance(people, list) else []
+    return (
+        *scalars,
+        len(people),
+        [str(p.get("id") or "") for p in people],
+        [str(p.get("role_in_touchpoint") or "") for p in people],
+        _strings(team_ids),
+        _strings(opportunity_ids),
+    )
+
+
+def _archived_event_rows(customer_org_id, account_id, start, end):
+    months = EventPartition.objects.filter(status=EventPartition.ARCHIVED)
+    if start is not None:
+        months = months.filter(month__gte=partitions.month_of(start))
+    if end is not None:
+        months = months.filter(month__lte=partitions.month_of(end))
+
+    filters = [("customer_org_id", "=", customer_org_id)]
+    if account_id:
+        filters.append(("account_id", "=", account_id))
+    if start is not None:
+        filters.append(("timestamp", ">=", start))
+    if end is not None:
+        filters.append(("timestamp", "<=", end))
+
+    columns = EVENT_FIELDS + EVENT_JSON_FIELDS
+    json_positions = range(len(EVENT_FIELDS), len(columns))
+    for month in months.order_by("month").values_list("month", flat=True):
+        for batch in archive.scan(month, columns, filters, CHUNK_ROWS):
+            for record in zip(*(batch.column(name).to_pylist() for name in columns)):
+                record = list(record)
+                for i in json_positions:
+                    record[i] = json.loads(record[i]) if record[i] else []
+                yield _flatten_event(record)
+
+
+def event_rows(customer_org_id, account_id=None, start=None, end=None):
+    """Yield ``EVENT_COLUMNS`` rows of an org (optionally one account / range).
+
+    Archived months come first, then the database-resident events in
+    ``(timestamp, id)`` order.
+    """
+    yield from _archived_event_rows(customer_org_id, account_id, start, end)
+
+    qs = ActivityEvent.objects.filter(customer_org_id=customer_org_id)
+    if account_id:
+        qs = qs.filter(account_id=account_id)
+    if start is not None:
+        qs = qs.filter(partition_month__gte=partitions.month_of(start), timestamp__gte=start)
+    if end is not None:
+        qs = qs.filter(partition_month__lte=partitions.month_of(end), timestamp__lte=end)
+    rows = qs.order_by("timestamp", "id").values_list(*EVENT_FIELDS, *EVENT_JSON_FIELDS)
+    for values in rows.iterator(chunk_size=CHUNK_ROWS):
+        yield _flatten_event(values)
+
+
+def _account_person_ids(customer_org_id, account_id, start, end):
+    position = EVENT_COLUMNS.index("people_ids")
+    person_ids = set()
+    for row in event_rows(customer_org_id, account_id, start, end):
+        person_ids.update(row[position])
+    person_ids.discard("")
+    return sorted(person_ids)
+
+
+def person_rows(persons_qs, customer_org_id, account_id=None, start=None, end=None):
+    """Yield ``PERSON_COLUMNS`` rows of ``persons_qs`` in id order.
+
+    With ``account_id`` only people that appear on that account's events (in
+    ``[start, end]`` when given) are exported.
+    """
+    persons_qs = persons_qs.order_by("id").values_list(*PERSON_COLUMNS)
+    if not account_id:
+        yield from persons_qs.iterator(chunk_size=CHUNK_ROWS)
+        return
+    person_ids = _account_person_ids(customer_org_id, account_id, start, end)
+    for i in range(0, len(person_ids), PERSON_ID_BATCH):
+        yield from persons_qs.filter(id__in=person_ids[i:i + PERSON_ID_BATCH])
+
+
+# -------------------------------------------------------------------------
+# Encoders
+# -------------------------------------------------------------------------
+
+def _csv_cell(value):
+    if isinstance(value, list):
+        return LIST_SEPARATOR.join(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(columns, rows):
+    """Yield the CSV encoding of ``rows`` in chunks of ``CHUNK_ROWS`` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 1
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        pending += 1
+        if pending >= CHUNK_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file object whose contents are handed out with ``take``."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_chunks(kind, rows):
+    """Yield a zstd Parquet file of ``rows``, one row group at a time."""
+    import pyarrow as pa
+    import pyarrow.parquet
+
+    arrow_schema = _schema(kind)
+    sink = _Sink()
+    buffer = [[] for _ in arrow_schema.names]
+
+    def row_group():
+        return pa.Table.from_pydict(dict(zip(arrow_schema.names, buffer)), schema=arrow_schema)
+
+    with pa.parquet.ParquetWriter(sink, arrow_schema, compression="zstd") as writer:
+        for row in rows:
+            for column, value in zip(buffer, row):
+                column.append(value)
+            if len(buffer[0]) >= PARQUET_ROW_GROUP_ROWS:
+                writer.write_table(row_group())
+                buffer = [[] for _ in arrow_schema.names]
+                yield sink.take()
+        if buffer[0]:
+            writer.write_table(row_group())
+    yield sink.take()
+
+
+# -------------------------------------------------------------------------
+# Responses
+# -------------------------------------------------------------------------
+
+async def _pull(chunks):
+    """Async iterator over a sync chunk generator, one chunk per thread hop."""
+    chunks = iter(chunks)
+    # The database cursor lives on the sync thread, so keep every step there.
+    step = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await step(chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+def response(request, kind, rows, fmt, filename):
+    """Stream ``rows`` of ``kind`` (``events`` or ``people``) as a ``fmt`` download."""
+    chunks = csv_chunks(COLUMNS[kind], rows) if fmt == "csv" else parquet_chunks(kind, rows)
+    if isinstance(request, ASGIRequest):
+        chunks = _pull(chunks)
+    streaming = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[fmt])
+    streaming["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    streaming["Cache-Control"] = "no-store"
+    return streaming
@@ -0,0 +1,169 @@
+"""Maintenance of the ``ActivityGroup`` summaries.
+
+Plain inserts are folded into the existing summaries incrementally
+(``apply_inserts``): one read and one bulk write per batch, whatever the size of
+the groups involved. Updates and deletes can move an event out of a group or
+shrink its time span, so those groups are recomputed from their events
+(``refresh``), which the ``(org, account, activity_grouping_id, timestamp)``
+index keeps cheap. Summaries cover archived events too: archiving leaves them
+alone, and ``refresh`` reads the archived members back from the months the
+group spans.
+
+Call both inside the transaction that wrote the events. Ingest already holds
+the account's change-sequence lock at that point, so concurrent writers of
+the same account cannot interleave their summary updates.
+"""
+
+import json
+from collections import defaultdict
+
+from django.db.models import Count, Max, Min
+
+from . import partitions
+from .models import ActivityEvent, ActivityGroup
+
+
+def group_key(event):
+    """Return the summary key of ``event``, or ``None`` if it is ungrouped."""
+    if not event.activity_grouping_id:
+        return None
+    return (event.customer_org_id, event.account_id, event.activity_grouping_id)
+
+
+def _person_ids(people):
+    return {person["id"] for person in people or [] if isinstance(person, dict) and person.get("id")}
+
+
+def _existing(keys):
+    """Load the summaries for ``keys`` in one query per (org, account)."""
+    by_account = defaultdict(set)
+    for customer_org_id, account_id, grouping_id in keys:
+        by_account[(customer_org_id, account_id)].add(grouping_id)
+    found = {}
+    for (customer_org_id, account_id), grouping_ids in by_account.items():
+        for group in ActivityGroup.objects.filter(
+            customer_org_id=customer_org_id,
+            account_id=account_id,
+            activity_grouping_id__in=grouping_ids,
+        ):
+            found[(customer_org_id, account_id, group.activity_grouping_id)] = group
+    return found
+
+
+def apply_inserts(events):
+    """Fold newly inserted (saved) events into their group summaries."""
+    batches = defaultdict(list)
+    for event in events:
+        key = group_key(event)
+        if key is not None and event.pk is not None:
+            batches[key].append(event)
+    if not batches:
+        return
+
+    existing = _existing(batches)
+    to_create, to_update = [], []
+    for key, group_events in batches.items():
+        latest = max(group_events, key=lambda e: (e.timestamp, e.pk))
+        participants = set().union(*(_person_ids(e.people) for e in group_events))
+        group = existing.get(key)
+        if group is None:
+            customer_org_id, account_id, grouping_id = key
+            to_create.append(ActivityGroup(
+                customer_org_id=customer_org_id,
+                account_id=account_id,
+                activity_grouping_id=grouping_id,
+                event_count=len(group_events),
+                first_timestamp=min(e.timestamp for e in group_events),
+                last_timestamp=latest.timestamp,
+                latest_event_id=latest.pk,
+                participants=sorted(participants),
+            ))
+            continue
+        group.event_count += len(group_events)
+        group.first_timestamp = min(group.first_timestamp, *(e.timestamp for e in group_events))
+        if latest.timestamp >= group.last_timestamp:
+            group.last_timestamp = latest.timestamp
+            group.latest_event_id = latest.pk
+        group.participants = sorted(set(group.participants) | participants)
+        to_update.append(group)
+
+    ActivityGroup.objects.bulk_create(to_create, batch_size=1000)
+    ActivityGroup.objects.bulk_update(
+        to_update,
+        ["event_count", "first_timestamp", "last_timestamp", "latest_event_id", "participants"],
+        batch_size=1000,
+    )
+
+
+def _archived_events(key, group):
+    """``(timestamp, id, people)`` of the archived events of the group ``key``.
+
+    They can only lie in the archived months spanned by its current summary.
+    """
+    if group is None:
+        return []
+    months = partitions.archived_months(group.first_timestamp, group.last_timestamp)
+    if not months:
+        return []
+    customer_org_id, account_id, grouping_id = key
+    table = partitions.archived_table(
+        customer_org_id,
+        ("timestamp", "id", "people"),
+        account_id=account_id,
+        filters=[("activity_grouping_id", "=", grouping_id)],
+        months=months,
+    )
+    return [
+        (row["timestamp"], row["id"], json.loads(row["people"]) if row["people"] else [])
+        for row in table.to_pylist()
+    ]
+
+
+def refresh(keys):
+    """Recompute the summaries for ``keys`` from their events in both tiers.
+
+    Groups left without events are deleted.
+    """
+    keys = {key for key in keys if key is not None}
+    existing = _existing(keys)
+    for key in keys:
+        customer_org_id, account_id, grouping_id = key
+        events_qs = ActivityEvent.objects.filter(
+            customer_org_id=customer_org_id,
+            account_id=account_id,
+            activity_grouping_id=grouping_id,
+        ).order_by()
+        stats = events_qs.aggregate(
+            event_count=Count("id"),
+            first_timestamp=Min("timestamp"),
+            last_timestamp=Max("timestamp"),
+        )
+        group = existing.get(key)
+        archived = _archived_events(key, group)
+        if not stats["event_count"] and not archived:
+            if group is not None:
+                group.delete()
+            continue
+
+        participants = set()
+        for people in events_qs.values_list("people", flat=True):
+            participants |= _person_ids(people)
+        latest = events_qs.order_by("-timestamp", "-id").values_list("timestamp", "id").first()
+        stamps = [stats["first_timestamp"], stats["last_timestamp"]] if stats["event_count"] else []
+        for timestamp, event_id, people in archived:
+            participants |= _person_ids(people)
+            stamps.append(timestamp)
+            latest = max(filter(None, (latest, (timestamp, event_id))))
+
+        if group is None:
+            group = ActivityGroup(
+                customer_org_id=customer_org_id,
+                account_id=account_id,
+                activity_grouping_id=grouping_id,
+            )
+        group.event_count = stats["event_count"] + len(archived)
+        group.first_timestamp = min(stamps)
+        group.last_timestamp = max(stamps)
+        group.latest_event_id = latest[1]
+        group.participants = sorted(participants)
+        group.save()
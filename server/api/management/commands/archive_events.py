@@ -0,0 +1,153 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api import archive, partitions, snapshots
+from api.cache import bump_data_version
+from api.models import ActivityEvent, EventOpportunity, EventPartition
+
+
+class Command(BaseCommand):
+    """Move old monthly ActivityEvent partitions into compressed Parquet files.
+
+    Every month before the cutoff that still has rows in the database is
+    written to ``EVENT_ARCHIVE_DIR/<YYYY-MM>/part-*.parquet``, verified, and then
+    deleted from the hot table. The partition is marked ``archived`` so that
+    date-bounded dashboard queries read it from the archive instead.
+    """
+
+    help = __doc__.strip().split("\n")[0]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            type=str,
+            default=None,
+            help="Archive months strictly before this month (YYYY-MM).",
+        )
+        parser.add_argument(
+            "--older-than-months",
+            type=int,
+            default=12,
+            help="Archive months older than this many months (default: 12). Ignored with --before.",
+        )
+        parser.add_argument(
+            "--row-group-size",
+            type=int,
+            default=50_000,
+            help="Rows per Parquet row group (default: 50000)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the partitions that would be archived without touching them.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = self._cutoff(options["before"], options["older_than_months"])
+        row_group_size: int = options["row_group_size"]
+
+        months = list(
+            EventPartition.objects.filter(month__lt=cutoff).values_list("month", flat=True)
+        )
+        if not months:
+            self.stdout.write(f"No partitions before {cutoff:%Y-%m}.")
+            return
+
+        archived_orgs = set()
+        for month in months:
+            rows_qs = ActivityEvent.objects.filter(partition_month=month)
+            pending = rows_qs.count()
+            if not pending:
+                continue
+            if options["dry_run"]:
+                self.stdout.write(f"{month:%Y-%m}: would archive {pending} rows")
+                continue
+            archived_orgs.update(self._archive_month(month, rows_qs, pending, row_group_size))
+
+        # Archiving bumped their data versions; re-render the snapshots.
+        for customer_org_id in sorted(archived_orgs):
+            snapshots.write_org(customer_org_id)
+
+    # ---------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------
+
+    def _archive_month(self, month, rows_qs, expected, row_group_size):
+        orgs = list(rows_qs.order_by().values_list("customer_org_id", flat=True).distinct())
+        rows = rows_qs.order_by("id").values().iterator(chunk_size=row_group_size)
+        path, written = archive.write_partition(month, rows, row_group_size)
+
+        if written != expected or archive.count_rows(path) != written:
+            path.unlink(missing_ok=True)
+            raise CommandError(
+                f"{month:%Y-%m}: wrote {written} of {expected} rows; partition left hot."
+            )
+
+        try:
+            with transaction.atomic():
+                max_id = self._max_id(path)
+                partition = EventPartition.objects.select_for_update().get(month=month)
+                # Listings total and page the archive from these counts.
+                partitions.record_archived(partition, max_id)
+                # Derived per-event rows (team links, ...) go with their events,
+                # except the opportunity index, which covers both tiers.
+                for relation in ActivityEvent._meta.related_objects:
+                    if relation.related_model is EventOpportunity:
+                        continue
+                    relation.related_model.objects.filter(**{
+                        f"{relation.field.name}__partition_month": month,
+                        f"{relation.field.name}_id__lte": max_id,
+                    }).delete()
+                # Raw DELETE: archiving is not a logical deletion, so it must
+                # not fire the tombstone signal that delta-sync clients act on.
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"DELETE FROM {connection.ops.quote_name(ActivityEvent._meta.db_table)} "
+                        "WHERE partition_month = %s AND id <= %s",
+                        [month, max_id],
+                    )
+                    deleted = cursor.rowcount
+                if deleted != written:
+                    raise CommandError(
+                        f"{month:%Y-%m}: rows changed while archiving "
+                        f"({deleted} != {written}); partition left hot."
+                    )
+                # ActivityGroup summaries keep counting the archived events.
+                partition.status = EventPartition.ARCHIVED
+                partition.archived_rows += written
+                partition.archived_at = timezone.now()
+                partition.save()
+                for customer_org_id in orgs:
+                    bump_data_version(customer_org_id)
+        except Exception:
+            # Never leave a file behind for rows that are still hot, or reads
+            # would count them twice.
+            path.unlink(missing_ok=True)
+            raise
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{month:%Y-%m}: archived {written} rows to {path}")
+        )
+        return orgs
+
+    @staticmethod
+    def _max_id(path):
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        return pc.max(pq.read_table(path, columns=["id"])["id"]).as_py()
+
+    @staticmethod
+    def _cutoff(before, older_than_months):
+        if before:
+            try:
+                year, month = (int(part) for part in before.split("-"))
+                return date(year, month, 1)
+            except ValueError as exc:
+                raise CommandError("--before must look like YYYY-MM") from exc
+        today = timezone.now().date()
+        index = today.year * 12 + (today.month - 1) - older_than_months
+        return date(index // 12, index % 12 + 1, 1)
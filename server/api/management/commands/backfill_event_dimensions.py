@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import dimensions
+from api.models import ActivityEvent
+
+
+class Command(BaseCommand):
+    """Rebuild the normalized dimension tables from existing ActivityEvent rows.
+
+    Ingest keeps these tables current for new data; run this once after adding
+    a dimension, or to repair drift. Safe to re-run: each batch replaces the
+    rows of the events it covers.
+    """
+
+    help = __doc__.strip().split("\n")[0]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of events to process per transaction (default: 1000)",
+        )
+        parser.add_argument(
+            "--customer-org-id",
+            type=str,
+            default=None,
+            help="Only backfill events of this organisation.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+
+        events_qs = ActivityEvent.objects.order_by("id")
+        if options["customer_org_id"]:
+            events_qs = events_qs.filter(customer_org_id=options["customer_org_id"])
+
+        processed = 0
+        last_id = 0
+        while True:
+            batch = list(events_qs.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                dimensions.sync(batch)
+            processed += len(batch)
+            last_id = batch[-1].pk
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Backfilled dimensions for {processed} ActivityEvent records.")
+        )
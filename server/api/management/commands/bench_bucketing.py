@@ -0,0 +1,106 @@
+import time
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from api import bucketing
+
+
+class Command(BaseCommand):
+    """Benchmark the NumPy bucketing engine against the per-event Python loop.
+
+    Generates ``--events`` synthetic timestamps spread over ``--years`` years
+    with a three-valued split column, then times the previous approach (a dict
+    keyed by ``timestamp.date()``, UTC days only) and ``api.bucketing`` for
+    several bucket sizes, time zones and a split series.
+    """
+
+    help = __doc__.strip().split("\n")[0]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--events",
+            type=int,
+            default=1_000_000,
+            help="Number of synthetic events (default: 1000000)",
+        )
+        parser.add_argument(
+            "--years",
+            type=int,
+            default=3,
+            help="Years of history the events span (default: 3)",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=3,
+            help="Timed repetitions per measurement; the best is reported (default: 3)",
+        )
+
+    def handle(self, *args, **options):
+        n = options["events"]
+        iterations = options["iterations"]
+        rng = np.random.default_rng(0)
+        end_ms = 1_735_689_600_000  # 2025-01-01
+        stamps = np.sort(rng.integers(end_ms - options["years"] * 365 * 86_400_000, end_ms, n))
+        directions = rng.choice(np.array(["IN", "OUT", ""], dtype=object), n)
+
+        # The previous implementation's inputs: one aware datetime per event.
+        datetimes = [datetime.fromtimestamp(ms / 1000, tz=dt_timezone.utc) for ms in stamps.tolist()]
+        new_york = ZoneInfo("America/New_York")
+
+        def loop_day_utc():
+            counts = {}
+            for moment in datetimes:
+                key = moment.date().isoformat()
+                if key not in counts:
+                    counts[key] = 0
+                counts[key] += 1
+            return sorted(counts.items())
+
+        def loop_day_tz_split():
+            counts = Counter()
+            for moment, direction in zip(datetimes, directions):
+                counts[(moment.astimezone(new_york).date().isoformat(), direction)] += 1
+            return counts
+
+        cases = [
+            ("python loop  day UTC", loop_day_utc, None),
+            ("numpy        day UTC", lambda: bucketing.bucket_counts(stamps, "day"), "python loop  day UTC"),
+            ("numpy        hour UTC", lambda: bucketing.bucket_counts(stamps, "hour"), "python loop  day UTC"),
+            ("numpy        week UTC", lambda: bucketing.bucket_counts(stamps, "week"), "python loop  day UTC"),
+            ("numpy        month UTC", lambda: bucketing.bucket_counts(stamps, "month"), "python loop  day UTC"),
+            ("python loop  day NY x direction", loop_day_tz_split, None),
+            (
+                "numpy        day NY x direction",
+                lambda: bucketing.bucket_counts(stamps, "day", "America/New_York", directions),
+                "python loop  day NY x direction",
+            ),
+            (
+                "numpy        hour NY x direction",
+                lambda: bucketing.bucket_counts(stamps, "hour", "America/New_York", directions),
+                "python loop  day NY x direction",
+            ),
+        ]
+
+        self.stdout.write(f"events={n} years={options['years']} iterations={iterations}")
+        self.stdout.write("")
+        self.stdout.write(f"{'case':<34} {'ms':>10} {'speedup':>8}")
+        timings = {}
+        for name, fn, baseline in cases:
+            timings[name] = self._best(fn, iterations)
+            speedup = f"{timings[baseline] / timings[name]:>7.1f}x" if baseline else f"{'-':>8}"
+            self.stdout.write(f"{name:<34} {timings[name]:>10.1f} {speedup}")
+
+    @staticmethod
+    def _best(fn, iterations):
+        """Return the fastest wall-clock milliseconds of ``fn`` over ``iterations``."""
+        best = float("inf")
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fn()
+            best = min(best, (time.perf_counter() - start) * 1000)
+        return best
@@ -0,0 +1,97 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from api import compression, views
+from api.cache import response_cache
+from api.models import ActivityEvent
+
+
+class Command(BaseCommand):
+    """Benchmark response compression and caching on the loaded data.
+
+    For the chart, events and people endpoints of one account this reports the
+    identity, gzip and brotli body sizes, the CPU time to compress each, and
+    the request latency for an uncached response versus a cache hit that serves
+    a stored compressed body.
+    """
+
+    help = __doc__.strip().split("\n")[0]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customer-org-id", type=str, default=None)
+        parser.add_argument("--account-id", type=str, default=None)
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Timed repetitions per measurement (default: 20)",
+        )
+
+    def handle(self, *args, **options):
+        iterations: int = options["iterations"]
+        customer_org_id = options["customer_org_id"]
+        account_id = options["account_id"]
+
+        if not customer_org_id or not account_id:
+            sample = ActivityEvent.objects.values("customer_org_id", "account_id").first()
+            if sample is None:
+                raise CommandError("No ActivityEvent rows loaded; run ingest_activityevents first.")
+            customer_org_id = customer_org_id or sample["customer_org_id"]
+            account_id = account_id or sample["account_id"]
+
+        targets = [
+            ("chart", views.all_events_for_chart, {"account_id": account_id}),
+            ("events", views.all_activity_events, {"account_id": account_id, "page_size": 100}),
+            ("people", views.all_persons, {}),
+        ]
+        factory = RequestFactory()
+
+        self.stdout.write(
+            f"org={customer_org_id} account={account_id} iterations={iterations} "
+            f"encodings={','.join(compression.SUPPORTED_ENCODINGS)}"
+        )
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'endpoint':<8} {'encoding':<8} {'bytes':>10} {'ratio':>7} "
+            f"{'compress ms':>12} {'uncached ms':>12} {'cached ms':>10}"
+        )
+
+        for name, view, params in targets:
+            params = {"customer_org_id": customer_org_id, **params}
+            body = view(factory.get("/", params)).content
+
+            for encoding in (None,) + compression.SUPPORTED_ENCODINGS:
+                headers = {"HTTP_ACCEPT_ENCODING": encoding} if encoding else {}
+                if encoding is None:
+                    size, compress_ms = len(body), 0.0
+                else:
+                    compress_ms = self._time(
+                        lambda: compression.compress(body, encoding), iterations
+                    )
+                    size = len(compression.compress(body, encoding))
+
+                def uncached():
+                    response_cache().clear()
+                    return view(factory.get("/", params, **headers))
+
+                uncached_ms = self._time(uncached, iterations)
+                view(factory.get("/", params, **headers))  # prime the cache
+                cached_ms = self._time(
+                    lambda: view(factory.get("/", params, **headers)), iterations
+                )
+
+                self.stdout.write(
+                    f"{name:<8} {encoding or 'identity':<8} {size:>10} "
+                    f"{size / len(body):>7.2%} {compress_ms:>12.3f} "
+                    f"{uncached_ms:>12.3f} {cached_ms:>10.3f}"
+                )
+
+    @staticmethod
+    def _time(fn, iterations):
+        """Return the mean wall-clock milliseconds of ``fn`` over ``iterations``."""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return (time.perf_counter() - start) * 1000 / iterations
@@ -0,0 +1,124 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import warmup
+
+# Runs in a fresh interpreter per measurement so nothing is imported yet.
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls_done = time.perf_counter()
+warmed = 0
+if {warm!r}:
+    from django.conf import settings
+    from api import warmup
+    warmed = warmup.warm(settings.WARMUP_ORGS, settings.WARMUP_ACCOUNTS_PER_ORG)
+warm_done = time.perf_counter()
+from django.test import Client
+client = Client(SERVER_NAME="localhost")
+# Server handlers load their middleware when constructed, not per request.
+client.handler.load_middleware()
+timings = []
+for _ in range(2):
+    t = time.perf_counter()
+    status = client.get({path!r}).status_code
+    timings.append((time.perf_counter() - t) * 1000)
+print(json.dumps({{
+    "setup_ms": (setup_done - started) * 1000,
+    "urls_ms": (urls_done - setup_done) * 1000,
+    "warm_ms": (warm_done - urls_done) * 1000,
+    "first_ms": timings[0],
+    "second_ms": timings[1],
+    "status": status,
+    "modules": len(sys.modules),
+    "warmed": warmed,
+}}))
+"""
+
+
+class Command(BaseCommand):
+    """Measure process start-up and first-request latency per server configuration.
+
+    Each configuration runs in fresh interpreters: full ``INSTALLED_APPS``,
+    API-only (``DJANGO_API_ONLY=True``, admin/messages left out) and API-only
+    with the boot-time cache warm-up of ``api.warmup``. The report shows the
+    median Django setup and URLconf import time, the number of imported
+    modules, and the latency of the first and second chart request.
+    """
+
+    help = __doc__.strip().split("\n")[0]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Fresh processes per configuration (default: 5)",
+        )
+        parser.add_argument("--customer-org-id", type=str, default=None)
+
+    def handle(self, *args, **options):
+        customer_org_id = options["customer_org_id"]
+        if not customer_org_id:
+            busiest = warmup.most_active_orgs(1)
+            if not busiest:
+                raise CommandError("No ActivityEvent rows loaded; run ingest_activityevents first.")
+            customer_org_id = busiest[0]
+        path = f"/api/events/chart/?customer_org_id={customer_org_id}"
+
+        configurations = [
+            ("full", {"DJANGO_API_ONLY": "False"}, False),
+            ("api-only", {"DJANGO_API_ONLY": "True"}, False),
+            ("api-only+warm", {"DJANGO_API_ONLY": "True"}, True),
+        ]
+
+        self.stdout.write(f"path={path} repeat={options['repeat']}")
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'config':<14} {'process ms':>10} {'setup ms':>9} {'urls ms':>8} "
+            f"{'modules':>8} {'warm ms':>8} {'1st req ms':>11} {'2nd req ms':>11}"
+        )
+        for name, env, warm in configurations:
+            runs = [self._run(path, env, warm) for _ in range(options["repeat"])]
+            median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+            self.stdout.write(
+                f"{name:<14} {median['process_ms']:>10.1f} {median['setup_ms']:>9.1f} "
+                f"{median['urls_ms']:>8.1f} {median['modules']:>8.0f} {median['warm_ms']:>8.1f} "
+                f"{median['first_ms']:>11.2f} {median['second_ms']:>11.2f}"
+            )
+
+    # ---------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------
+
+    @staticmethod
+    def _run(path, env, warm):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD.format(path=path, warm=warm)],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **env},
+            capture_output=True,
+            text=True,
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        if result.returncode != 0:
+            raise CommandError(f"Start-up probe failed:\n{result.stderr}")
+        run = json.loads(result.stdout.strip().splitlines()[-1])
+        if run.pop("status") != 200:
+            raise CommandError(f"Start-up probe got a non-200 response for {path}")
+        run.pop("warmed")
+        run["process_ms"] = elapsed
+        return run
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from api import snapshots
+from api.models import ActivityEvent, Person
+
+
+class Command(BaseCommand):
+    """Re-render the chart/people snapshot files of one or all organisations.
+
+    The ingest commands do this automatically; run it after changing data by
+    other means (admin edits, ``--no-snapshots`` imports) so the snapshots
+    match the current data version again.
+    """
+
+    help = __doc__.strip().split("\n")[0]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--customer-org-id",
+            type=str,
+            default=None,
+            help="Only this organisation (default: every organisation with data)",
+        )
+
+    def handle(self, *args, **options):
+        if options["customer_org_id"]:
+            org_ids = [options["customer_org_id"]]
+        else:
+            org_ids = sorted(
+                set(ActivityEvent.objects.order_by().values_list("customer_org_id", flat=True).distinct())
+                | set(Person.objects.order_by().values_list("customer_org_id", flat=True).distinct())
+            )
+
+        for customer_org_id in org_ids:
+            written = snapshots.write_org(customer_org_id)
+            self.stdout.write(f"{customer_org_id}: {written} snapshots")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt snapshots for {len(org_ids)} organisations."))
@@ -1,5 +1,6 @@
 import json
 import logging
+from collections import defaultdict
 from datetime import datetime, timezone as dt_timezone
 from pathlib import Path
 
@@ -7,6 +8,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils import timezone
 
+from api import changes, dimensions, groups, partitions, pubsub, rollups, snapshots
 from api.models import ActivityEvent
 
 logger = logging.getLogger(__name__)
@@ -47,11 +49,26 @@ class Command(BaseCommand):
             action="store_true",
             help="Skip lines that cannot be parsed instead of aborting the entire import.",
         )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help=(
+                "Update events whose (customer_org_id, account_id, touchpoint_id) "
+                "already exists instead of failing on the duplicate."
+            ),
+        )
+
+        parser.add_argument(
+            "--no-snapshots",
+            action="store_true",
+            help="Do not rewrite the chart/people snapshot files of the imported organisations.",
+        )
 
     def handle(self, *args, **options):
         jsonl_path = Path(options["jsonl_path"])
         batch_size: int = options["batch_size"]
         ignore_errors: bool = options["ignore_errors"]
+        upsert: bool = options["upsert"]
 
         if not jsonl_path.exists():
             raise CommandError(f"File not found: {jsonl_path}")
@@ -62,6 +79,7 @@ class Command(BaseCommand):
 
         objs = []
         lines_processed = 0
+        org_ids = set()
         with jsonl_path.open("r", encoding="utf-8") as handle:
             for line_no, raw_line in enumerate(handle, start=1):
                 raw_line = raw_line.strip()
@@ -79,14 +97,21 @@ class Command(BaseCommand):
                     raise CommandError(msg) from exc
 
                 if len(objs) >= batch_size:
-                    self._bulk_insert(objs)
+                    org_ids.update(obj.customer_org_id for obj in objs)
+                    self._bulk_insert(objs, upsert)
                     lines_processed += len(objs)
                     objs.clear()
 
         if objs:
-            self._bulk_insert(objs)
+            org_ids.update(obj.customer_org_id for obj in objs)
+            self._bulk_insert(objs, upsert)
             lines_processed += len(objs)
 
+        if not options["no_snapshots"]:
+            # Every import bumped the data version; re-render the snapshots.
+            for customer_org_id in sorted(org_ids):
+                snapshots.write_org(customer_org_id)
+
         self.stdout.write(self.style.SUCCESS(f"Successfully imported {lines_processed} ActivityEvent records."))
 
     # ---------------------------------------------------------------------
@@ -94,10 +119,67 @@ class Command(BaseCommand):
     # ---------------------------------------------------------------------
 
     @staticmethod
-    def _bulk_insert(objects):
-        """Insert objects inside a transaction to ensure atomicity."""
+    def _bulk_insert(objects, upsert=False):
+        """Insert objects inside a transaction to ensure atomicity.
+
+        Every row gets its monthly partition key (see ``api.partitions``) and
+        is stamped with the next ``change_seq`` values of its account in the
+        same transaction (see ``api.changes``); the normalized team and
+        opportunity tables are rebuilt for the batch (see ``api.dimensions``)
+        and the batch is folded into its activity-group summaries (see
+        ``api.groups``) and day/week/month rollups (see ``api.rollups``). Once
+        committed, the batch is published to live event-stream subscribers
+        (see ``api.pubsub``).
+        """
+        conflict_options = {}
+        if upsert:
+            unique_fields = ["customer_org_id", "account_id", "touchpoint_id"]
+            conflict_options = {
+                "update_conflicts": True,
+                "unique_fields": unique_fields,
+                "update_fields": [
+                    f.name
+                    for f in ActivityEvent._meta.concrete_fields
+                    if not f.primary_key and f.name not in unique_fields
+                ],
+            }
         with transaction.atomic():
-            ActivityEvent.objects.bulk_create(objects, ignore_conflicts=False)
+            partitions.assign(objects)
+            changes.stamp(objects)
+            previous_groups = Command._current_group_keys(objects) if upsert else set()
+            previous_buckets = rollups.previous_keys(objects) if upsert else None
+            created = ActivityEvent.objects.bulk_create(objects, **conflict_options)
+            # Upserted rows may already have dimension rows that need replacing.
+            dimensions.sync(created, replace=upsert)
+            if upsert:
+                # Updates can move events between groups: recompute instead.
+                groups.refresh(previous_groups | {groups.group_key(e) for e in created})
+            else:
+                groups.apply_inserts(created)
+            if upsert:
+                rollups.apply_upserts(created, previous_buckets)
+            else:
+                rollups.apply_inserts(created)
+        pubsub.publish(created)
+
+    @staticmethod
+    def _current_group_keys(objects):
+        """Return the group keys the stored versions of ``objects`` belong to."""
+        by_account = defaultdict(list)
+        for obj in objects:
+            by_account[(obj.customer_org_id, obj.account_id)].append(obj.touchpoint_id)
+        keys = set()
+        for (customer_org_id, account_id), touchpoint_ids in by_account.items():
+            keys.update(
+                (customer_org_id, account_id, grouping_id)
+                for grouping_id in ActivityEvent.objects.filter(
+                    customer_org_id=customer_org_id,
+                    account_id=account_id,
+                    touchpoint_id__in=touchpoint_ids,
+                    activity_grouping_id__isnull=False,
+                ).values_list("activity_grouping_id", flat=True)
+            )
+        return keys
 
     @staticmethod
     def _parse_timestamp(raw):
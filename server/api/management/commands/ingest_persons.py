@@ -3,8 +3,10 @@ import logging
 from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
+from django.db import connection, transaction
 
+from api import snapshots
+from api.cache import bump_data_version
 from api.models import Person
 
 logger = logging.getLogger(__name__)
@@ -40,6 +42,12 @@ class Command(BaseCommand):
             ),
         )
 
+        parser.add_argument(
+            "--no-snapshots",
+            action="store_true",
+            help="Do not rewrite the chart/people snapshot files of the imported organisations.",
+        )
+
     def handle(self, *args, **options):
         jsonl_path = Path(options["jsonl_path"])
         batch_size: int = options["batch_size"]
@@ -54,6 +62,7 @@ class Command(BaseCommand):
 
         objs = []
         lines_processed = 0
+        org_ids = set()
         with jsonl_path.open("r", encoding="utf-8") as handle:
             for line_no, raw_line in enumerate(handle, start=1):
                 raw_line = raw_line.strip()
@@ -70,14 +79,23 @@ class Command(BaseCommand):
                     raise CommandError(msg) from exc
 
                 if len(objs) >= batch_size:
+                    org_ids.update(obj.customer_org_id for obj in objs)
                     self._bulk_insert(objs)
                     lines_processed += len(objs)
                     objs.clear()
 
         if objs:
+            org_ids.update(obj.customer_org_id for obj in objs)
             self._bulk_insert(objs)
             lines_processed += len(objs)
 
+        self._refresh_planner_stats()
+
+        if not options["no_snapshots"]:
+            # Every import bumped the data version; re-render the snapshots.
+            for customer_org_id in sorted(org_ids):
+                snapshots.write_org(customer_org_id)
+
         self.stdout.write(
             self.style.SUCCESS(
                 f"Successfully imported {lines_processed} Person records."
@@ -94,4 +112,17 @@ class Command(BaseCommand):
         with transaction.atomic():
             # We do *not* ignore conflicts here so that the caller is notified
             # about duplicate primary keys or unique constraint violations.
-            Person.objects.bulk_create(objects, ignore_conflicts=False) 
\ No newline at end of file
+            Person.objects.bulk_create(objects, ignore_conflicts=False)
+            for customer_org_id in {obj.customer_org_id for obj in objects}:
+                bump_data_version(customer_org_id)
+
+    @staticmethod
+    def _refresh_planner_stats():
+        """Refresh table statistics after a bulk load.
+
+        Without fresh statistics the query planner prefers walking the
+        ``(customer_org_id, last_name, ...)`` index to avoid a sort, which turns
+        a type-ahead search on ``/api/people/`` into a scan of the whole org.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(Person._meta.db_table)}")
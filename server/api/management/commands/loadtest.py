@@ -0,0 +1,327 @@
+import http.client
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import ActivityEvent, Person
+
+
+class Command(BaseCommand):
+    """Simulate concurrent dashboard scroll sessions against a running server.
+
+    Each virtual user repeats a session modelled on the dashboard: load the
+    page bundle (optional) with the stats and chart data, scroll ``--pages``
+    pages of ``/api/events/``, jump to ``--jumps`` random pages as if clicking
+    the minimap, and run ``--lookups`` people type-ahead searches. Every step in
+    ``--users`` runs that many virtual users for ``--duration`` seconds.
+
+    The report gives one row per concurrency step (throughput against latency
+    percentiles, i.e. the saturation curve) followed by per-endpoint error
+    rates and latencies. ``--output`` also writes the raw numbers as JSON.
+    """
+
+    help = __doc__.strip().split("\n")[0]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            type=str,
+            default="http://127.0.0.1:8000",
+            help="API server to load (default: http://127.0.0.1:8000)",
+        )
+        parser.add_argument(
+            "--bundle-url",
+            type=str,
+            default=None,
+            help="Frontend page fetched at the start of each session, e.g. http://127.0.0.1:3000/",
+        )
+        parser.add_argument("--customer-org-id", type=str, default=None)
+        parser.add_argument("--account-id", type=str, default=None)
+        parser.add_argument(
+            "--users",
+            type=str,
+            default="1,2,4,8,16",
+            help="Comma-separated virtual-user counts, one step each (default: 1,2,4,8,16)",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=30.0,
+            help="Seconds per concurrency step (default: 30)",
+        )
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=5,
+            help="Infinite-scroll pages per session (default: 5)",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=10,
+            help="Events per scroll page (default: 10, as in the dashboard table)",
+        )
+        parser.add_argument(
+            "--jumps",
+            type=int,
+            default=3,
+            help="Minimap jumps to random pages per session (default: 3)",
+        )
+        parser.add_argument(
+            "--lookups",
+            type=int,
+            default=2,
+            help="People type-ahead searches per session (default: 2)",
+        )
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=0.1,
+            help="Mean pause between a user's requests in seconds (default: 0.1)",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=10.0,
+            help="Per-request timeout in seconds (default: 10)",
+        )
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for repeatable runs")
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="Write the step and endpoint results to this JSON file",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            steps = [int(users) for users in options["users"].split(",") if users.strip()]
+        except ValueError as exc:
+            raise CommandError("--users must be a comma-separated list of integers") from exc
+        if not steps or min(steps) < 1:
+            raise CommandError("--users needs at least one positive count")
+
+        customer_org_id, account_id = self._target(
+            options["customer_org_id"], options["account_id"]
+        )
+        prefixes = self._name_prefixes(customer_org_id)
+        self.options = options
+        self.customer_org_id = customer_org_id
+        self.account_id = account_id
+        self.prefixes = prefixes
+        # Minimap jumps land anywhere in the account's history.
+        event_count = ActivityEvent.objects.filter(
+            customer_org_id=customer_org_id, account_id=account_id
+        ).count()
+        self.total_pages = max(1, math.ceil(event_count / options["page_size"]))
+        self.rng = random.Random(options["seed"])
+
+        self.stdout.write(
+            f"base={options['base_url']} org={customer_org_id} account={account_id} "
+            f"pages={options['pages']} jumps={options['jumps']} lookups={options['lookups']} "
+            f"duration={options['duration']:g}s"
+        )
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'users':>5} {'requests':>9} {'sessions':>8} {'req/s':>8} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+
+        results = []
+        by_endpoint = defaultdict(list)
+        for users in steps:
+            samples, sessions = self._run_step(users)
+            summary = {
+                "users": users,
+                "sessions": sessions,
+                **self._summarize(samples, options["duration"]),
+            }
+            results.append(summary)
+            for name, latency, ok in samples:
+                by_endpoint[name].append((name, latency, ok))
+            self.stdout.write(
+                f"{users:>5} {summary['requests']:>9} {sessions:>8} "
+                f"{summary['throughput']:>8.1f} {summary['p50_ms']:>8.1f} "
+                f"{summary['p95_ms']:>8.1f} {summary['p99_ms']:>8.1f} "
+                f"{summary['error_rate']:>7.2%}"
+            )
+
+        peak = max(results, key=lambda row: row["throughput"])
+        self.stdout.write("")
+        self.stdout.write(
+            f"Peak throughput {peak['throughput']:.1f} req/s at {peak['users']} users "
+            f"(p95 {peak['p95_ms']:.1f} ms)."
+        )
+
+        endpoints = {
+            name: self._summarize(samples, options["duration"] * len(steps))
+            for name, samples in sorted(by_endpoint.items())
+        }
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        for name, summary in endpoints.items():
+            self.stdout.write(
+                f"{name:<10} {summary['requests']:>9} {summary['error_rate']:>7.2%} "
+                f"{summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f} {summary['p99_ms']:>8.1f}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump({"steps": results, "endpoints": endpoints}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
+
+    # ---------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------
+
+    @staticmethod
+    def _target(customer_org_id, account_id):
+        """Default the org/account to the first loaded event, as bench_compression does."""
+        if customer_org_id and account_id:
+            return customer_org_id, account_id
+        sample = ActivityEvent.objects.values("customer_org_id", "account_id").first()
+        if sample is None:
+            raise CommandError(
+                "No ActivityEvent rows loaded; pass --customer-org-id and --account-id."
+            )
+        return customer_org_id or sample["customer_org_id"], account_id or sample["account_id"]
+
+    @staticmethod
+    def _name_prefixes(customer_org_id):
+        """Two-letter last-name prefixes to type into the people search."""
+        names = Person.objects.filter(customer_org_id=customer_org_id).values_list(
+            "last_name", flat=True
+        )[:1000]
+        return sorted({name[:2] for name in names if len(name) >= 2}) or ["a"]
+
+    def _run_step(self, users):
+        deadline = time.monotonic() + self.options["duration"]
+        samples = [[] for _ in range(users)]
+        sessions = [0] * users
+        threads = [
+            threading.Thread(
+                target=self._virtual_user,
+                args=(deadline, samples[i], sessions, i, random.Random(self.rng.random())),
+                daemon=True,
+            )
+            for i in range(users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return [sample for user_samples in samples for sample in user_samples], sum(sessions)
+
+    def _virtual_user(self, deadline, samples, sessions, index, rng):
+        """Run sessions back to back until ``deadline``, appending to ``samples``."""
+        client = _Client(self.options["base_url"], self.options["timeout"])
+        bundle = None
+        if self.options["bundle_url"]:
+            bundle = _Client(self.options["bundle_url"], self.options["timeout"])
+        think = self.options["think_time"]
+        try:
+            while time.monotonic() < deadline:
+                for name, target, path, params in self._session(rng, client, bundle):
+                    if time.monotonic() >= deadline:
+                        return
+                    latency, ok = target.get(path, params)
+                    samples.append((name, latency, ok))
+                    if think:
+                        time.sleep(rng.expovariate(1 / think))
+                else:
+                    sessions[index] += 1
+        finally:
+            client.close()
+            if bundle is not None:
+                bundle.close()
+
+    def _session(self, rng, client, bundle):
+        """Yield ``(endpoint, client, path, params)`` for one dashboard session."""
+        org = {"customer_org_id": self.customer_org_id}
+        account = {**org, "account_id": self.account_id}
+        options = self.options
+
+        if bundle is not None:
+            yield "bundle", bundle, bundle.path, {}
+        yield "stats", client, "/api/dashboard/stats/", org
+        yield "chart", client, "/api/events/chart/", account
+        for page in range(1, options["pages"] + 1):
+            yield "scroll", client, "/api/events/", {
+                **account, "page": page, "page_size": options["page_size"]
+            }
+        for _ in range(options["jumps"]):
+            yield "jump", client, "/api/events/", {
+                **account, "page": rng.randint(1, self.total_pages),
+                "page_size": options["page_size"],
+            }
+        for _ in range(options["lookups"]):
+            yield "people", client, "/api/people/", {
+                **org, "q": rng.choice(self.prefixes), "page_size": 20
+            }
+
+    @staticmethod
+    def _summarize(samples, seconds):
+        latencies = sorted(latency for _, latency, _ in samples)
+        errors = sum(1 for _, _, ok in samples if not ok)
+        return {
+            "requests": len(samples),
+            "throughput": len(samples) / seconds if seconds else 0.0,
+            "error_rate": errors / len(samples) if samples else 0.0,
+            "p50_ms": _percentile(latencies, 0.50),
+            "p95_ms": _percentile(latencies, 0.95),
+            "p99_ms": _percentile(latencies, 0.99),
+        }
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _Client:
+    """Keep-alive HTTP connection for one virtual user."""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise CommandError(f"Not an http(s) URL: {url}")
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.path = parts.path or "/"
+        self.timeout = timeout
+        self.connection = None
+
+    def _connect(self):
+        factory = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return factory(self.netloc, timeout=self.timeout)
+
+    def get(self, path, params):
+        """Return ``(latency_ms, ok)``; transport errors count as failures."""
+        url = f"{path}?{urlencode(params)}" if params else path
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = self._connect()
+            self.connection.request("GET", url, headers={"Accept-Encoding": "gzip, br"})
+            response = self.connection.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            self.close()
+            return (time.perf_counter() - start) * 1000, False
+        return (time.perf_counter() - start) * 1000, ok
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,48 @@
+from django.utils.cache import patch_vary_headers
+
+from . import compression
+
+API_PATH_PREFIX = "/api/"
+COMPRESSIBLE_CONTENT_TYPE = "application/json"
+
+
+class CompressionMiddleware:
+    """Compress API responses according to the client's ``Accept-Encoding``.
+
+    Only JSON responses under ``/api/`` are compressed. They hold no secrets
+    the client did not ask for, whereas compressing pages that reflect input
+    next to a CSRF token (the admin) would expose them to BREACH.
+
+    Responses that already carry a ``Content-Encoding`` (for example the
+    pre-compressed bodies served by ``api.cache.cached_response``) and streaming
+    responses such as the SSE endpoint are passed through untouched.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if not request.path.startswith(API_PATH_PREFIX):
+            return response
+        if not response.get("Content-Type", "").startswith(COMPRESSIBLE_CONTENT_TYPE):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = compression.negotiate(
+            request.headers.get("Accept-Encoding"), len(response.content)
+        )
+        if encoding is None:
+            return response
+
+        compressed = compression.compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        return response
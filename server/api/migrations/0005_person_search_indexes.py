@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-19 13:19
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_alter_person_unique_together'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='person',
+            options={'ordering': ['last_name', 'first_name', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['customer_org_id', 'last_name', 'first_name', 'id'], name='person_org_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(models.F('customer_org_id'), django.db.models.functions.text.Lower('first_name'), name='person_org_first_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(models.F('customer_org_id'), django.db.models.functions.text.Lower('last_name'), name='person_org_last_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(models.F('customer_org_id'), django.db.models.functions.text.Lower('email_address'), name='person_org_email_lower_idx'),
+        ),
+        # Without fresh statistics SQLite keeps planning prefix searches on
+        # person_org_name_idx instead of the Lower() indexes.
+        migrations.RunSQL("ANALYZE api_person", migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2 on 2026-10-19 13:24
+
+from django.db import migrations, models
+
+
+def backfill_change_seq(apps, schema_editor):
+    """Number existing events 1..N per account in insertion (id) order."""
+    ActivityEvent = apps.get_model("api", "ActivityEvent")
+    AccountChangeSequence = apps.get_model("api", "AccountChangeSequence")
+
+    accounts = (
+        ActivityEvent.objects.order_by()
+        .values_list("customer_org_id", "account_id")
+        .distinct()
+    )
+    for customer_org_id, account_id in list(accounts):
+        seq = 0
+        batch = []
+        events = (
+            ActivityEvent.objects.filter(customer_org_id=customer_org_id, account_id=account_id)
+            .order_by("id")
+            .only("id")
+        )
+        for event in events.iterator(chunk_size=2000):
+            seq += 1
+            event.change_seq = seq
+            batch.append(event)
+            if len(batch) >= 2000:
+                ActivityEvent.objects.bulk_update(batch, ["change_seq"])
+                batch.clear()
+        if batch:
+            ActivityEvent.objects.bulk_update(batch, ["change_seq"])
+        AccountChangeSequence.objects.create(
+            customer_org_id=customer_org_id, account_id=account_id, last_seq=seq
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_person_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountChangeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_org_id', models.CharField(max_length=60)),
+                ('account_id', models.CharField(max_length=50)),
+                ('last_seq', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ActivityEventTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_org_id', models.CharField(max_length=60)),
+                ('account_id', models.CharField(max_length=50)),
+                ('touchpoint_id', models.CharField(max_length=64)),
+                ('event_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='activityevent',
+            name='change_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='activityevent',
+            index=models.Index(fields=['customer_org_id', 'account_id', 'change_seq'], name='event_account_change_seq_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='accountchangesequence',
+            unique_together={('customer_org_id', 'account_id')},
+        ),
+        migrations.AddIndex(
+            model_name='activityeventtombstone',
+            index=models.Index(fields=['customer_org_id', 'account_id', 'change_seq'], name='tombstone_account_seq_idx'),
+        ),
+        migrations.RunPython(backfill_change_seq, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-19 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_activityevent_change_tracking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrgDataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_org_id', models.CharField(max_length=60, unique=True)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2 on 2026-10-19 13:28
+
+from django.db import migrations, models
+
+
+def backfill_partition_month(apps, schema_editor):
+    """Derive the partition key of existing rows and register their partitions."""
+    ActivityEvent = apps.get_model("api", "ActivityEvent")
+    EventPartition = apps.get_model("api", "EventPartition")
+
+    months = set()
+    batch = []
+    for event in ActivityEvent.objects.order_by().only("id", "timestamp").iterator(chunk_size=2000):
+        event.partition_month = event.timestamp.date().replace(day=1)
+        months.add(event.partition_month)
+        batch.append(event)
+        if len(batch) >= 2000:
+            ActivityEvent.objects.bulk_update(batch, ["partition_month"])
+            batch.clear()
+    if batch:
+        ActivityEvent.objects.bulk_update(batch, ["partition_month"])
+    EventPartition.objects.bulk_create(
+        [EventPartition(month=month) for month in sorted(months)], ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_orgdataversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventPartition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+                ('status', models.CharField(choices=[('hot', 'Hot'), ('archived', 'Archived')], default='hot', max_length=10)),
+                ('archived_rows', models.BigIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['month'],
+            },
+        ),
+        migrations.AddField(
+            model_name='activityevent',
+            name='partition_month',
+            field=models.DateField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='activityevent',
+            index=models.Index(fields=['customer_org_id', 'partition_month', 'timestamp'], name='event_org_partition_ts_idx'),
+        ),
+        migrations.RunPython(backfill_partition_month, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='activityevent',
+            name='partition_month',
+            field=models.DateField(),
+        ),
+    ]
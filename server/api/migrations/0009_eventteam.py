@@ -0,0 +1,65 @@
+# Generated by Django 5.2 on 2026-10-19 13:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_event_teams(apps, schema_editor):
+    """One row per ``involved_team_ids`` entry of the existing events, in id batches."""
+    ActivityEvent = apps.get_model("api", "ActivityEvent")
+    EventTeam = apps.get_model("api", "EventTeam")
+
+    last_id = 0
+    while True:
+        batch = list(
+            ActivityEvent.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list(
+                "id", "customer_org_id", "account_id", "timestamp", "channel", "involved_team_ids"
+            )[:2000]
+        )
+        if not batch:
+            break
+        EventTeam.objects.bulk_create(
+            [
+                EventTeam(
+                    event_id=event_id,
+                    team_id=team_id,
+                    customer_org_id=org_id,
+                    account_id=account_id,
+                    timestamp=timestamp,
+                    channel=channel,
+                )
+                for event_id, org_id, account_id, timestamp, channel, values in batch
+                for team_id in dict.fromkeys(values if isinstance(values, list) else [])
+            ],
+            batch_size=1000,
+        )
+        last_id = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_event_partitions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventTeam',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team_id', models.CharField(max_length=100)),
+                ('customer_org_id', models.CharField(max_length=60)),
+                ('account_id', models.CharField(max_length=50)),
+                ('timestamp', models.DateTimeField()),
+                ('channel', models.CharField(max_length=100)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='team_links', to='api.activityevent')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer_org_id', 'team_id', 'timestamp'], name='eventteam_org_team_ts_idx'), models.Index(fields=['customer_org_id', 'timestamp'], name='eventteam_org_ts_idx')],
+                'unique_together': {('event', 'team_id')},
+            },
+        ),
+        migrations.RunPython(backfill_event_teams, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2 on 2026-10-19 13:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_event_opportunities(apps, schema_editor):
+    """One row per ``related_opportunity_ids`` entry of the existing events, in id batches."""
+    ActivityEvent = apps.get_model("api", "ActivityEvent")
+    EventOpportunity = apps.get_model("api", "EventOpportunity")
+
+    last_id = 0
+    while True:
+        batch = list(
+            ActivityEvent.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list(
+                "id", "customer_org_id", "timestamp", "channel", "related_opportunity_ids"
+            )[:2000]
+        )
+        if not batch:
+            break
+        EventOpportunity.objects.bulk_create(
+            [
+                EventOpportunity(
+                    event_id=event_id,
+                    opportunity_id=opportunity_id,
+                    customer_org_id=org_id,
+                    timestamp=timestamp,
+                    channel=channel,
+                )
+                for event_id, org_id, timestamp, channel, values in batch
+                for opportunity_id in dict.fromkeys(values if isinstance(values, list) else [])
+            ],
+            batch_size=1000,
+        )
+        last_id = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_eventteam'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventOpportunity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('opportunity_id', models.CharField(max_length=100)),
+                ('customer_org_id', models.CharField(max_length=60)),
+                ('timestamp', models.DateTimeField()),
+                ('channel', models.CharField(max_length=100)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opportunity_links', to='api.activityevent')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer_org_id', 'opportunity_id', 'timestamp', 'event'], name='eventopp_org_opp_ts_idx')],
+                'unique_together': {('event', 'opportunity_id')},
+            },
+        ),
+        migrations.RunPython(backfill_event_opportunities, migrations.RunPython.noop),
+    ]
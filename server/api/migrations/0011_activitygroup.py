@@ -0,0 +1,88 @@
+# Generated by Django 5.2 on 2026-10-19 13:31
+
+from django.db import migrations, models
+
+
+def backfill_activity_groups(apps, schema_editor):
+    """Summarize the existing grouped events, one group at a time."""
+    ActivityEvent = apps.get_model("api", "ActivityEvent")
+    ActivityGroup = apps.get_model("api", "ActivityGroup")
+
+    events = (
+        ActivityEvent.objects.filter(activity_grouping_id__isnull=False)
+        .order_by("customer_org_id", "account_id", "activity_grouping_id", "timestamp", "id")
+        .values_list(
+            "customer_org_id", "account_id", "activity_grouping_id", "id", "timestamp", "people"
+        )
+    )
+    summaries = []
+    current = None
+    for org_id, account_id, grouping_id, event_id, timestamp, people in events.iterator(chunk_size=2000):
+        key = (org_id, account_id, grouping_id)
+        if current is None or current["key"] != key:
+            current = {"key": key, "count": 0, "first": timestamp, "participants": set()}
+            summaries.append(current)
+        current["count"] += 1
+        current["last"] = timestamp
+        current["latest"] = event_id
+        current["participants"].update(
+            p["id"] for p in people or [] if isinstance(p, dict) and p.get("id")
+        )
+
+    ActivityGroup.objects.bulk_create(
+        [
+            ActivityGroup(
+                customer_org_id=s["key"][0],
+                account_id=s["key"][1],
+                activity_grouping_id=s["key"][2],
+                event_count=s["count"],
+                first_timestamp=s["first"],
+                last_timestamp=s["last"],
+                latest_event_id=s["latest"],
+                participants=sorted(s["participants"]),
+            )
+            for s in summaries
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_eventopportunity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_org_id', models.CharField(max_length=60)),
+                ('account_id', models.CharField(max_length=50)),
+                ('activity_grouping_id', models.CharField(max_length=255)),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('first_timestamp', models.DateTimeField()),
+                ('last_timestamp', models.DateTimeField()),
+                ('latest_event_id', models.BigIntegerField()),
+                ('participants', models.JSONField(default=list)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='activityevent',
+            index=models.Index(fields=['customer_org_id', 'account_id', 'activity_grouping_id', 'timestamp'], name='event_account_group_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitygroup',
+            index=models.Index(fields=['customer_org_id', 'account_id', 'last_timestamp'], name='group_account_last_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitygroup',
+            index=models.Index(fields=['customer_org_id', 'last_timestamp'], name='group_org_last_ts_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='activitygroup',
+            unique_together={('customer_org_id', 'account_id', 'activity_grouping_id')},
+        ),
+        migrations.RunPython(backfill_activity_groups, migrations.RunPython.noop),
+    ]
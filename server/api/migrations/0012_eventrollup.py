@@ -0,0 +1,58 @@
+# Generated by Django 5.2 on 2026-10-19 13:45
+
+from collections import Counter
+from datetime import timedelta, timezone
+
+from django.db import migrations, models
+
+
+def backfill_event_rollups(apps, schema_editor):
+    """Count the database-resident events per UTC day, week and month.
+
+    Months already moved to the Parquet archive are added by the
+    ``backfill_rollups`` command.
+    """
+    ActivityEvent = apps.get_model("api", "ActivityEvent")
+    EventRollup = apps.get_model("api", "EventRollup")
+
+    counts = Counter()
+    events = ActivityEvent.objects.order_by().values_list("customer_org_id", "account_id", "timestamp")
+    for org_id, account_id, timestamp in events.iterator(chunk_size=2000):
+        day = timestamp.astimezone(timezone.utc).date()
+        counts[(org_id, account_id, "day", day)] += 1
+        counts[(org_id, account_id, "week", day - timedelta(days=day.weekday()))] += 1
+        counts[(org_id, account_id, "month", day.replace(day=1))] += 1
+
+    EventRollup.objects.bulk_create(
+        [
+            EventRollup(customer_org_id=org_id, account_id=account_id, level=level, bucket=bucket, count=count)
+            for (org_id, account_id, level, bucket), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_activitygroup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_org_id', models.CharField(max_length=60)),
+                ('account_id', models.CharField(max_length=50)),
+                ('level', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('bucket', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer_org_id', 'level', 'bucket'], name='rollup_org_level_bucket_idx')],
+                'unique_together': {('customer_org_id', 'account_id', 'level', 'bucket')},
+            },
+        ),
+        migrations.RunPython(backfill_event_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 5.2 on 2026-10-19 14:47
+
+import django.db.models.deletion
+import json
+
+from django.db import migrations, models
+
+
+def backfill_archived_counts(apps, schema_editor):
+    """Count the already archived events, and fold them back into their group summaries.
+
+    Earlier archive runs shrank ``ActivityGroup`` rows to their hot events.
+    """
+    EventPartition = apps.get_model("api", "EventPartition")
+    EventPartitionCount = apps.get_model("api", "EventPartitionCount")
+    ActivityGroup = apps.get_model("api", "ActivityGroup")
+
+    partitions = list(EventPartition.objects.filter(status="archived"))
+    if not partitions:
+        return
+    import pyarrow.parquet as pq
+
+    from api import archive
+
+    columns = [
+        "id", "customer_org_id", "account_id", "timestamp",
+        "activity_grouping_id", "involved_team_ids", "people",
+    ]
+    groups = {}
+    for partition in partitions:
+        counts = {}
+        for path in archive.files_for(partition.month):
+            for row in pq.read_table(path, columns=columns).to_pylist():
+                teams = json.loads(row["involved_team_ids"]) if row["involved_team_ids"] else []
+                for team_id in ["", *dict.fromkeys(teams)]:
+                    key = (row["customer_org_id"], row["account_id"], team_id)
+                    count = counts.setdefault(key, EventPartitionCount(
+                        partition=partition,
+                        customer_org_id=key[0],
+                        account_id=key[1],
+                        team_id=team_id,
+                        first_timestamp=row["timestamp"],
+                        last_timestamp=row["timestamp"],
+                    ))
+                    count.event_count += 1
+                    count.ungrouped_count += not row["activity_grouping_id"]
+                    count.first_timestamp = min(count.first_timestamp, row["timestamp"])
+                    count.last_timestamp = max(count.last_timestamp, row["timestamp"])
+                if row["activity_grouping_id"]:
+                    key = (row["customer_org_id"], row["account_id"], row["activity_grouping_id"])
+                    people = json.loads(row["people"]) if row["people"] else []
+                    group = groups.setdefault(key, {"count": 0, "stamps": [], "latest": None, "participants": set()})
+                    group["count"] += 1
+                    group["stamps"].append(row["timestamp"])
+                    group["latest"] = max(filter(None, (group["latest"], (row["timestamp"], row["id"]))))
+                    group["participants"].update(
+                        p["id"] for p in people if isinstance(p, dict) and p.get("id")
+                    )
+        EventPartitionCount.objects.bulk_create(counts.values(), batch_size=1000)
+
+    for (org_id, account_id, grouping_id), archived in groups.items():
+        group = ActivityGroup.objects.filter(
+            customer_org_id=org_id, account_id=account_id, activity_grouping_id=grouping_id
+        ).first()
+        first, last = min(archived["stamps"]), max(archived["stamps"])
+        if group is None:
+            group = ActivityGroup(
+                customer_org_id=org_id,
+                account_id=account_id,
+                activity_grouping_id=grouping_id,
+                first_timestamp=first,
+                last_timestamp=last,
+                latest_event_id=archived["latest"][1],
+            )
+        elif archived["latest"][0] > group.last_timestamp:
+            group.last_timestamp = last
+            group.latest_event_id = archived["latest"][1]
+        group.event_count += archived["count"]
+        group.first_timestamp = min(group.first_timestamp, first)
+        group.participants = sorted(set(group.participants) | archived["participants"])
+        group.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_eventrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventPartitionCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_org_id', models.CharField(max_length=60)),
+                ('account_id', models.CharField(max_length=50)),
+                ('team_id', models.CharField(blank=True, default='', max_length=100)),
+                ('event_count', models.BigIntegerField(default=0)),
+                ('ungrouped_count', models.BigIntegerField(default=0)),
+                ('first_timestamp', models.DateTimeField()),
+                ('last_timestamp', models.DateTimeField()),
+                ('partition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counts', to='api.eventpartition')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer_org_id', 'team_id', 'account_id'], name='partcount_org_team_acct_idx')],
+                'unique_together': {('partition', 'customer_org_id', 'account_id', 'team_id')},
+            },
+        ),
+        migrations.RunPython(backfill_archived_counts, migrations.RunPython.noop),
+    ]
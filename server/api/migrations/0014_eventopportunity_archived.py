@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-19 14:52
+
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_archived_opportunities(apps, schema_editor):
+    """Index the opportunities of events archived before the index covered them."""
+    EventPartition = apps.get_model("api", "EventPartition")
+    EventOpportunity = apps.get_model("api", "EventOpportunity")
+
+    months = list(EventPartition.objects.filter(status="archived").values_list("month", flat=True))
+    if not months:
+        return
+    import pyarrow.parquet as pq
+
+    from api import archive
+
+    columns = ["id", "customer_org_id", "timestamp", "channel", "related_opportunity_ids"]
+    for month in months:
+        for path in archive.files_for(month):
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=2000, columns=columns):
+                EventOpportunity.objects.bulk_create(
+                    [
+                        EventOpportunity(
+                            event_id=row["id"],
+                            opportunity_id=opportunity_id,
+                            customer_org_id=row["customer_org_id"],
+                            timestamp=row["timestamp"],
+                            channel=row["channel"],
+                        )
+                        for row in batch.to_pylist()
+                        for opportunity_id in dict.fromkeys(
+                            json.loads(row["related_opportunity_ids"] or "[]") or []
+                        )
+                    ],
+                    batch_size=1000,
+                    ignore_conflicts=True,
+                )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_eventpartitioncount'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='eventopportunity',
+            name='event',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='opportunity_links', to='api.activityevent'),
+        ),
+        migrations.RunPython(backfill_archived_opportunities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,115 @@
+"""Multi-resolution event-count series for the chart minimap.
+
+The minimap draws an account's (or an organisation's) whole history in a strip
+a few hundred pixels wide. ``series`` picks the finest level whose number of
+buckets over the range is at most ``OVERSAMPLE`` per requested point, reads
+the counts from the precomputed ``EventRollup`` day/week/month levels (hours
+are counted live, and only for zoomed ranges short enough), zero-fills empty
+buckets and downsamples the result to ``width`` points with LTTB (see
+``api.downsample``). The payload therefore grows with the screen width, not
+with the length of the history.
+
+All buckets are UTC, like the rollups.
+"""
+
+from datetime import datetime, time, timezone as dt_timezone
+
+import numpy as np
+from django.db.models import Max, Min, Sum
+
+from . import bucketing, partitions, rollups
+from .downsample import lttb
+from .models import EventRollup
+
+LEVELS = ("hour", "day", "week", "month")
+# Buckets allowed per output point before moving to a coarser level; LTTB
+# needs some surplus to choose from.
+OVERSAMPLE = 4
+
+
+def _ms(moment):
+    return bucketing.epoch_ms(moment)
+
+
+def bucket_span(start, end, level):
+    """Return the first and last bucket ordinal of ``level`` in ``[start, end]``."""
+    first, last = bucketing.ordinals(np.array([_ms(start), _ms(end)], dtype=np.int64), level)
+    return int(first), int(last)
+
+
+def choose_level(start, end, width, levels=LEVELS):
+    """Finest of ``levels`` with at most ``width * OVERSAMPLE`` buckets in range."""
+    for level in levels:
+        first, last = bucket_span(start, end, level)
+        if last - first + 1 <= width * OVERSAMPLE:
+            return level
+    return levels[-1]
+
+
+def history(customer_org_id, account_id=None):
+    """``(start, end)`` of all rolled-up events of the slice, or ``None``."""
+    qs = EventRollup.objects.filter(customer_org_id=customer_org_id, level=EventRollup.DAY)
+    if account_id:
+        qs = qs.filter(account_id=account_id)
+    span = qs.aggregate(start=Min("bucket"), end=Max("bucket"))
+    if span["start"] is None:
+        return None
+    return (
+        datetime.combine(span["start"], time.min, dt_timezone.utc),
+        datetime.combine(span["end"], time.max, dt_timezone.utc),
+    )
+
+
+def _rollup_counts(customer_org_id, account_id, level, start, end):
+    qs = EventRollup.objects.filter(
+        customer_org_id=customer_org_id,
+        level=level,
+        bucket__gte=rollups.bucket_of(start, level),
+        bucket__lte=rollups.bucket_of(end, level),
+    )
+    if account_id:
+        qs = qs.filter(account_id=account_id)
+    rows = list(qs.order_by().values("bucket").annotate(total=Sum("count")).values_list("bucket", "total"))
+    days = np.fromiter(
+        ((bucket - bucketing.EPOCH).days for bucket, _ in rows), dtype=np.int64, count=len(rows)
+    )
+    counts = np.fromiter((total for _, total in rows), dtype=np.int64, count=len(rows))
+    return bucketing.ordinals(days * bucketing.DAY_MS, level), counts
+
+
+def _hour_counts(customer_org_id, account_id, start, end):
+    stamps, _ = partitions.event_arrays(customer_org_id, start, end, account_id=account_id)
+    result = bucketing.bucket_counts(stamps, "hour")
+    return result["ordinals"], result["total"]
+
+
+def series(customer_org_id, start, end, width, account_id=None, levels=LEVELS):
+    """Event counts in ``[start, end]`` as at most ``width`` representative points.
+
+    Returns ``{"level", "width", "source_points", "total_count", "range",
+    "points": [{"date": label, "count": n}, ...]}``. ``source_points`` is the
+    number of buckets before downsampling; downsampled points keep the count
+    of the bucket they stand for.
+    """
+    level = choose_level(start, end, width, levels)
+    first, last = bucket_span(start, end, level)
+    if level == "hour":
+        ordinals, counts = _hour_counts(customer_org_id, account_id, start, end)
+    else:
+        ordinals, counts = _rollup_counts(customer_org_id, account_id, level, start, end)
+
+    dense = np.zeros(last - first + 1, dtype=np.int64)
+    inside = (ordinals >= first) & (ordinals <= last)
+    dense[ordinals[inside] - first] = counts[inside]
+
+    kept = lttb(np.arange(len(dense)), dense, width)
+    return {
+        "level": level,
+        "width": width,
+        "source_points": len(dense),
+        "total_count": int(dense.sum()),
+        "range": {"start": start.isoformat(), "end": end.isoformat()},
+        "points": [
+            {"date": bucketing.label(first + i, level), "count": int(dense[i])} for i in kept
+        ],
+    }
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 
 # Create your models here.
 
@@ -40,6 +41,14 @@ class ActivityEvent(models.Model):
     # Grouping
     activity_grouping_id = models.CharField(max_length=255, null=True)
 
+    # Change tracking: per-account monotonic sequence number, bumped on every
+    # insert or update (see ``api.changes``). Drives ``/api/events/changes/``.
+    change_seq = models.BigIntegerField(default=0)
+
+    # Partition key: first day of the (UTC) month of ``timestamp``. Date-bounded
+    # queries are routed through it (see ``api.partitions``).
+    partition_month = models.DateField()
+
     # Meta / dunder helpers
     class Meta:
         ordering = ["-timestamp"]
@@ -48,10 +57,275 @@ class ActivityEvent(models.Model):
             "account_id",
             "touchpoint_id",
         )
+        indexes = [
+            models.Index(
+                fields=["customer_org_id", "account_id", "change_seq"],
+                name="event_account_change_seq_idx",
+            ),
+            models.Index(
+                fields=["customer_org_id", "partition_month", "timestamp"],
+                name="event_org_partition_ts_idx",
+            ),
+            models.Index(
+                fields=["customer_org_id", "account_id", "activity_grouping_id", "timestamp"],
+                name="event_account_group_ts_idx",
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.channel} | {self.activity[:50]}... @ {self.timestamp.isoformat()}"
 
+    def save(self, *args, **kwargs):
+        # Model.save sends pre_save outside any transaction; the change_seq
+        # allocated there must commit together with the row (see api.changes).
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+class ActivityGroup(models.Model):
+    """Precomputed summary of the events sharing an ``activity_grouping_id``.
+
+    Backs the collapsed (``grouped=true``) view of ``/api/events/``: one row per
+    email thread or meeting series instead of one per event. Maintained by
+    ``api.groups``. ``latest_event_id`` is deliberately not a foreign key so
+    that archiving the latest event does not cascade to the summary.
+    """
+
+    customer_org_id = models.CharField(max_length=60)
+    account_id = models.CharField(max_length=50)
+    activity_grouping_id = models.CharField(max_length=255)
+
+    event_count = models.PositiveIntegerField(default=0)
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    latest_event_id = models.BigIntegerField()
+    # Sorted union of the person ids appearing in the group's events.
+    participants = models.JSONField(default=list)
+
+    class Meta:
+        unique_together = ("customer_org_id", "account_id", "activity_grouping_id")
+        indexes = [
+            models.Index(
+                fields=["customer_org_id", "account_id", "last_timestamp"],
+                name="group_account_last_ts_idx",
+            ),
+            models.Index(
+                fields=["customer_org_id", "last_timestamp"],
+                name="group_org_last_ts_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.activity_grouping_id} ({self.event_count} events)"
+
+
+class EventRollup(models.Model):
+    """Event count of one (org, account) per UTC day, ISO week or month.
+
+    The precomputed levels behind the ``/api/events/minimap/`` endpoints.
+    Maintained with deltas by ``api.rollups`` (ingest and model signals), so
+    counts of months moved to the cold archive are kept.
+    """
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    LEVEL_CHOICES = [(DAY, "Day"), (WEEK, "Week"), (MONTH, "Month")]
+
+    customer_org_id = models.CharField(max_length=60)
+    account_id = models.CharField(max_length=50)
+    level = models.CharField(max_length=5, choices=LEVEL_CHOICES)
+    # First day of the bucket (the Monday for weeks).
+    bucket = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("customer_org_id", "account_id", "level", "bucket")
+        indexes = [
+            models.Index(
+                fields=["customer_org_id", "level", "bucket"],
+                name="rollup_org_level_bucket_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.account_id} {self.level} {self.bucket}: {self.count}"
+
+
+class EventTeam(models.Model):
+    """One row per (event, team) pair from ``ActivityEvent.involved_team_ids``.
+
+    Lets team filters and per-team breakdowns use an index instead of scanning
+    the JSON column. ``customer_org_id``, ``account_id``, ``timestamp`` and
+    ``channel`` are copied from the event so breakdowns are answered from this
+    table alone. Maintained by ``api.dimensions``.
+    """
+
+    event = models.ForeignKey(ActivityEvent, on_delete=models.CASCADE, related_name="team_links")
+    team_id = models.CharField(max_length=100)
+    customer_org_id = models.CharField(max_length=60)
+    account_id = models.CharField(max_length=50)
+    timestamp = models.DateTimeField()
+    channel = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ("event", "team_id")
+        indexes = [
+            models.Index(
+                fields=["customer_org_id", "team_id", "timestamp"],
+                name="eventteam_org_team_ts_idx",
+            ),
+            models.Index(
+                fields=["customer_org_id", "timestamp"],
+                name="eventteam_org_ts_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.team_id} <- {self.event_id}"
+
+
+class EventOpportunity(models.Model):
+    """Reverse index: one row per entry in ``ActivityEvent.related_opportunity_ids``.
+
+    Answers "which touchpoints influenced opportunity X" with an index range
+    scan instead of a JSON scan over the org's events. Maintained by
+    ``api.dimensions``. ``archive_events`` keeps the rows of the events it
+    moves to the cold tier, so the link is not enforced by the database;
+    deleting an event still removes its rows.
+    """
+
+    event = models.ForeignKey(
+        ActivityEvent,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        related_name="opportunity_links",
+    )
+    opportunity_id = models.CharField(max_length=100)
+    customer_org_id = models.CharField(max_length=60)
+    timestamp = models.DateTimeField()
+    channel = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ("event", "opportunity_id")
+        indexes = [
+            models.Index(
+                fields=["customer_org_id", "opportunity_id", "timestamp", "event"],
+                name="eventopp_org_opp_ts_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.opportunity_id} <- {self.event_id}"
+
+
+class EventPartition(models.Model):
+    """Catalog entry for one monthly partition of ``ActivityEvent``.
+
+    A partition is ``hot`` while all its rows live in the database and
+    ``archived`` once ``archive_events`` has moved rows into compressed Parquet
+    files under ``EVENT_ARCHIVE_DIR``. Rows ingested into an archived month
+    later stay hot until the next archive run.
+    """
+
+    HOT = "hot"
+    ARCHIVED = "archived"
+    STATUS_CHOICES = [(HOT, "Hot"), (ARCHIVED, "Archived")]
+
+    month = models.DateField(unique=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=HOT)
+    archived_rows = models.BigIntegerField(default=0)
+    archived_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["month"]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.month:%Y-%m} ({self.status})"
+
+
+class EventPartitionCount(models.Model):
+    """Archived events of one (org, account) in a partition, optionally per team.
+
+    Written by ``archive_events`` alongside the Parquet file so listings can
+    total and page across both tiers without reading the archive: a row with
+    an empty ``team_id`` covers all the account's archived events of the
+    month, the others only those involving that team.
+    """
+
+    partition = models.ForeignKey(EventPartition, on_delete=models.CASCADE, related_name="counts")
+    customer_org_id = models.CharField(max_length=60)
+    account_id = models.CharField(max_length=50)
+    team_id = models.CharField(max_length=100, blank=True, default="")
+
+    event_count = models.BigIntegerField(default=0)
+    # Events without an ``activity_grouping_id``: rows of the collapsed view.
+    ungrouped_count = models.BigIntegerField(default=0)
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("partition", "customer_org_id", "account_id", "team_id")
+        indexes = [
+            models.Index(
+                fields=["customer_org_id", "team_id", "account_id"],
+                name="partcount_org_team_acct_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.partition} {self.customer_org_id}/{self.account_id}: {self.event_count}"
+
+
+class ActivityEventTombstone(models.Model):
+    """Records a deleted ActivityEvent so delta-sync clients can evict it."""
+
+    customer_org_id = models.CharField(max_length=60)
+    account_id = models.CharField(max_length=50)
+    touchpoint_id = models.CharField(max_length=64)
+    event_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["customer_org_id", "account_id", "change_seq"],
+                name="tombstone_account_seq_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"deleted {self.touchpoint_id} @ {self.change_seq}"
+
+
+class AccountChangeSequence(models.Model):
+    """High-water mark of ``change_seq`` handed out for one (org, account)."""
+
+    customer_org_id = models.CharField(max_length=60)
+    account_id = models.CharField(max_length=50)
+    last_seq = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("customer_org_id", "account_id")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.customer_org_id}/{self.account_id} @ {self.last_seq}"
+
+
+class OrgDataVersion(models.Model):
+    """Counter bumped whenever an organisation's events or people change.
+
+    Response caches include it in their keys (see ``api.cache``), so a single
+    indexed lookup tells whether a cached payload is still current.
+    """
+
+    customer_org_id = models.CharField(max_length=60, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.customer_org_id} v{self.version}"
+
+
 class Person(models.Model):
     """Represents a single person/contact belonging to a customer organisation.
 
@@ -71,8 +345,26 @@ class Person(models.Model):
     job_title = models.CharField(max_length=255, null=True, blank=True)
 
     class Meta:
-        ordering = ["last_name", "first_name"]
+        ordering = ["last_name", "first_name", "id"]
         # No extra uniqueness constraints needed: `id` is the primary key.
+        indexes = [
+            # Keyset pagination walks the org's people in Meta.ordering order.
+            models.Index(
+                fields=["customer_org_id", "last_name", "first_name", "id"],
+                name="person_org_name_idx",
+            ),
+            # Case-insensitive prefix search (type-ahead) is answered as a
+            # range scan over these expression indexes.
+            models.Index(
+                "customer_org_id", Lower("first_name"), name="person_org_first_lower_idx"
+            ),
+            models.Index(
+                "customer_org_id", Lower("last_name"), name="person_org_last_lower_idx"
+            ),
+            models.Index(
+                "customer_org_id", Lower("email_address"), name="person_org_email_lower_idx"
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.first_name} {self.last_name} <{self.email_address}>"
@@ -0,0 +1,344 @@
+"""Monthly partitioning of ``ActivityEvent`` and tier-aware query routing.
+
+Every event carries ``partition_month`` (the first day of its UTC month) and
+the ``EventPartition`` catalog lists the months that exist. Date-bounded
+queries go through this module, which
+
+* restricts the hot-tier SQL to the overlapping months via the
+  ``(customer_org_id, partition_month, timestamp)`` index, and
+* reads archived months from their Parquet files (see ``api.archive``) only
+  when the requested range overlaps them, and
+* keeps per-(org, account, team) counts of the archived events in
+  ``EventPartitionCount`` so listings can total and page across both tiers
+  without opening the files.
+
+The scheme is plain columns and indexes so it behaves the same on SQLite and
+Postgres; it does not use Postgres declarative partitioning, which would
+require ``timestamp`` in the primary key and in the touchpoint unique
+constraint.
+"""
+
+import json
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection
+from django.db.models import Count, Max, Min, Q, Sum, TextField
+from django.db.models.functions import Cast, TruncDate
+
+from . import archive, bucketing
+from .models import ActivityEvent, EventPartition, EventPartitionCount, EventTeam
+
+
+def month_of(timestamp):
+    """Return the partition key (first day of the UTC month) for ``timestamp``."""
+    return timestamp.astimezone(dt_timezone.utc).date().replace(day=1)
+
+
+def month_range(month):
+    """``(start, end)`` datetimes of the partition ``month``, end exclusive."""
+    start = datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+    if month.month == 12:
+        return start, start.replace(year=month.year + 1, month=1)
+    return start, start.replace(month=month.month + 1)
+
+
+def assign(events):
+    """Set ``partition_month`` on unsaved events and register their partitions."""
+    months = set()
+    for event in events:
+        event.partition_month = month_of(event.timestamp)
+        months.add(event.partition_month)
+    EventPartition.objects.bulk_create(
+        [EventPartition(month=month) for month in sorted(months)], ignore_conflicts=True
+    )
+    return events
+
+
+def hot_events(customer_org_id, start, end, account_id=None):
+    """Queryset of database-resident events with ``start <= timestamp <= end``."""
+    qs = ActivityEvent.objects.filter(
+        customer_org_id=customer_org_id,
+        partition_month__gte=month_of(start),
+        partition_month__lte=month_of(end),
+        timestamp__gte=start,
+        timestamp__lte=end,
+    )
+    if account_id:
+        qs = qs.filter(account_id=account_id)
+    return qs
+
+
+def archived_months(start=None, end=None):
+    """Archived partition months overlapping ``[start, end]`` (open bounds allowed)."""
+    qs = EventPartition.objects.filter(status=EventPartition.ARCHIVED)
+    if start is not None:
+        qs = qs.filter(month__gte=month_of(start))
+    if end is not None:
+        qs = qs.filter(month__lte=month_of(end))
+    return list(qs.order_by("month").values_list("month", flat=True))
+
+
+def archive_generation():
+    """Hashable token that changes whenever ``archive_events`` moves rows."""
+    return tuple(
+        EventPartition.objects.filter(status=EventPartition.ARCHIVED)
+        .order_by("month")
+        .values_list("month", "archived_rows", "archived_at")
+    )
+
+
+def _archive_filters(customer_org_id, start, end, account_id):
+    filters = [("customer_org_id", "=", customer_org_id)]
+    if start is not None:
+        filters.append(("timestamp", ">=", start))
+    if end is not None:
+        filters.append(("timestamp", "<=", end))
+    if account_id:
+        filters.append(("account_id", "=", account_id))
+    return filters
+
+
+def archived_table(customer_org_id, columns, start=None, end=None, account_id=None,
+                   team_id=None, filters=(), months=None):
+    """``columns`` of the archived events of a slice as one ``pyarrow.Table``.
+
+    Returns ``None`` when no archived month overlaps ``[start, end]``, so
+    callers without archived data never import pyarrow. ``team_id`` keeps the
+    events whose ``involved_team_ids`` list that team; ``filters`` are extra
+    pyarrow filter tuples; ``months`` restricts the read to those archived
+    partitions.
+    """
+    months = archived_months(start, end) if months is None else sorted(months)
+    if not months:
+        return None
+    import pyarrow as pa
+
+    filters = _archive_filters(customer_org_id, start, end, account_id) + list(filters)
+    read_columns = list(dict.fromkeys([*columns, *(["involved_team_ids"] if team_id else [])]))
+    table = pa.concat_tables([archive.read(month, read_columns, filters) for month in months])
+    if team_id:
+        teams = table["involved_team_ids"].to_pylist()
+        table = table.filter(pa.array([team_id in (json.loads(t) if t else []) for t in teams]))
+    return table.select(list(columns))
+
+
+def archived_values(customer_org_id, ids, months=None):
+    """Archived events with ``ids`` as ``QuerySet.values()`` dicts, keyed by id.
+
+    ``months`` narrows the partitions searched (default: every archived one).
+    """
+    ids = list(ids)
+    if not ids:
+        return {}
+    found = {}
+    filters = [("customer_org_id", "=", customer_org_id), ("id", "in", ids)]
+    for month in archived_months() if months is None else sorted(months):
+        for row in archive.read(month, archive.schema().names, filters).to_pylist():
+            for name in archive.JSON_FIELDS:
+                row[name] = json.loads(row[name]) if row[name] else []
+            found[row["id"]] = row
+    return found
+
+
+def record_archived(partition, max_id):
+    """Add the hot events of ``partition`` up to ``max_id`` to its archived counts.
+
+    Call it once their archive file is written and before they (and their
+    ``EventTeam`` rows) are deleted, inside the same transaction.
+    """
+    stats = {
+        "event_count": Count("id"),
+        "ungrouped_count": Count("id", filter=Q(activity_grouping_id__isnull=True)),
+        "first_timestamp": Min("timestamp"),
+        "last_timestamp": Max("timestamp"),
+    }
+    events = ActivityEvent.objects.filter(partition_month=partition.month, id__lte=max_id).order_by()
+    rows = [
+        {**row, "team_id": ""}
+        for row in events.values("customer_org_id", "account_id").annotate(**stats)
+    ]
+    teams = EventTeam.objects.filter(
+        event__partition_month=partition.month, event_id__lte=max_id
+    ).order_by()
+    rows += teams.values("customer_org_id", "account_id", "team_id").annotate(
+        event_count=Count("id"),
+        ungrouped_count=Count("id", filter=Q(event__activity_grouping_id__isnull=True)),
+        first_timestamp=Min("timestamp"),
+        last_timestamp=Max("timestamp"),
+    )
+
+    existing = {
+        (count.customer_org_id, count.account_id, count.team_id): count
+        for count in partition.counts.all()
+    }
+    to_create, to_update = [], []
+    for row in rows:
+        count = existing.get((row["customer_org_id"], row["account_id"], row["team_id"]))
+        if count is None:
+            to_create.append(EventPartitionCount(partition=partition, **row))
+            continue
+        count.event_count += row["event_count"]
+        count.ungrouped_count += row["ungrouped_count"]
+        count.first_timestamp = min(count.first_timestamp, row["first_timestamp"])
+        count.last_timestamp = max(count.last_timestamp, row["last_timestamp"])
+        to_update.append(count)
+    EventPartitionCount.objects.bulk_create(to_create, batch_size=1000)
+    EventPartitionCount.objects.bulk_update(
+        to_update,
+        ["event_count", "ungrouped_count", "first_timestamp", "last_timestamp"],
+        batch_size=1000,
+    )
+
+
+def archived_counts(customer_org_id, account_id=None, team_id=None):
+    """Archived events of a listing slice per month, from ``EventPartitionCount``.
+
+    Returns ``{month: {"count", "ungrouped", "first", "last"}}`` in month
+    order; empty when nothing of the slice is archived.
+    """
+    qs = EventPartitionCount.objects.filter(
+        customer_org_id=customer_org_id,
+        team_id=team_id or "",
+        partition__status=EventPartition.ARCHIVED,
+    )
+    if account_id:
+        qs = qs.filter(account_id=account_id)
+    rows = qs.values("partition__month").annotate(
+        count=Sum("event_count"),
+        ungrouped=Sum("ungrouped_count"),
+        first=Min("first_timestamp"),
+        last=Max("last_timestamp"),
+    ).order_by("partition__month")
+    return {row.pop("partition__month"): row for row in rows}
+
+
+def count_by(customer_org_id, start, end, keys, account_id=None):
+    """Count events in ``[start, end]`` grouped by ``keys`` across both tiers.
+
+    ``keys`` are ActivityEvent field names, plus ``"day"`` for the UTC date of
+    the timestamp. Returns ``[{key: value, ..., "count": n}]`` sorted by key.
+    """
+    keys = tuple(keys)
+    counts = Counter()
+
+    qs = hot_events(customer_org_id, start, end, account_id).order_by()
+    if "day" in keys:
+        qs = qs.annotate(day=TruncDate("timestamp"))
+    for row in qs.values(*keys).annotate(count=Count("id")):
+        counts[tuple(row[k] for k in keys)] += row["count"]
+
+    months = archived_months(start, end)
+    if months:
+        import pyarrow.compute as pc
+
+        filters = _archive_filters(customer_org_id, start, end, account_id)
+        columns = {"id", "timestamp"} | (set(keys) - {"day"})
+        for month in months:
+            table = archive.read(month, columns, filters)
+            if "day" in keys:
+                table = table.append_column("day", pc.cast(table["timestamp"], "date32"))
+            for row in table.group_by(list(keys)).aggregate([("id", "count")]).to_pylist():
+                counts[tuple(row[k] for k in keys)] += row["id_count"]
+
+    return _sorted_counts(keys, counts)
+
+
+def count_by_team(customer_org_id, start, end, keys, account_id=None, team_id=None):
+    """Like ``count_by`` but per team, from the ``EventTeam`` index.
+
+    ``keys`` may contain ``"team_id"``, ``"channel"`` and ``"day"``. Archived
+    months no longer have ``EventTeam`` rows, so their team lists are read
+    from the archive files instead.
+    """
+    keys = tuple(keys)
+    counts = Counter()
+
+    qs = EventTeam.objects.filter(
+        customer_org_id=customer_org_id, timestamp__gte=start, timestamp__lte=end
+    ).order_by()
+    if account_id:
+        qs = qs.filter(account_id=account_id)
+    if team_id:
+        qs = qs.filter(team_id=team_id)
+    if "day" in keys:
+        qs = qs.annotate(day=TruncDate("timestamp"))
+    for row in qs.values(*keys).annotate(count=Count("id")):
+        counts[tuple(row[k] for k in keys)] += row["count"]
+
+    months = archived_months(start, end)
+    if months:
+        filters = _archive_filters(customer_org_id, start, end, account_id)
+        for month in months:
+            table = archive.read(month, ("timestamp", "channel", "involved_team_ids"), filters)
+            for row in table.to_pylist():
+                values = {"channel": row["channel"], "day": row["timestamp"].date()}
+                for team in dict.fromkeys(json.loads(row["involved_team_ids"]) or []):
+                    if team_id and team != team_id:
+                        continue
+                    values["team_id"] = team
+                    counts[tuple(values[k] for k in keys)] += 1
+
+    return _sorted_counts(keys, counts)
+
+
+def epoch_ms(qs, field=None):
+    """Return ``(timestamps_ms, values)`` NumPy arrays for an ActivityEvent queryset.
+
+    ``values`` holds ``field`` per event, or is ``None`` without a field. On
+    SQLite the timestamps are fetched as their stored text and parsed by NumPy
+    in bulk instead of building a ``datetime`` per row.
+    """
+    import numpy as np
+
+    qs = qs.order_by()
+    if connection.vendor == "sqlite":
+        qs = qs.annotate(ts_text=Cast("timestamp", TextField()))
+        columns = ("ts_text", field) if field else ("ts_text",)
+        fetched = list(qs.values_list(*columns))
+        stamps = np.array([row[0] for row in fetched], dtype="datetime64[ms]").astype(np.int64)
+    else:
+        columns = ("timestamp", field) if field else ("timestamp",)
+        fetched = list(qs.values_list(*columns))
+        stamps = np.fromiter(
+            (bucketing.epoch_ms(row[0]) for row in fetched), dtype=np.int64, count=len(fetched)
+        )
+    values = np.array([row[1] for row in fetched], dtype=object) if field else None
+    return stamps, values
+
+
+def event_arrays(customer_org_id, start, end, field=None, account_id=None):
+    """Like ``epoch_ms`` for all events in ``[start, end]`` across both tiers."""
+    import numpy as np
+
+    stamps, values = epoch_ms(hot_events(customer_org_id, start, end, account_id), field)
+    parts = [(stamps, values)]
+
+    months = archived_months(start, end)
+    if months:
+        import pyarrow as pa
+
+        filters = _archive_filters(customer_org_id, start, end, account_id)
+        columns = ("timestamp", field) if field else ("timestamp",)
+        for month in months:
+            table = archive.read(month, columns, filters)
+            parts.append((
+                table["timestamp"].cast(pa.int64()).to_numpy(),
+                table[field].to_numpy(zero_copy_only=False).astype(object) if field else None,
+            ))
+
+    stamps = np.concatenate([part[0] for part in parts]).astype(np.int64)
+    values = np.concatenate([part[1] for part in parts]) if field else None
+    return stamps, values
+
+
+def _sorted_counts(keys, counts):
+    return [
+        {**dict(zip(keys, key)), "count": count}
+        for key, count in sorted(counts.items(), key=lambda item: [str(v) for v in item[0]])
+    ]
+
+
+def count(customer_org_id, start, end, account_id=None):
+    """Total number of events in ``[start, end]`` across both tiers."""
+    return sum(row["count"] for row in count_by(customer_org_id, start, end, (), account_id))
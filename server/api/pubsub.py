@@ -0,0 +1,266 @@
+"""In-process pub/sub for newly ingested ActivityEvent rows.
+
+The ingest management commands publish one message per inserted batch and the
+``/api/events/stream/`` SSE endpoint subscribes to them. Two pieces cooperate:
+
+* ``Hub`` fans messages out to the subscribers living in *this* process. Every
+  subscriber is a bounded ``asyncio.Queue`` consumed by an idle coroutine, so an
+  open connection costs little more than the socket itself.
+* ``SpoolRelay`` carries messages between processes. Ingest commands run in
+  their own process, so they append to an append-only JSON Lines spool file and
+  every server process tails it. It is a local stand-in for a real broker
+  (Redis pub/sub, Postgres LISTEN/NOTIFY, ...) and shares that interface.
+
+The stream endpoint uses messages only as a signal: on every wake-up it reads
+the events after its cursor from the database, in id order. Messages may
+therefore arrive late, out of order or not at all (a full mailbox stops
+taking them) without a subscriber missing an event.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Fields pushed for each newly ingested event.
+STREAM_EVENT_FIELDS = ("id", "timestamp", "activity", "channel", "status", "direction")
+
+
+def serialize_event(event):
+    """Return the stream representation of an ``ActivityEvent`` instance."""
+    data = {field: getattr(event, field) for field in STREAM_EVENT_FIELDS}
+    data["timestamp"] = event.timestamp.isoformat()
+    return data
+
+
+def build_messages(events):
+    """Group freshly inserted events into one message per (org, account).
+
+    Each message carries the new rows, their daily-count deltas (UTC days, same
+    keys as ``daily_counts`` on ``/api/events/chart/``) and ``cursor``: the
+    highest event id in the message.
+    """
+    grouped = defaultdict(list)
+    for event in events:
+        grouped[(event.customer_org_id, event.account_id)].append(event)
+
+    messages = []
+    for (customer_org_id, account_id), group in grouped.items():
+        group.sort(key=lambda e: e.pk)
+        deltas = defaultdict(int)
+        for event in group:
+            deltas[event.timestamp.date().isoformat()] += 1
+        messages.append({
+            "customer_org_id": customer_org_id,
+            "account_id": account_id,
+            "cursor": group[-1].pk,
+            "events": [serialize_event(e) for e in group],
+            "daily_count_deltas": [
+                {"date": date, "count": count} for date, count in sorted(deltas.items())
+            ],
+        })
+    return messages
+
+
+class Subscription:
+    """A single subscriber's bounded mailbox."""
+
+    def __init__(self, hub, customer_org_id, account_id, maxsize):
+        self.hub = hub
+        self.loop = asyncio.get_running_loop()
+        self.customer_org_id = customer_org_id
+        self.account_id = account_id
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def matches(self, message):
+        return self.account_id is None or self.account_id == message["account_id"]
+
+    def offer(self, message):
+        """Enqueue ``message``; runs on the subscriber's event loop."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # One queued message is enough to wake the consumer, whose next
+            # read covers the rest; stop buffering until it has drained.
+            self.overflowed = True
+            logger.info(
+                "Event-stream mailbox full for %s/%s",
+                self.customer_org_id,
+                self.account_id,
+            )
+
+    async def wait(self):
+        """Wait for a message, then discard everything queued."""
+        await self.queue.get()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class Hub:
+    """Fan messages out to the subscribers of the current process.
+
+    Under an ASGI server every subscriber shares one event loop; each loop that
+    has subscribers runs its own spool tail task.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._relay_tasks = {}
+
+    def subscribe(self, customer_org_id, account_id=None):
+        """Register a subscriber; must be called from a running event loop."""
+        subscription = Subscription(
+            self, customer_org_id, account_id, settings.EVENT_STREAM_QUEUE_SIZE
+        )
+        loop = subscription.loop
+        with self._lock:
+            self._subscribers[customer_org_id].add(subscription)
+            task = self._relay_tasks.get(loop)
+            if task is None or task.done():
+                self._relay_tasks[loop] = loop.create_task(spool_relay.tail(self, loop))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.customer_org_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.customer_org_id]
+
+    def subscriber_count(self, loop=None):
+        with self._lock:
+            return sum(
+                1
+                for subscribers in self._subscribers.values()
+                for s in subscribers
+                if loop is None or s.loop is loop
+            )
+
+    def relay_finished(self, loop):
+        with self._lock:
+            self._relay_tasks.pop(loop, None)
+
+    def deliver(self, message, loop=None):
+        """Hand ``message`` to matching local subscribers (thread-safe).
+
+        ``loop`` restricts delivery to the subscribers of one event loop.
+        """
+        with self._lock:
+            targets = [
+                s for s in self._subscribers.get(message["customer_org_id"], ())
+                if s.matches(message) and (loop is None or s.loop is loop)
+            ]
+        for subscription in targets:
+            if not subscription.loop.is_closed():
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+
+
+class SpoolRelay:
+    """Cross-process fan-out through an append-only JSON Lines file."""
+
+    @property
+    def pid(self):
+        # Looked up on every use: workers forked after import get their own.
+        return os.getpid()
+
+    @property
+    def path(self):
+        return settings.EVENT_STREAM_SPOOL_PATH
+
+    def append(self, messages):
+        """Append ``messages`` to the spool, truncating it when it grows too big."""
+        if not messages:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = "".join(
+            json.dumps({"origin": self.pid, **m}, separators=(",", ":")) + "\n"
+            for m in messages
+        )
+        with open(self.path, "a", encoding="utf-8") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                if os.fstat(handle.fileno()).st_size > settings.EVENT_STREAM_SPOOL_MAX_BYTES:
+                    # Tailers notice the shrink and restart from the top.
+                    handle.truncate(0)
+                handle.write(payload)
+                handle.flush()
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    async def tail(self, hub, loop):
+        """Forward spool messages written by other processes into ``hub``.
+
+        Starts at the current end of the file: history is replayed from the
+        database by the stream endpoint, so only new messages matter here.
+        """
+        offset = self.path.stat().st_size if self.path.exists() else 0
+        buffer = b""
+        interval = settings.EVENT_STREAM_SPOOL_POLL_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            if hub.subscriber_count(loop) == 0:
+                # Nobody is listening; the next subscriber restarts the tail.
+                hub.relay_finished(loop)
+                return
+            try:
+                size = self.path.stat().st_size
+            except FileNotFoundError:
+                offset, buffer = 0, b""
+                continue
+            if size < offset:
+                offset, buffer = 0, b""
+            if size == offset:
+                continue
+            with open(self.path, "rb") as handle:
+                handle.seek(offset)
+                chunk = handle.read(size - offset)
+            offset += len(chunk)
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if not line:
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping malformed event spool line")
+                    continue
+                if message.pop("origin", None) == self.pid:
+                    continue
+                hub.deliver(message, loop)
+
+
+hub = Hub()
+spool_relay = SpoolRelay()
+
+
+def publish(events):
+    """Publish newly inserted ``ActivityEvent`` instances to all subscribers.
+
+    Call after the inserting transaction has committed so subscribers that
+    query the database for context see the same rows.
+    """
+    messages = build_messages(events)
+    for message in messages:
+        hub.deliver(message)
+    try:
+        spool_relay.append(messages)
+    except OSError:
+        logger.exception("Could not write to the event stream spool")
+    return messages
@@ -0,0 +1,115 @@
+"""Maintenance of the ``EventRollup`` day/week/month counts.
+
+Every write is applied as a delta: +1 for each bucket an inserted (or updated)
+event lands in, -1 for each bucket a deleted (or updated) event leaves.
+Counting deltas rather than recounting buckets from ``ActivityEvent`` keeps the
+counts of archived months intact (``archive_events`` deletes rows without
+signals and leaves the rollups alone).
+
+Call inside the transaction that wrote the events; ingest holds the account's
+change-sequence lock at that point.
+"""
+
+from collections import Counter, defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from .models import ActivityEvent, EventRollup
+
+LEVELS = (EventRollup.DAY, EventRollup.WEEK, EventRollup.MONTH)
+
+
+def bucket_of(timestamp, level):
+    """Return the first UTC day of the ``level`` bucket containing ``timestamp``."""
+    day = timestamp.astimezone(dt_timezone.utc).date()
+    if level == EventRollup.DAY:
+        return day
+    if level == EventRollup.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def keys(customer_org_id, account_id, timestamp):
+    return [
+        (customer_org_id, account_id, level, bucket_of(timestamp, level)) for level in LEVELS
+    ]
+
+
+def event_keys(event):
+    return keys(event.customer_org_id, event.account_id, event.timestamp)
+
+
+def apply(deltas):
+    """Add a ``Counter`` of ``{(org, account, level, bucket): delta}`` to the rollups."""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    by_slice = defaultdict(set)
+    for customer_org_id, account_id, level, bucket in deltas:
+        by_slice[(customer_org_id, account_id, level)].add(bucket)
+    existing = {}
+    for (customer_org_id, account_id, level), buckets in by_slice.items():
+        for rollup in EventRollup.objects.filter(
+            customer_org_id=customer_org_id, account_id=account_id, level=level, bucket__in=buckets
+        ):
+            existing[(customer_org_id, account_id, level, rollup.bucket)] = rollup
+
+    to_create, to_update, to_delete = [], [], []
+    for key, delta in deltas.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            # A removal from a bucket without a row (e.g. one rebuilt after
+            # the event was counted) has nothing to take away from.
+            if delta <= 0:
+                continue
+            customer_org_id, account_id, level, bucket = key
+            to_create.append(EventRollup(
+                customer_org_id=customer_org_id,
+                account_id=account_id,
+                level=level,
+                bucket=bucket,
+                count=delta,
+            ))
+        elif rollup.count + delta <= 0:
+            to_delete.append(rollup.pk)
+        else:
+            rollup.count += delta
+            to_update.append(rollup)
+
+    EventRollup.objects.bulk_create(to_create, batch_size=1000)
+    EventRollup.objects.bulk_update(to_update, ["count"], batch_size=1000)
+    EventRollup.objects.filter(pk__in=to_delete).delete()
+
+
+def apply_inserts(events):
+    deltas = Counter()
+    for event in events:
+        if event.pk is not None:
+            deltas.update(event_keys(event))
+    apply(deltas)
+
+
+def previous_keys(objects):
+    """Bucket keys of the stored versions of ``objects`` (matched by touchpoint)."""
+    by_account = defaultdict(list)
+    for obj in objects:
+        by_account[(obj.customer_org_id, obj.account_id)].append(obj.touchpoint_id)
+    found = Counter()
+    for (customer_org_id, account_id), touchpoint_ids in by_account.items():
+        for timestamp in ActivityEvent.objects.filter(
+            customer_org_id=customer_org_id,
+            account_id=account_id,
+            touchpoint_id__in=touchpoint_ids,
+        ).values_list("timestamp", flat=True):
+            found.update(keys(customer_org_id, account_id, timestamp))
+    return found
+
+
+def apply_upserts(events, previous):
+    """Move upserted ``events`` out of their ``previous`` buckets into the new ones."""
+    deltas = Counter()
+    for event in events:
+        if event.pk is not None:
+            deltas.update(event_keys(event))
+    deltas.subtract(previous)
+    apply(deltas)
@@ -0,0 +1,103 @@
+"""Model signal handlers that keep derived data in step with ORM writes.
+
+Bulk ingest does the same work explicitly per batch (see
+``ingest_activityevents``); these cover ``save()`` and ``delete()``.
+"""
+
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import changes, dimensions, groups, partitions, rollups
+from .cache import bump_data_version
+from .models import ActivityEvent, Person
+
+
+@receiver(pre_save, sender=ActivityEvent, dispatch_uid="activityevent_stamp_change_seq")
+def stamp_change_seq(sender, instance, raw=False, **kwargs):
+    if raw:
+        # Fixture loading keeps the serialized sequence numbers.
+        return
+    changes.stamp([instance])
+
+
+@receiver(pre_save, sender=ActivityEvent, dispatch_uid="activityevent_assign_partition")
+def assign_partition(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    partitions.assign([instance])
+
+
+@receiver(pre_save, sender=ActivityEvent, dispatch_uid="activityevent_remember_group")
+def remember_group(sender, instance, raw=False, **kwargs):
+    # An update may move the event to another group or time bucket; remember
+    # the old ones so both sides are updated after the save.
+    instance._previous_group_key = None
+    instance._previous_rollup_keys = []
+    if raw or instance.pk is None:
+        return
+    previous = (
+        ActivityEvent.objects.filter(pk=instance.pk)
+        .values("customer_org_id", "account_id", "activity_grouping_id", "timestamp")
+        .first()
+    )
+    if previous is None:
+        return
+    instance._previous_rollup_keys = rollups.keys(
+        previous["customer_org_id"], previous["account_id"], previous["timestamp"]
+    )
+    if previous["activity_grouping_id"]:
+        instance._previous_group_key = (
+            previous["customer_org_id"],
+            previous["account_id"],
+            previous["activity_grouping_id"],
+        )
+
+
+@receiver(post_save, sender=ActivityEvent, dispatch_uid="activityevent_sync_dimensions")
+def sync_dimensions(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    dimensions.sync([instance], replace=not created)
+
+
+@receiver(post_save, sender=ActivityEvent, dispatch_uid="activityevent_update_group")
+def update_group(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous_key = getattr(instance, "_previous_group_key", None)
+    if created and previous_key is None:
+        groups.apply_inserts([instance])
+    else:
+        groups.refresh({previous_key, groups.group_key(instance)})
+
+
+@receiver(post_save, sender=ActivityEvent, dispatch_uid="activityevent_update_rollups")
+def update_rollups(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = Counter(rollups.event_keys(instance))
+    deltas.subtract(getattr(instance, "_previous_rollup_keys", []))
+    rollups.apply(deltas)
+
+
+@receiver(post_delete, sender=ActivityEvent, dispatch_uid="activityevent_tombstone")
+def write_tombstone(sender, instance, **kwargs):
+    changes.record_deletion(instance)
+
+
+@receiver(post_delete, sender=ActivityEvent, dispatch_uid="activityevent_delete_group")
+def shrink_group(sender, instance, **kwargs):
+    groups.refresh({groups.group_key(instance)})
+
+
+@receiver(post_delete, sender=ActivityEvent, dispatch_uid="activityevent_delete_rollups")
+def shrink_rollups(sender, instance, **kwargs):
+    rollups.apply(Counter({key: -1 for key in rollups.event_keys(instance)}))
+
+
+@receiver(post_save, sender=Person, dispatch_uid="person_bump_data_version")
+@receiver(post_delete, sender=Person, dispatch_uid="person_delete_bump_data_version")
+def bump_person_data_version(sender, instance, **kwargs):
+    bump_data_version(instance.customer_org_id)
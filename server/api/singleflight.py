@@ -0,0 +1,325 @@
+"""Single-flight coalescing of identical concurrent requests.
+
+When many dashboards open at once they ask the aggregate endpoints the same
+question at the same moment. ``coalesced`` makes those requests share one
+computation, keyed like the response cache: view name, normalized query string
+and the organisation's data version (``api.cache.cache_key``).
+
+* Within a process the first request of a key becomes the leader; concurrent
+  requests for the key wait on it and copy its response.
+* Across processes the leader takes an ``flock`` on a lock file under
+  ``SINGLE_FLIGHT_DIR`` (a local stand-in for a Redis/advisory lock) and
+  writes the response body next to it. A leader in another worker that finds
+  the lock taken waits, with bounded backoff, for the lock or for that stored
+  response, provided it was completed after it arrived, i.e. was in flight at
+  the time.
+
+A waiter that gets no result within ``SINGLE_FLIGHT_TIMEOUT`` seconds neither
+holds its worker longer nor piles another computation onto the key: it is
+served the last stored response of the same question (``X-Coalesced:
+stale``), or a 503 asking the client to retry.
+
+Per-view counters of computed and coalesced requests are flushed to the same
+directory and summed over all live processes by ``metrics``, which removes
+the files of exited processes.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+from .cache import cache_key, data_version
+
+# Lock files are striped by key hash so that they can be reused forever;
+# unlinking a lock file that another process is waiting on would break it.
+LOCK_STRIPES = 1024
+# Lock waits back off from the first to the second delay.
+LOCK_POLL_SECONDS = 0.005
+LOCK_POLL_MAX_SECONDS = 0.2
+RETRY_AFTER_SECONDS = 1
+# Stored results are only ever reused by requests that were waiting for them.
+RESULT_MAX_AGE_SECONDS = 60
+METRICS_FLUSH_SECONDS = 1.0
+
+COUNTERS = ("computed", "coalesced_local", "coalesced_remote", "lock_timeouts")
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+_counts = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+_counts_lock = threading.Lock()
+_last_flush = 0.0
+_last_prune = 0.0
+
+
+def _directory():
+    directory = settings.SINGLE_FLIGHT_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+# -------------------------------------------------------------------------
+# Metrics
+# -------------------------------------------------------------------------
+
+def _count(view_name, counter):
+    global _last_flush
+    with _counts_lock:
+        _counts[view_name][counter] += 1
+        now = time.monotonic()
+        due = now - _last_flush >= METRICS_FLUSH_SECONDS
+        if due:
+            _last_flush = now
+    if due:
+        flush_metrics()
+
+
+def flush_metrics():
+    """Write this process's counters now instead of at the next throttled flush."""
+    with _counts_lock:
+        snapshot = {name: dict(counts) for name, counts in _counts.items()}
+    _write_atomic(_directory() / f"metrics-{os.getpid()}.json", json.dumps(snapshot).encode())
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The pid exists but belongs to another user.
+        return True
+    return True
+
+
+def metrics():
+    """Return ``{"processes": n, "views": {...}, "totals": {...}}`` over all live processes."""
+    flush_metrics()
+    views = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    processes = 0
+    for path in _directory().glob("metrics-*.json"):
+        try:
+            pid = int(path.stem.removeprefix("metrics-"))
+        except ValueError:
+            continue
+        if not _alive(pid):
+            path.unlink(missing_ok=True)
+            continue
+        try:
+            data = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            continue
+        processes += 1
+        for view_name, counts in data.items():
+            for counter in COUNTERS:
+                views[view_name][counter] += counts.get(counter, 0)
+    totals = dict.fromkeys(COUNTERS, 0)
+    for counts in views.values():
+        for counter in COUNTERS:
+            totals[counter] += counts[counter]
+    return {"processes": processes, "views": dict(sorted(views.items())), "totals": totals}
+
+
+# -------------------------------------------------------------------------
+# Stored results
+# -------------------------------------------------------------------------
+
+def _write_atomic(path, body):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(body)
+    os.replace(tmp_path, path)
+
+
+def _freeze(response):
+    """Return a shareable copy of ``response`` or ``None`` if it cannot be shared."""
+    if response.streaming or response.has_header("Content-Encoding"):
+        return None
+    return {
+        "status": response.status_code,
+        "content_type": response["Content-Type"],
+        "content": response.content,
+    }
+
+
+def _thaw(result, coalesced=None):
+    response = HttpResponse(
+        result["content"], status=result["status"], content_type=result["content_type"]
+    )
+    if coalesced:
+        response["X-Coalesced"] = coalesced
+    return response
+
+
+def _store(path, result):
+    meta = {"status": result["status"], "content_type": result["content_type"]}
+    _write_atomic(path, json.dumps(meta).encode() + b"\n" + result["content"])
+
+
+def _load(path, arrived_ns):
+    """Read a stored result completed after ``arrived_ns``, else ``None``."""
+    try:
+        with open(path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_mtime_ns < arrived_ns:
+                return None
+            meta, _, content = fh.read().partition(b"\n")
+    except FileNotFoundError:
+        return None
+    return {**json.loads(meta), "content": content}
+
+
+def _prune(directory):
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < RESULT_MAX_AGE_SECONDS:
+        return
+    _last_prune = now
+    for path in directory.glob("result-*"):
+        try:
+            if now - path.stat().st_mtime > RESULT_MAX_AGE_SECONDS:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# -------------------------------------------------------------------------
+# Coalescing
+# -------------------------------------------------------------------------
+
+def _result_path(digest):
+    return _directory() / f"result-{digest}"
+
+
+def _timed_out(view_name, digest):
+    """Response for a request whose leader did not finish in time.
+
+    The stored result of the same question (same data version, completed
+    before this request arrived) if one is left, else a 503.
+    """
+    _count(view_name, "lock_timeouts")
+    stored = _load(_result_path(digest), 0)
+    if stored is not None:
+        return _thaw(stored, "stale")
+    response = JsonResponse(
+        {"error": "This response is still being computed; retry shortly."}, status=503
+    )
+    response["Retry-After"] = str(RETRY_AFTER_SECONDS)
+    return response
+
+
+def _lead(view_name, digest, arrived_ns, compute):
+    """Compute (or adopt another process's) result for ``digest``.
+
+    Returns ``(result, source)``, or ``(None, None)`` when neither the lock
+    nor the holder's result came within ``SINGLE_FLIGHT_TIMEOUT``.
+    """
+    directory = _directory()
+    result_path = _result_path(digest)
+    stripe = int(digest[:8], 16) % LOCK_STRIPES
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_TIMEOUT
+    delay = LOCK_POLL_SECONDS
+
+    with open(directory / f"lock-{stripe:04d}", "a+b") as lock:
+        while True:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                # The holder stores its result before unlocking; take it as
+                # soon as it lands instead of queueing for the lock.
+                stored = _load(result_path, arrived_ns)
+                if stored is not None:
+                    _count(view_name, "coalesced_remote")
+                    return stored, "remote"
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None, None
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, LOCK_POLL_MAX_SECONDS)
+        try:
+            stored = _load(result_path, arrived_ns)
+            if stored is not None:
+                _count(view_name, "coalesced_remote")
+                return stored, "remote"
+
+            response = compute()
+            _count(view_name, "computed")
+            result = _freeze(response)
+            if result is not None:
+                _store(result_path, result)
+                _prune(directory)
+            return result if result is not None else response, None
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _digest(view_name, request, args, kwargs):
+    """Key of the computation ``request`` asks ``view_name`` for."""
+    customer_org_id = request.GET.get("customer_org_id")
+    key = cache_key(view_name, customer_org_id, data_version(customer_org_id), request.GET)
+    if args or kwargs:
+        key += ":" + json.dumps([args, kwargs], sort_keys=True, default=str)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def coalesced(view):
+    """Share one computation among concurrent identical GET requests of ``view``."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        customer_org_id = request.GET.get("customer_org_id")
+        if request.method != "GET" or not customer_org_id:
+            return view(request, *args, **kwargs)
+
+        arrived_ns = time.time_ns()
+        digest = _digest(view.__name__, request, args, kwargs)
+
+        with _flights_lock:
+            flight = _flights.get(digest)
+            leader = flight is None
+            if leader:
+                flight = _flights[digest] = _Flight()
+
+        if not leader:
+            if flight.done.wait(settings.SINGLE_FLIGHT_TIMEOUT):
+                if isinstance(flight.result, dict):
+                    _count(view.__name__, "coalesced_local")
+                    return _thaw(flight.result, "local")
+                if flight.result is not None:
+                    # The leader's response could not be shared (e.g. streaming)
+                    _count(view.__name__, "computed")
+                    return view(request, *args, **kwargs)
+            return _timed_out(view.__name__, digest)
+
+        try:
+            result, coalesced_from = _lead(
+                view.__name__, digest, arrived_ns, lambda: view(request, *args, **kwargs)
+            )
+            flight.result = result
+        finally:
+            with _flights_lock:
+                del _flights[digest]
+            flight.done.set()
+
+        if result is None:
+            return _timed_out(view.__name__, digest)
+        if not isinstance(result, dict):
+            return result  # not shareable (e.g. streaming); returned as is
+        return _thaw(result, coalesced_from)
+
+    return wrapper
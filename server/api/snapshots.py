@@ -0,0 +1,207 @@
+"""Pre-rendered snapshot files for the chart and people endpoints.
+
+Between ingests the default ``/api/events/chart/`` and ``/api/people/``
+responses of an organisation never change, so the ingest commands render them
+once (``write_org``), JSON-encoded and in every supported content-coding, to
+
+    API_SNAPSHOT_DIR/<org>/v<data version>/<kind>-<account or _all>.json[.gz|.br]
+
+Each file is written under a temporary name and renamed into place. The
+``serves_snapshot`` view decorator streams a file with ``FileResponse`` when
+the request is the plain default one and a snapshot for the organisation's
+*current* ``OrgDataVersion`` exists. WSGI servers may hand such a response to
+``sendfile``; ASGI has no equivalent and Django would read a synchronous file
+body into memory in one go, so under ASGI (the production entry point) the
+file is read in ``ASGI_CHUNK_BYTES`` chunks off the event loop instead.
+Any write bumps the version, so a stale snapshot is simply never found and the
+view falls back to its live query.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from . import compression
+from .cache import data_version
+from .models import ActivityEvent
+
+ALL_ACCOUNTS = "_all"
+
+# Query parameters a request may carry and still be answered by a snapshot.
+SNAPSHOT_PARAMS = {
+    "chart": {"customer_org_id", "account_id"},
+    "people": {"customer_org_id"},
+}
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+_EXTENSIONS = {None: "", "gzip": ".gz", "br": ".br"}
+
+# Read size per thread hop when streaming a snapshot under ASGI.
+ASGI_CHUNK_BYTES = 256 * 1024
+
+
+def version_dir(customer_org_id, version):
+    return settings.API_SNAPSHOT_DIR / customer_org_id / f"v{version}"
+
+
+def snapshot_path(customer_org_id, version, kind, account_id, encoding=None):
+    name = f"{kind}-{account_id or ALL_ACCOUNTS}.json{_EXTENSIONS[encoding]}"
+    return version_dir(customer_org_id, version) / name
+
+
+def etag(customer_org_id, version, kind, account_id, encoding=None):
+    """Strong ETag of one snapshot representation.
+
+    A snapshot's content is fully determined by the organisation's data version,
+    so the tag is derived from the key alone and needs no file read.
+    """
+    key = f"{customer_org_id}:{version}:{kind}:{account_id or ALL_ACCOUNTS}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}-{encoding or "identity"}"'
+
+
+# -------------------------------------------------------------------------
+# Writing
+# -------------------------------------------------------------------------
+
+def render(customer_org_id, kind, account_id=None):
+    """Return the JSON body of the default ``kind`` response, computed live."""
+    from . import views  # views import this module for the decorator
+
+    if kind == "chart":
+        payload = views.chart_payload(customer_org_id, account_id)
+    else:
+        payload = views.people_payload(customer_org_id)
+    return JsonResponse(payload).content
+
+
+def _write_atomic(path, body):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(body)
+    os.replace(tmp_path, path)
+
+
+def write_org(customer_org_id):
+    """Render every snapshot of an organisation for its current data version.
+
+    Writes the org-wide and per-account chart payloads and the first people
+    page, then removes snapshots of older versions. Returns the number of
+    payloads written (not counting encodings).
+    """
+    if not _SAFE_ID.match(customer_org_id):
+        return 0
+    # Read the version before rendering: if a write lands meanwhile, the
+    # snapshot is filed under the older version and is never served.
+    version = data_version(customer_org_id)
+    directory = version_dir(customer_org_id, version)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    account_ids = (
+        ActivityEvent.objects.filter(customer_org_id=customer_org_id)
+        .order_by()
+        .values_list("account_id", flat=True)
+        .distinct()
+    )
+    targets = [("chart", None), ("people", None)]
+    targets += [("chart", account_id) for account_id in account_ids if _SAFE_ID.match(account_id)]
+
+    written = 0
+    for kind, account_id in targets:
+        content = render(customer_org_id, kind, account_id)
+        for encoding in (None,) + compression.SUPPORTED_ENCODINGS:
+            body = content
+            if encoding is not None:
+                body = compression.compress(body, encoding)
+            _write_atomic(snapshot_path(customer_org_id, version, kind, account_id, encoding), body)
+        written += 1
+
+    for stale in directory.parent.glob("v*"):
+        if stale != directory:
+            shutil.rmtree(stale, ignore_errors=True)
+    return written
+
+
+# -------------------------------------------------------------------------
+# Serving
+# -------------------------------------------------------------------------
+
+async def _read_chunks(fh):
+    """Async iterator over an open file, each read done in a worker thread."""
+    read = sync_to_async(fh.read, thread_sensitive=False)
+    while chunk := await read(ASGI_CHUNK_BYTES):
+        yield chunk
+
+
+def response_for(request, kind):
+    """Return a snapshot response for ``request``, or ``None`` to fall back."""
+    if request.method not in ("GET", "HEAD") or not set(request.GET) <= SNAPSHOT_PARAMS[kind]:
+        return None
+    customer_org_id = request.GET.get("customer_org_id")
+    account_id = request.GET.get("account_id") or None
+    if not customer_org_id or not _SAFE_ID.match(customer_org_id):
+        return None
+    if account_id is not None and not _SAFE_ID.match(account_id):
+        return None
+
+    version = data_version(customer_org_id)
+    identity = snapshot_path(customer_org_id, version, kind, account_id)
+    try:
+        identity_size = identity.stat().st_size
+    except FileNotFoundError:
+        return None
+
+    encoding = compression.negotiate(request.headers.get("Accept-Encoding"), identity_size)
+    path = snapshot_path(customer_org_id, version, kind, account_id, encoding)
+    try:
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    last_modified = int(os.fstat(fh.fileno()).st_mtime)
+    tag = etag(customer_org_id, version, kind, account_id, encoding)
+
+    not_modified = get_conditional_response(request, etag=tag, last_modified=last_modified)
+    if not_modified is not None:
+        fh.close()
+        response = not_modified
+    else:
+        response = FileResponse(fh, content_type="application/json")
+        # The file name is an implementation detail, not a download name.
+        del response["Content-Disposition"]
+        if isinstance(request, ASGIRequest):
+            response.streaming_content = _read_chunks(fh)
+        if encoding is not None:
+            response["Content-Encoding"] = encoding
+    response["ETag"] = tag
+    response["Last-Modified"] = http_date(last_modified)
+    # Clients may keep the body but must revalidate: the next ingest changes it.
+    response["Cache-Control"] = "no-cache"
+    response["X-Response-Cache"] = "SNAPSHOT"
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def serves_snapshot(kind):
+    """Answer default requests of a view from its snapshot files when fresh."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = response_for(request, kind)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return response
+
+        return wrapper
+
+    return decorator
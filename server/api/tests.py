@@ -1,3 +1,924 @@
-from django.test import TestCase
+import asyncio
+import csv
+import fcntl
+import gzip
+import io
+import json
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management import call_command
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth, TruncWeek
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from . import bucketing, compression, eventstore, export, pubsub, rollups, singleflight, snapshots, views, warmup
+from .cache import data_version, response_cache
+from .middleware import CompressionMiddleware
+from .models import ActivityEvent, ActivityGroup, EventRollup, Person
+
+ORG = "org_test"
+ACCOUNT = "account_test"
+
+
+class EventFixtureMixin:
+    """Isolated storage directories and a factory for ``ActivityEvent`` rows."""
+
+    def setUp(self):
+        super().setUp()
+        # Files outlive the test transaction, so every test gets its own.
+        self.storage = storage = Path(tempfile.mkdtemp(prefix="api-tests-"))
+        self.addCleanup(shutil.rmtree, storage, ignore_errors=True)
+        storage_settings = override_settings(
+            API_SNAPSHOT_DIR=storage / "snapshots",
+            SINGLE_FLIGHT_DIR=storage / "singleflight",
+            EVENT_ARCHIVE_DIR=storage / "archive",
+            EVENT_STREAM_SPOOL_PATH=storage / "event_stream.jsonl",
+        )
+        storage_settings.enable()
+        self.addCleanup(storage_settings.disable)
+
+    def make_event(self, n, timestamp, **fields):
+        values = {
+            "customer_org_id": ORG,
+            "account_id": ACCOUNT,
+            "touchpoint_id": f"touchpoint_{n}",
+            "timestamp": timestamp,
+            "activity": f"Activity {n}",
+            "channel": "Email",
+            "status": "SENT",
+            "record_type": "email_event",
+            "direction": "OUT",
+            "people": [{"id": f"person_{n}", "role_in_touchpoint": None}],
+            "involved_team_ids": [],
+            "related_opportunity_ids": [],
+            **fields,
+        }
+        # Writes bump the data version on commit; run those hooks in tests.
+        with self.captureOnCommitCallbacks(execute=True):
+            return ActivityEvent.objects.create(**values)
+
+    def delete_event(self, event):
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+@override_settings(API_COMPRESSION_MIN_BYTES=1024)
+class CompressionMiddlewareTests(SimpleTestCase):
+    BODY = {"rows": [{"id": n, "channel": "Email"} for n in range(200)]}
+
+    def respond(self, response, path="/api/events/", accept=None):
+        headers = {"accept-encoding": accept} if accept is not None else {}
+        request = RequestFactory().get(path, headers=headers)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_negotiation(self):
+        cases = [
+            (None, None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("gzip, deflate, br", "br" if compression.brotli else "gzip"),
+            ("br;q=0.5, gzip", "gzip"),
+            ("*", compression.SUPPORTED_ENCODINGS[0]),
+            ("gzip;q=0, br;q=0", None),
+        ]
+        for accept, expected in cases:
+            with self.subTest(accept=accept):
+                response = self.respond(JsonResponse(self.BODY), accept=accept)
+                self.assertEqual(response.get("Content-Encoding"), expected)
+                self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_gzip_body_round_trips(self):
+        response = self.respond(JsonResponse(self.BODY), accept="gzip")
+
+        self.assertEqual(json.loads(gzip.decompress(response.content)), self.BODY)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+
+    def test_small_bodies_stay_identity(self):
+        response = self.respond(JsonResponse({"rows": []}), accept="gzip")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_skips_streaming_and_encoded_responses(self):
+        streaming = self.respond(
+            StreamingHttpResponse(iter([b"x" * 4096]), content_type="application/json"),
+            accept="gzip",
+        )
+        self.assertFalse(streaming.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(streaming.streaming_content), b"x" * 4096)
+
+        encoded = HttpResponse(b"y" * 4096, content_type="application/json")
+        encoded["Content-Encoding"] = "br"
+        self.assertEqual(self.respond(encoded, accept="gzip").content, b"y" * 4096)
+
+    def test_only_api_json_is_compressed(self):
+        html = self.respond(
+            HttpResponse("<input name=csrfmiddlewaretoken>" * 100, content_type="text/html"),
+            accept="gzip",
+        )
+        self.assertFalse(html.has_header("Content-Encoding"))
+
+        admin = self.respond(JsonResponse(self.BODY), path="/admin/jsi18n/", accept="gzip")
+        self.assertFalse(admin.has_header("Content-Encoding"))
+        self.assertFalse(admin.has_header("Vary"))
+
+
+@override_settings(SINGLE_FLIGHT_TIMEOUT=0.1)
+class SingleFlightTests(EventFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.calls = 0
+
+        @singleflight.coalesced
+        def view(request):
+            self.calls += 1
+            return JsonResponse({"calls": self.calls})
+
+        self.view = view
+
+    def get(self):
+        return self.view(RequestFactory().get("/", {"customer_org_id": ORG}))
+
+    def hold_lock(self):
+        """Take the lock of the view's key, as a leader in another process would."""
+        request = RequestFactory().get("/", {"customer_org_id": ORG})
+        digest = singleflight._digest("view", request, (), {})
+        stripe = int(digest[:8], 16) % singleflight.LOCK_STRIPES
+        lock = open(singleflight._directory() / f"lock-{stripe:04d}", "a+b")
+        self.addCleanup(lock.close)
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return digest
+
+    def test_timed_out_waiter_gets_stale_result_or_503(self):
+        self.assertEqual(json.loads(self.get().content), {"calls": 1})
+        digest = self.hold_lock()
+
+        stale = self.get()
+        self.assertEqual(stale["X-Coalesced"], "stale")
+        self.assertEqual(json.loads(stale.content), {"calls": 1})
+
+        singleflight._result_path(digest).unlink()
+        unavailable = self.get()
+        self.assertEqual(unavailable.status_code, 503)
+        self.assertEqual(unavailable["Retry-After"], "1")
+        self.assertEqual(self.calls, 1)
+
+    def test_waiter_adopts_result_stored_while_waiting(self):
+        digest = self.hold_lock()
+        store = threading.Timer(0.02, singleflight._store, (
+            singleflight._result_path(digest),
+            {"status": 200, "content_type": "application/json", "content": b'{"calls": 0}'},
+        ))
+        store.start()
+        self.addCleanup(store.join)
+
+        response = self.get()
+        self.assertEqual(response["X-Coalesced"], "remote")
+        self.assertEqual(json.loads(response.content), {"calls": 0})
+        self.assertEqual(self.calls, 0)
+
+
+class PeopleDirectoryTests(EventFixtureMixin, TestCase):
+    NAMES = [("Erin", "Poole"), ("Adam", "Poole"), ("Adam", "Poole"), ("Zoe", "Abbott"), ("Bo", "Park")]
+
+    def setUp(self):
+        super().setUp()
+        Person.objects.bulk_create([
+            Person(
+                customer_org_id=ORG,
+                id=f"person_{n}",
+                first_name=first,
+                last_name=last,
+                email_address=f"{first.lower()}{n}@example.com",
+            )
+            for n, (first, last) in enumerate(self.NAMES)
+        ])
+        Person.objects.create(
+            customer_org_id="org_other", id="person_x", first_name="Al", last_name="Abbott",
+            email_address="al@example.com",
+        )
+
+    def people(self, status=200, **params):
+        response_cache().clear()
+        response = self.client.get(reverse("api:all-people"), {"customer_org_id": ORG, **params})
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+    def test_cursor_pages_cover_everyone_once(self):
+        seen, cursor = [], None
+        while True:
+            page = self.people(page_size=2, fields="id", **({"cursor": cursor} if cursor else {}))
+            self.assertEqual(page["count"], 5)
+            self.assertLessEqual(len(page["results"]), 2)
+            seen += [row["id"] for row in page["results"]]
+            cursor = page["next_cursor"]
+            self.assertEqual(page["has_next"], cursor is not None)
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, ["person_3", "person_4", "person_1", "person_2", "person_0"])
+
+    def test_prefix_search_counts_matches(self):
+        page = self.people(q="adam po", fields="id,first_name")
+
+        self.assertEqual(page["count"], 2)
+        self.assertEqual([row["id"] for row in page["results"]], ["person_1", "person_2"])
+        self.assertEqual(set(page["results"][0]), {"id", "first_name"})
+
+    def test_invalid_cursors_are_rejected(self):
+        for cursor in ("not base64!", "bnVsbA", "WzEsMiwzXQ", "WyJhIiwiYiJd"):
+            # garbage, null, [1, 2, 3], ["a", "b"]
+            with self.subTest(cursor=cursor):
+                self.assertIn("error", self.people(status=400, cursor=cursor))
+
+    def test_page_size_bounds(self):
+        self.assertEqual(self.people(page_size=0)["page_size"], 1)
+        self.assertEqual(len(self.people(page_size=-5)["results"]), 1)
+        self.assertEqual(self.people(page_size=10**6)["page_size"], 1000)
+        self.people(status=400, page_size="ten")
+        self.people(status=400, fields="id,password")
+
+
+class SnapshotTests(EventFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.make_event(1, utc(2024, 3, 5, 9))
+        self.make_event(2, utc(2024, 3, 6, 9), account_id="account_other", channel="Call")
+        Person.objects.create(
+            customer_org_id=ORG, id="person_1", first_name="Ann", last_name="Lee",
+            email_address="ann@example.com",
+        )
+
+    def get(self, name, **params):
+        response_cache().clear()
+        response = self.client.get(reverse(name), {"customer_org_id": ORG, **params})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_snapshots_match_live_responses(self):
+        requests = [("api:all-events-chart", {}), ("api:all-people", {})]
+        requests += [("api:all-events-chart", {"account_id": ACCOUNT})]
+        live = [self.get(name, **params).content for name, params in requests]
+
+        self.assertEqual(snapshots.write_org(ORG), 4)
+        for (name, params), content in zip(requests, live):
+            with self.subTest(name=name, **params):
+                response = self.get(name, **params)
+                self.assertEqual(response["X-Response-Cache"], "SNAPSHOT")
+                self.assertEqual(b"".join(response.streaming_content), content)
+
+    def test_warm_caches_responses_no_snapshot_serves(self):
+        snapshots.write_org(ORG)
+        snapshots.snapshot_path(ORG, data_version(ORG), "people", None).unlink()
+        response_cache().clear()
+
+        self.assertEqual(warmup.warm(org_limit=1, accounts_per_org=1), 1)
+        response = self.client.get(reverse("api:all-people"), {"customer_org_id": ORG})
+        self.assertEqual(response["X-Response-Cache"], "HIT")
+        self.assertEqual(response.json()["count"], 1)
+
+
+class RollupTests(EventFixtureMixin, TestCase):
+    def counts(self, level):
+        return dict(
+            EventRollup.objects.filter(customer_org_id=ORG, account_id=ACCOUNT, level=level)
+            .values_list("bucket", "count")
+        )
+
+    def test_delete_decrements_and_removes_empty_buckets(self):
+        first = self.make_event(1, utc(2024, 3, 5, 9))
+        second = self.make_event(2, utc(2024, 3, 5, 17))
+        self.make_event(3, utc(2024, 4, 2, 12))
+
+        self.delete_event(first)
+        self.assertEqual(self.counts(EventRollup.DAY), {date(2024, 3, 5): 1, date(2024, 4, 2): 1})
+        self.assertEqual(self.counts(EventRollup.MONTH), {date(2024, 3, 1): 1, date(2024, 4, 1): 1})
+
+        self.delete_event(second)
+        self.assertEqual(self.counts(EventRollup.DAY), {date(2024, 4, 2): 1})
+        self.assertEqual(self.counts(EventRollup.WEEK), {date(2024, 4, 1): 1})
+        self.assertEqual(self.counts(EventRollup.MONTH), {date(2024, 4, 1): 1})
+
+    def test_update_moves_event_between_buckets(self):
+        event = self.make_event(1, utc(2024, 3, 31, 23))
+        event.timestamp = utc(2024, 4, 1, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save()
+
+        self.assertEqual(self.counts(EventRollup.DAY), {date(2024, 4, 1): 1})
+        self.assertEqual(self.counts(EventRollup.MONTH), {date(2024, 4, 1): 1})
+
+    def test_removal_from_missing_bucket_creates_no_row(self):
+        rollups.apply(Counter({key: -1 for key in rollups.keys(ORG, ACCOUNT, utc(2024, 3, 5))}))
+
+        self.assertFalse(EventRollup.objects.exists())
+
+
+class BucketingTests(EventFixtureMixin, TestCase):
+    TRUNC = {"hour": TruncHour, "day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+
+    def setUp(self):
+        super().setUp()
+
+        def every(start, step_minutes, count):
+            return [start + timedelta(minutes=step_minutes * i) for i in range(count)]
+
+        stamps = (
+            # New York falls back at 06:00 UTC: 01:00-02:00 local happens twice.
+            every(utc(2024, 11, 2, 20), 20, 48)
+            # ... and springs forward at 07:00 UTC: 02:00-03:00 local never happens.
+            + every(utc(2024, 3, 10, 2), 20, 30)
+            # Kolkata (+05:30) starts Monday 2024-04-01 at 2024-03-31 18:30 UTC.
+            + every(utc(2024, 3, 31, 17, 50), 10, 10)
+            # Several weeks and months, at drifting times of day.
+            + every(utc(2024, 1, 25, 5, 17), 29 * 60, 70)
+        )
+        for n, stamp in enumerate(stamps):
+            self.make_event(n, stamp.replace(microsecond=n * 1000))
+
+    def orm_counts(self, unit, tz):
+        trunc = self.TRUNC[unit]("timestamp", tzinfo=ZoneInfo(tz))
+        rows = ActivityEvent.objects.annotate(bucket=trunc).values("bucket").annotate(n=Count("id"))
+        return {
+            row["bucket"].isoformat() if unit == "hour" else row["bucket"].date().isoformat(): row["n"]
+            for row in rows
+        }
+
+    def test_matches_database_truncation(self):
+        stamps = [
+            round(stamp.timestamp() * 1000)
+            for stamp in ActivityEvent.objects.values_list("timestamp", flat=True)
+        ]
+        for tz in ("UTC", "America/New_York", "Asia/Kolkata"):
+            for unit in bucketing.UNITS:
+                with self.subTest(tz=tz, unit=unit):
+                    result = bucketing.bucket_counts(stamps, unit, tz)
+                    counts = dict(zip(result["buckets"], result["total"].tolist()))
+                    self.assertEqual(counts, self.orm_counts(unit, tz))
+
+
+class ActivityGroupTests(EventFixtureMixin, TestCase):
+    def ingest(self, *records, upsert=False):
+        path = self.storage / "events.jsonl"
+        lines = []
+        for n, timestamp, grouping_id in records:
+            lines.append(json.dumps({
+                "customer_org_id": ORG,
+                "account_id": ACCOUNT,
+                "touchpoint_id": f"touchpoint_{n}",
+                "timestamp": round(timestamp.timestamp() * 1000),
+                "activity": f"Activity {n}",
+                "channel": "Email",
+                "people": [{"id": f"person_{n % 3}", "role_in_touchpoint": None}],
+                "involved_team_ids": [],
+                "related_opportunity_ids": [],
+                "activity_grouping_id": grouping_id,
+            }))
+        path.write_text("\n".join(lines))
+        options = ["--batch-size", "2", "--no-snapshots"] + (["--upsert"] if upsert else [])
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("ingest_activityevents", str(path), *options, stdout=StringIO())
+
+    def summaries(self):
+        return {
+            group.activity_grouping_id: (
+                group.event_count,
+                group.first_timestamp,
+                group.last_timestamp,
+                ActivityEvent.objects.get(id=group.latest_event_id).touchpoint_id,
+                group.participants,
+            )
+            for group in ActivityGroup.objects.filter(customer_org_id=ORG, account_id=ACCOUNT)
+        }
+
+    def fetch(self, name="all-activity-events", args=(), status=200, **params):
+        response_cache().clear()
+        response = self.client.get(reverse(f"api:{name}", args=args), {"customer_org_id": ORG, **params})
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+    def test_ingest_folds_batches_into_summaries(self):
+        self.ingest(
+            (1, utc(2024, 3, 5, 9), "thread_a"),
+            (2, utc(2024, 3, 1, 9), "thread_a"),
+            (3, utc(2024, 3, 6, 9), None),
+            (4, utc(2024, 3, 7, 9), "thread_a"),
+            (5, utc(2024, 3, 2, 9), "thread_b"),
+        )
+
+        self.assertEqual(self.summaries(), {
+            "thread_a": (3, utc(2024, 3, 1, 9), utc(2024, 3, 7, 9), "touchpoint_4", ["person_1", "person_2"]),
+            "thread_b": (1, utc(2024, 3, 2, 9), utc(2024, 3, 2, 9), "touchpoint_5", ["person_2"]),
+        })
+
+    def test_upsert_and_delete_recompute_summaries(self):
+        self.ingest(
+            (1, utc(2024, 3, 1, 9), "thread_a"),
+            (2, utc(2024, 3, 5, 9), "thread_a"),
+            (3, utc(2024, 3, 3, 9), "thread_b"),
+        )
+        # The latest event of thread_a moves to thread_b.
+        self.ingest((2, utc(2024, 3, 5, 9), "thread_b"), upsert=True)
+        self.assertEqual(self.summaries(), {
+            "thread_a": (1, utc(2024, 3, 1, 9), utc(2024, 3, 1, 9), "touchpoint_1", ["person_1"]),
+            "thread_b": (2, utc(2024, 3, 3, 9), utc(2024, 3, 5, 9), "touchpoint_2", ["person_0", "person_2"]),
+        })
+
+        self.delete_event(ActivityEvent.objects.get(touchpoint_id="touchpoint_1"))
+        self.delete_event(ActivityEvent.objects.get(touchpoint_id="touchpoint_2"))
+        self.assertEqual(self.summaries(), {
+            "thread_b": (1, utc(2024, 3, 3, 9), utc(2024, 3, 3, 9), "touchpoint_3", ["person_0"]),
+        })
+
+    def test_grouped_view_collapses_groups_and_members_expand_them(self):
+        self.ingest(
+            (1, utc(2024, 3, 1, 9), "thread_a"),
+            (2, utc(2024, 3, 2, 9), None),
+            (3, utc(2024, 3, 3, 9), "thread_a"),
+            (4, utc(2024, 3, 4, 9), None),
+            (5, utc(2024, 3, 5, 9), "thread_a"),
+        )
+
+        data = self.fetch(grouped="true", page_size=2)
+        self.assertEqual(data["pagination"]["total_count"], 3)
+        self.assertEqual(
+            [(row["type"], row["event"]["touchpoint_id"], row["event_count"]) for row in data["results"]],
+            [("group", "touchpoint_5", 3), ("event", "touchpoint_4", 1)],
+        )
+        group = data["results"][0]
+        self.assertEqual(group["activity_grouping_id"], "thread_a")
+        self.assertEqual(group["first_timestamp"], "2024-03-01T09:00:00Z")
+        self.assertEqual(group["participants"], ["person_0", "person_1", "person_2"])
+        self.assertIn("error", self.fetch(grouped="true", team_id="team_x", status=400))
+
+        members = self.fetch("activity-group-members", args=("thread_a",), account_id=ACCOUNT, page_size=2, page=2)
+        self.assertEqual(members["pagination"]["total_count"], 3)
+        self.assertEqual([row["touchpoint_id"] for row in members["results"]], ["touchpoint_5"])
+
+
+class ExportTests(EventFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.make_event(
+            1, utc(2024, 1, 10, 9),
+            people=[{"id": "person_1", "role_in_touchpoint": "To"}, {"id": "person_9", "role_in_touchpoint": None}],
+            involved_team_ids=["team_x", "team_y"],
+        )
+        self.make_event(2, utc(2024, 1, 20, 9), account_id="account_other")
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("archive_events", before="2024-02", stdout=StringIO())
+        self.make_event(3, utc(2024, 2, 5, 9))
+        self.make_event(4, utc(2024, 2, 28, 23, 59))
+        self.make_event(5, utc(2024, 3, 1, 0))
+        Person.objects.bulk_create([
+            Person(customer_org_id=ORG, id=f"person_{n}", first_name=f"First{n}", last_name=f"Last{n}",
+                   email_address=f"p{n}@example.com")
+            for n in (1, 2, 3, 4, 5, 9)
+        ])
+
+    def download(self, name, status=200, **params):
+        response = self.client.get(reverse(f"api:{name}"), {"customer_org_id": ORG, **params})
+        self.assertEqual(response.status_code, status)
+        return response
+
+    def csv_rows(self, response):
+        chunks = list(response.streaming_content)
+        rows = list(csv.DictReader(StringIO(b"".join(chunks).decode("utf-8"))))
+        return chunks, rows
+
+    @mock.patch.object(export, "CHUNK_ROWS", 2)
+    def test_csv_streams_flattened_rows_of_both_tiers(self):
+        response = self.download("export-events", account_id=ACCOUNT, end="2024-02-28")
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Disposition"], f'attachment; filename="events-{ORG}-{ACCOUNT}.csv"')
+
+        chunks, rows = self.csv_rows(response)
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(tuple(rows[0]), export.EVENT_COLUMNS)
+        self.assertEqual([row["touchpoint_id"] for row in rows], ["touchpoint_1", "touchpoint_3", "touchpoint_4"])
+        self.assertEqual(
+            {key: rows[0][key] for key in ("people_count", "people_ids", "people_roles", "involved_team_ids")},
+            {"people_count": "2", "people_ids": "person_1;person_9", "people_roles": "To;",
+             "involved_team_ids": "team_x;team_y"},
+        )
+        self.assertEqual(rows[0]["timestamp"], "2024-01-10T09:00:00+00:00")
+
+    @mock.patch.object(export, "PARQUET_ROW_GROUP_ROWS", 2)
+    def test_parquet_is_written_one_row_group_at_a_time(self):
+        import pyarrow.parquet as pq
+
+        response = self.download("export-events", format="parquet", start="2024-01-15")
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 3)
+
+        parquet = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+        self.assertEqual(parquet.metadata.num_row_groups, 2)
+        rows = parquet.read().to_pylist()
+        self.assertEqual(
+            [(row["touchpoint_id"], row["people_ids"]) for row in rows],
+            [("touchpoint_2", ["person_2"]), ("touchpoint_3", ["person_3"]),
+             ("touchpoint_4", ["person_4"]), ("touchpoint_5", ["person_5"])],
+        )
+
+    def test_people_export_filters_by_account_events(self):
+        _, rows = self.csv_rows(self.download("export-people", account_id=ACCOUNT, start="2024-02-01"))
+        self.assertEqual([row["id"] for row in rows], ["person_3", "person_4", "person_5"])
+
+        _, rows = self.csv_rows(self.download("export-people", q="first9"))
+        self.assertEqual([row["email_address"] for row in rows], ["p9@example.com"])
+
+        self.download("export-events", status=400, format="xlsx")
+        self.download("export-people", status=400, start="yesterday")
+
+
+class EventChangesTests(EventFixtureMixin, TestCase):
+    def changes(self, since):
+        response = self.client.get(
+            reverse("api:event-changes"),
+            {"customer_org_id": ORG, "account_id": ACCOUNT, "since": since},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_update_and_delete_after_watermark(self):
+        first = self.make_event(1, utc(2024, 3, 5, 9))
+        second = self.make_event(2, utc(2024, 3, 6, 9))
+        initial = self.changes(0)
+        self.assertEqual([row["id"] for row in initial["changes"]], [first.pk, second.pk])
+        watermark = initial["watermark"]
+
+        version = data_version(ORG)
+        first.status = "OPENED"
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            first.save()
+        self.assertTrue(callbacks)
+        self.assertGreater(data_version(ORG), version)
+
+        updated = self.changes(watermark)
+        self.assertEqual([(row["id"], row["status"]) for row in updated["changes"]], [(first.pk, "OPENED")])
+        self.assertEqual(updated["tombstones"], [])
+        self.assertGreater(updated["watermark"], watermark)
+
+        second_id = second.pk
+        self.delete_event(second)
+        deleted = self.changes(updated["watermark"])
+        self.assertEqual(deleted["changes"], [])
+        self.assertEqual(
+            [(t["id"], t["touchpoint_id"]) for t in deleted["tombstones"]],
+            [(second_id, "touchpoint_2")],
+        )
+        self.assertEqual(self.changes(deleted["watermark"])["changes"], [])
+
+    def test_version_is_bumped_only_on_commit(self):
+        version = data_version(ORG)
+        with self.captureOnCommitCallbacks() as callbacks:
+            ActivityEvent.objects.create(
+                customer_org_id=ORG,
+                account_id=ACCOUNT,
+                touchpoint_id="touchpoint_1",
+                timestamp=utc(2024, 3, 5),
+                channel="Email",
+                status="SENT",
+                record_type="email_event",
+                direction="OUT",
+                people=[],
+                involved_team_ids=[],
+                related_opportunity_ids=[],
+            )
+            self.assertEqual(data_version(ORG), version)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(data_version(ORG), version)
+
+
+class OpportunityTests(EventFixtureMixin, TestCase):
+    """The reverse index keeps answering once touchpoints are archived."""
+
+    def setUp(self):
+        super().setUp()
+        self.make_event(1, utc(2024, 1, 10, 9), related_opportunity_ids=["opp_1"])
+        self.make_event(2, utc(2024, 1, 20, 9), channel="Web", related_opportunity_ids=["opp_1", "opp_2"])
+        self.make_event(3, utc(2024, 2, 5, 9), related_opportunity_ids=["opp_1"])
+        self.make_event(4, utc(2024, 2, 6, 9))
+
+    def fetch(self, name, **params):
+        response = self.client.get(
+            reverse(f"api:{name}", args=("opp_1",)), {"customer_org_id": ORG, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def touchpoints(self):
+        first = self.fetch("opportunity-events", page_size=2)
+        rest = self.fetch("opportunity-events", page_size=2, cursor=first["next_cursor"])
+        return [event["touchpoint_id"] for event in first["results"] + rest["results"]]
+
+    def test_summary_and_events_survive_archiving(self):
+        summary = self.fetch("opportunity-summary")
+        self.assertEqual(summary["total_touches"], 3)
+        self.assertEqual(summary["first_touch"]["channel"], "Email")
+        self.assertEqual(
+            summary["channel_mix"], [{"channel": "Email", "count": 2}, {"channel": "Web", "count": 1}]
+        )
+        self.assertEqual(self.touchpoints(), ["touchpoint_3", "touchpoint_2", "touchpoint_1"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("archive_events", before="2024-02", stdout=StringIO())
+
+        self.assertEqual(ActivityEvent.objects.count(), 2)
+        self.assertEqual(self.fetch("opportunity-summary"), summary)
+        self.assertEqual(self.touchpoints(), ["touchpoint_3", "touchpoint_2", "touchpoint_1"])
+
+
+class StoreParityTests(EventFixtureMixin, TestCase):
+    """The column store answers like SQL, archived months included."""
+
+    def setUp(self):
+        super().setUp()
+        self.make_event(1, utc(2024, 1, 10, 9))
+        self.make_event(2, utc(2024, 1, 20, 9), channel="Web")
+        self.third = self.make_event(
+            3, utc(2024, 2, 5, 9),
+            people=[{"id": "person_1", "role_in_touchpoint": None}, {"id": "person_3"}],
+        )
+        # JSON truncates to milliseconds; rounding would show 09:00:01.000.
+        self.make_event(4, utc(2024, 3, 1, 9, 0, 0, 999_700), channel="Web")
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("archive_events", before="2024-02", stdout=StringIO())
+        # A late row in the archived month stays hot; it is person_2's first.
+        self.make_event(
+            5, utc(2024, 1, 5, 9),
+            people=[{"id": "person_2", "role_in_touchpoint": None}, {"id": "person_5"}],
+        )
+        eventstore.store().clear()
+
+    def tearDown(self):
+        eventstore.store().clear()
+
+    def fetch(self, name, **params):
+        response_cache().clear()
+        response = self.client.get(
+            reverse(f"api:{name}"), {"customer_org_id": ORG, "account_id": ACCOUNT, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assertParity(self, name, drop=(), **params):
+        with override_settings(EVENT_STORE_MAX_BYTES=0):
+            expected = self.fetch(name, **params)
+        self.assertIsNotNone(eventstore.columns_for(ORG, ACCOUNT))
+        actual = self.fetch(name, **params)
+        for key in drop:
+            expected.pop(key)
+            actual.pop(key)
+        self.assertEqual(actual, expected)
+        return actual
+
+    def check_all(self):
+        chart = self.assertParity("all-events-chart", split_by="channel")
+        page = self.assertParity(
+            "all-activity-events", sort_by="timestamp", seek="2024-01-15", page_size=2
+        )
+        self.assertParity("all-activity-events", page=2, page_size=2)
+        self.assertParity("activity-timeline", drop=("date_range",), days=5000)
+        first = self.assertParity("first-touchpoints")
+        return chart, page, first
+
+    def test_store_matches_sql_across_tiers(self):
+        chart, page, first = self.check_all()
+
+        self.assertEqual(chart["total_count"], 5)
+        self.assertEqual(page["pagination"]["page"], 2)
+        self.assertEqual(
+            [(touch["person_id"], touch["timestamp"][:10]) for touch in first["results"]],
+            [
+                ("person_2", "2024-01-05"),
+                ("person_5", "2024-01-05"),
+                ("person_1", "2024-01-10"),
+                ("person_3", "2024-02-05"),
+                ("person_4", "2024-03-01"),
+            ],
+        )
+
+    def test_refreshed_store_matches_sql(self):
+        self.check_all()
+        self.make_event(6, utc(2024, 1, 2, 9), people=[{"id": "person_3"}])
+        self.delete_event(self.third)
+
+        chart, _, first = self.check_all()
+
+        self.assertEqual(chart["total_count"], 5)
+        self.assertEqual(
+            [touch["person_id"] for touch in first["results"]],
+            ["person_3", "person_2", "person_5", "person_1", "person_4"],
+        )
+
+
+@override_settings(EVENT_STORE_MAX_BYTES=0)
+class TieredListingTests(EventFixtureMixin, TestCase):
+    """SQL listings page across the hot and archived tiers."""
+
+    def setUp(self):
+        super().setUp()
+        self.make_event(1, utc(2024, 1, 10, 9), activity_grouping_id="thread_a", involved_team_ids=["team_x"])
+        self.make_event(2, utc(2024, 1, 20, 9), channel="Web")
+        self.make_event(3, utc(2024, 1, 25, 9), activity_grouping_id="thread_a")
+        self.fourth = self.make_event(4, utc(2024, 2, 5, 9), activity_grouping_id="thread_a")
+        self.make_event(5, utc(2024, 2, 10, 9), involved_team_ids=["team_x"])
+        self.make_event(6, utc(2024, 3, 1, 9))
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("archive_events", before="2024-02", stdout=StringIO())
+        # A late row in the archived month stays hot.
+        self.make_event(7, utc(2024, 1, 15, 9))
+
+    def fetch(self, name="all-activity-events", args=(), **params):
+        response_cache().clear()
+        response = self.client.get(reverse(f"api:{name}", args=args), {"customer_org_id": ORG, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def touchpoints(self, rows):
+        return [int(row["touchpoint_id"].split("_")[1]) for row in rows]
+
+    def test_pages_cross_the_tier_boundary(self):
+        pages = [self.fetch(sort_by="timestamp", page=page, page_size=3) for page in (1, 2, 3)]
+        self.assertEqual([self.touchpoints(page["results"]) for page in pages], [[1, 7, 2], [3, 4, 5], [6]])
+        self.assertEqual(pages[1]["pagination"]["total_count"], 7)
+        self.assertEqual(pages[1]["pagination"]["total_pages"], 3)
+        self.assertEqual(
+            pages[1]["date_range"]["overall"],
+            {"start": "2024-01-10T09:00:00+00:00", "end": "2024-03-01T09:00:00+00:00"},
+        )
+
+        newest = self.fetch(page=2, page_size=3)
+        self.assertEqual(self.touchpoints(newest["results"]), [3, 2, 7])
+        seek = self.fetch(sort_by="timestamp", seek="2024-01-21", page_size=3)
+        self.assertEqual(seek["pagination"]["page"], 2)
+        seek = self.fetch(seek="2024-01-21", page_size=3)
+        self.assertEqual(seek["pagination"]["page"], 2)
+
+    def test_total_count_per_slice(self):
+        team = self.fetch(team_id="team_x")
+        self.assertEqual(team["pagination"]["total_count"], 2)
+        self.assertEqual(self.touchpoints(team["results"]), [5, 1])
+
+        by_channel = self.fetch(sort_by="-channel", page_size=4, page=2)
+        self.assertEqual(by_channel["pagination"]["total_count"], 7)
+        self.assertEqual(self.touchpoints(by_channel["results"]), [4, 3, 1])
+        by_channel = self.fetch(sort_by="channel", page_size=4)
+        self.assertEqual(self.touchpoints(by_channel["results"]), [1, 3, 4, 5])
+
+        self.assertEqual(self.fetch(account_id="account_other")["pagination"]["total_count"], 0)
+
+    def test_grouped_view_after_archive(self):
+        rows = []
+        for page in (1, 2, 3):
+            data = self.fetch(grouped="true", sort_by="timestamp", page=page, page_size=2)
+            rows += data["results"]
+        self.assertEqual(data["pagination"]["total_count"], 5)
+        self.assertEqual(
+            [(row["type"], row["event"]["touchpoint_id"], row["event_count"]) for row in rows],
+            [
+                ("event", "touchpoint_7", 1),
+                ("event", "touchpoint_2", 1),
+                ("group", "touchpoint_4", 3),
+                ("event", "touchpoint_5", 1),
+                ("event", "touchpoint_6", 1),
+            ],
+        )
+        self.assertEqual(rows[2]["first_timestamp"], "2024-01-10T09:00:00Z")
+        self.assertEqual(rows[2]["participants"], ["person_1", "person_3", "person_4"])
+
+        members = self.fetch("activity-group-members", args=("thread_a",), account_id=ACCOUNT, page_size=2)
+        self.assertEqual(members["pagination"]["total_count"], 3)
+        self.assertEqual(self.touchpoints(members["results"]), [1, 3])
+
+        # Dropping the hot member keeps the archived ones in the summary
+        self.delete_event(self.fourth)
+        group = self.fetch(grouped="true", sort_by="timestamp", page_size=10)["results"][2]
+        self.assertEqual(
+            (group["event_count"], group["last_timestamp"], group["event"]["touchpoint_id"]),
+            (2, "2024-01-25T09:00:00Z", "touchpoint_3"),
+        )
+        members = self.fetch("activity-group-members", args=("thread_a",), account_id=ACCOUNT)
+        self.assertEqual(self.touchpoints(members["results"]), [1, 3])
+
+
+class EventStreamTests(EventFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        stream_settings = override_settings(
+            EVENT_STREAM_SPOOL_PATH=self.storage / "event_stream.jsonl",
+            EVENT_STREAM_SPOOL_POLL_SECONDS=0.01,
+            EVENT_STREAM_HEARTBEAT_SECONDS=0.05,
+        )
+        stream_settings.enable()
+        self.addCleanup(stream_settings.disable)
+
+    def stream(self, until, during=None, headers=None, **params):
+        """Read ``activity`` frames until ``until(event_ids)`` holds.
+
+        ``during`` runs at the first keep-alive, once the stream has caught up
+        and waits for live messages. Returns the ready cursor and
+        ``[(frame id, message)]``.
+        """
+        request = RequestFactory().get(
+            "/", {"customer_org_id": ORG, **params}, headers=headers or {}
+        )
+
+        async def read(during=during):
+            response = await views.event_stream(request)
+            ready, frames = None, []
+            async for chunk in response.streaming_content:
+                if chunk.startswith(b":"):
+                    if during is not None:
+                        await sync_to_async(during)()
+                        during = None
+                    continue
+                fields = dict(
+                    line.split(": ", 1) for line in chunk.decode().splitlines() if ": " in line
+                )
+                if fields.get("event") == "ready":
+                    ready = int(fields["id"])
+                elif fields.get("event") == "activity":
+                    frames.append((int(fields["id"]), json.loads(fields["data"])))
+                    if until({e["id"] for _, m in frames for e in m["events"]}):
+                        return ready, frames
+
+        async def bounded():
+            return await asyncio.wait_for(read(), timeout=5)
+
+        return async_to_sync(bounded)()
+
+    def test_replay_resumes_without_losing_interleaved_accounts(self):
+        ids = [
+            self.make_event(n, utc(2024, 3, n), account_id=account).pk
+            for n, account in enumerate([ACCOUNT, "account_b", ACCOUNT, "account_b"], start=1)
+        ]
+
+        ready, frames = self.stream(lambda seen: seen >= set(ids), since=0)
+        self.assertEqual(ready, 0)
+        self.assertEqual(
+            [[e["id"] for e in message["events"]] for _, message in frames],
+            [[ids[0], ids[2]], [ids[1], ids[3]]],
+        )
+        # The first frame already holds ids[2]; resuming after it must still
+        # replay the lower ids of the second account.
+        first_id, last_id = frames[0][0], frames[-1][0]
+        self.assertLess(first_id, ids[1])
+        self.assertEqual(last_id, ids[3])
+
+        _, resumed = self.stream(
+            lambda seen: seen >= {ids[1], ids[3]}, headers={"last-event-id": str(first_id)}
+        )
+        self.assertNotIn(ids[0], {e["id"] for _, m in resumed for e in m["events"]})
+
+    def test_live_batches_published_out_of_order(self):
+        self.make_event(0, utc(2024, 3, 1))
+        created = []
+
+        def ingest():
+            # The second account's batch gets the lower ids but is published last.
+            other = self.make_event(1, utc(2024, 3, 2), account_id="account_b")
+            mine = self.make_event(2, utc(2024, 3, 3))
+            created.extend([other.pk, mine.pk])
+            pubsub.publish([mine])
+            pubsub.publish([other])
+
+        ready, frames = self.stream(lambda seen: seen >= set(created), during=ingest)
+
+        delivered = sorted(e["id"] for _, m in frames for e in m["events"])
+        self.assertEqual(delivered, sorted(created))
+        self.assertGreater(min(created), ready)
+        self.assertEqual(frames[-1][0], max(created))
+
+    def test_account_stream_skips_other_accounts(self):
+        def ingest():
+            other = self.make_event(1, utc(2024, 3, 2), account_id="account_b")
+            mine = self.make_event(2, utc(2024, 3, 3))
+            pubsub.publish([other, mine])
+
+        _, frames = self.stream(lambda seen: bool(seen), during=ingest, account_id=ACCOUNT)
+
+        self.assertEqual({m["account_id"] for _, m in frames}, {ACCOUNT})
+
+    def test_invalid_since(self):
+        response = self.client.get(
+            reverse("api:event-stream"), {"customer_org_id": ORG, "since": "latest"}
+        )
+        self.assertEqual(response.status_code, 400)
@@ -14,10 +14,32 @@ urlpatterns = [
     # New paginated endpoints
     path("api/events/", views.all_activity_events, name="all-activity-events"),
     path("api/events/chart/", views.all_events_for_chart, name="all-events-chart"),
+    path("api/events/minimap/", views.event_minimap, name="event-minimap"),
+    path("api/events/minimap/detail/", views.event_minimap_detail, name="event-minimap-detail"),
+    path("api/events/first-touchpoints/", views.first_touchpoints, name="first-touchpoints"),
+    path("api/events/changes/", views.event_changes, name="event-changes"),
+    path(
+        "api/events/groups/<str:activity_grouping_id>/members/",
+        views.activity_group_members,
+        name="activity-group-members",
+    ),
+    path("api/events/stream/", views.event_stream, name="event-stream"),
     path("api/people/", views.all_persons, name="all-people"),
     
     # Dashboard endpoints
     path("api/dashboard/stats/", views.dashboard_stats, name="dashboard-stats"),
     path("api/dashboard/activity-timeline/", views.activity_timeline, name="activity-timeline"),
     path("api/dashboard/channel-breakdown/", views.channel_breakdown, name="channel-breakdown"),
+    path("api/dashboard/team-breakdown/", views.team_breakdown, name="team-breakdown"),
+    
+    # Opportunity endpoints
+    path("api/opportunities/<str:opportunity_id>/events/", views.opportunity_events, name="opportunity-events"),
+    path("api/opportunities/<str:opportunity_id>/summary/", views.opportunity_summary, name="opportunity-summary"),
+    
+    # Bulk export
+    path("api/export/events/", views.export_events, name="export-events"),
+    path("api/export/people/", views.export_people, name="export-people"),
+    
+    # Operational metrics
+    path("api/metrics/coalescing/", views.coalescing_metrics, name="coalescing-metrics"),
 ] 
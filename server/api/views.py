@@ -1,11 +1,26 @@
 from django.shortcuts import render
-from django.http import HttpResponse, JsonResponse
-from django.db.models import QuerySet, Count, Q, Min, Max
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db.models import QuerySet, Count, F, Q, Min, Max, Value
 from django.db import models
+from django.db.models.functions import Lower, TruncMonth
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.core.paginator import Paginator
-from datetime import timedelta
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+import asyncio
+import base64
+import heapq
 import json
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+
+import numpy as np
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 
 # Create your views here.
 
@@ -15,14 +30,172 @@ def index(request):
         "version": "1.0.0",
         "endpoints": {
             "events": "/api/events/",
+            "event_minimap": "/api/events/minimap/",
+            "event_minimap_detail": "/api/events/minimap/detail/",
+            "first_touchpoints": "/api/events/first-touchpoints/",
+            "event_changes": "/api/events/changes/",
+            "activity_group_members": "/api/events/groups/<activity_grouping_id>/members/",
+            "event_stream": "/api/events/stream/",
             "people": "/api/people/",
             "dashboard_stats": "/api/dashboard/stats/",
             "activity_timeline": "/api/dashboard/activity-timeline/",
-            "channel_breakdown": "/api/dashboard/channel-breakdown/"
+            "channel_breakdown": "/api/dashboard/channel-breakdown/",
+            "team_breakdown": "/api/dashboard/team-breakdown/",
+            "opportunity_events": "/api/opportunities/<opportunity_id>/events/",
+            "opportunity_summary": "/api/opportunities/<opportunity_id>/summary/",
+            "export_events": "/api/export/events/",
+            "export_people": "/api/export/people/",
+            "coalescing_metrics": "/api/metrics/coalescing/"
         }
     })
 
-from .models import ActivityEvent, Person
+from . import bucketing, eventstore, export, minimap, partitions, pubsub, singleflight
+from .cache import cached_response
+from .singleflight import coalesced
+from .snapshots import serves_snapshot
+from .models import (
+    AccountChangeSequence,
+    ActivityEvent,
+    ActivityEventTombstone,
+    ActivityGroup,
+    EventOpportunity,
+    EventTeam,
+    Person,
+)
+
+OPPORTUNITY_DEFAULT_PAGE_SIZE = 50
+OPPORTUNITY_MAX_PAGE_SIZE = 500
+PERSON_FIELDS = ("id", "customer_org_id", "first_name", "last_name", "email_address", "job_title")
+PERSON_CURSOR_FIELDS = ("last_name", "first_name", "id")
+PEOPLE_DEFAULT_PAGE_SIZE = 100
+PEOPLE_MAX_PAGE_SIZE = 1000
+CHANGES_DEFAULT_LIMIT = 1000
+CHANGES_MAX_LIMIT = 10000
+EVENT_STREAM_REPLAY_BATCH = 1000
+EVENT_STREAM_RETRY_MS = 3000
+# Fields a time series can be split by (``split_by`` on the chart/timeline).
+BUCKET_SPLIT_FIELDS = ("direction", "channel", "status")
+MINIMAP_DEFAULT_WIDTH = 400
+MINIMAP_MAX_WIDTH = 4000
+
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+
+def _encode_cursor(values):
+    """Encode keyset values as an opaque, URL-safe cursor string."""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor):
+    """Inverse of ``_encode_cursor``; raises ``ValueError`` on malformed input."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("malformed cursor") from exc
+    if not isinstance(values, list):
+        raise ValueError("malformed cursor")
+    return values
+
+
+def _bucket_params(request):
+    """Parse ``bucket``, ``tz`` and ``split_by``; raises ``ValueError`` if invalid."""
+    unit = request.GET.get("bucket", "day")
+    if unit not in bucketing.UNITS:
+        raise ValueError(f"'bucket' must be one of: {', '.join(bucketing.UNITS)}.")
+    tz = request.GET.get("tz", "UTC")
+    bucketing.resolve_timezone(tz)
+    split_by = request.GET.get("split_by") or None
+    if split_by is not None and split_by not in BUCKET_SPLIT_FIELDS:
+        raise ValueError(f"'split_by' must be one of: {', '.join(BUCKET_SPLIT_FIELDS)}.")
+    return unit, tz, split_by
+
+
+def _minimap_width(request):
+    """Parse ``width`` (points to return); raises ``ValueError`` if invalid."""
+    try:
+        width = int(request.GET.get("width", MINIMAP_DEFAULT_WIDTH))
+    except ValueError as exc:
+        raise ValueError("'width' must be an integer.") from exc
+    if not 3 <= width <= MINIMAP_MAX_WIDTH:
+        raise ValueError(f"'width' must be between 3 and {MINIMAP_MAX_WIDTH}.")
+    return width
+
+
+def _parse_moment(name, value, end_of_day=False):
+    """Parse an ISO date or datetime query parameter as an aware UTC datetime.
+
+    A bare date means the start of that day, or its end with ``end_of_day``.
+    Raises ``ValueError`` if the value is not a valid date or datetime.
+    """
+    moment = None
+    try:
+        day = parse_date(value)
+        if day is not None:
+            moment = datetime.combine(day, time.max if end_of_day else time.min)
+        else:
+            moment = parse_datetime(value)
+    except ValueError:
+        pass
+    if moment is None:
+        raise ValueError(f"'{name}' must be an ISO 8601 date or datetime.")
+    if timezone.is_naive(moment):
+        return moment.replace(tzinfo=dt_timezone.utc)
+    return moment.astimezone(dt_timezone.utc)
+
+
+def _export_params(request):
+    """Parse ``format``, ``start`` and ``end``; raises ``ValueError`` if invalid."""
+    fmt = request.GET.get("format", "csv")
+    if fmt not in export.FORMATS:
+        raise ValueError(f"'format' must be one of: {', '.join(export.FORMATS)}.")
+    start = request.GET.get("start")
+    end = request.GET.get("end")
+    start = _parse_moment("start", start) if start else None
+    end = _parse_moment("end", end, end_of_day=True) if end else None
+    return fmt, start, end
+
+
+def _filter_team(events_qs, customer_org_id, team_id):
+    """Restrict ``events_qs`` to events involving ``team_id``."""
+    return events_qs.filter(
+        id__in=EventTeam.objects.filter(
+            customer_org_id=customer_org_id, team_id=team_id
+        ).values("event_id")
+    )
+
+
+def _prefix_range(field, prefix):
+    """Return a Q matching the lower-cased ``field`` alias starting with ``prefix``.
+
+    Expressed as a half-open range rather than LIKE so both SQLite and Postgres
+    answer it from the ``Lower()`` expression indexes on ``Person``.
+    """
+    prefix = prefix.lower()
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": prefix + "\U0010ffff"})
+
+
+def _person_prefix_filter(q):
+    """Build the type-ahead filter used by ``all_persons``.
+
+    Expects the queryset to carry the ``*_lower`` aliases set up in the view.
+    """
+    q = q.lower()
+    condition = (
+        _prefix_range("first_name_lower", q)
+        | _prefix_range("last_name_lower", q)
+        | _prefix_range("email_address_lower", q)
+    )
+    first, _, rest = q.partition(" ")
+    if rest.strip():
+        # "first last" style query.
+        condition |= _prefix_range("first_name_lower", first) & _prefix_range(
+            "last_name_lower", rest.strip()
+        )
+    return condition
 
 
 # -----------------------------------------------------------------------------
@@ -85,6 +258,7 @@ def random_persons(request):
 # Dashboard API Endpoints
 # -----------------------------------------------------------------------------
 
+@coalesced
 def dashboard_stats(request):
     """Return dashboard statistics for the given customer."""
     customer_org_id = request.GET.get("customer_org_id")
@@ -100,30 +274,38 @@ def dashboard_stats(request):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=days)
     
-    # Get events for the customer
-    events_qs = ActivityEvent.objects.filter(
-        customer_org_id=customer_org_id,
-        timestamp__gte=start_date,
-        timestamp__lte=end_date
-    )
-    
     # Get people for the customer
     people_qs = Person.objects.filter(customer_org_id=customer_org_id)
     
+    # Events by (status, channel), routed to the partitions the window
+    # overlaps; both breakdowns and the total are derived from it.
+    grouped = partitions.count_by(
+        customer_org_id, start_date, end_date, ("status", "channel")
+    )
+    status_counts = Counter()
+    channel_counts = Counter()
+    for row in grouped:
+        status_counts[row["status"]] += row["count"]
+        channel_counts[row["channel"]] += row["count"]
+    
     # Calculate statistics
-    total_events = events_qs.count()
+    total_events = sum(status_counts.values())
     total_people = people_qs.count()
     
     # Events by status
-    status_breakdown = list(events_qs.values('status').annotate(count=Count('status')))
+    status_breakdown = [
+        {"status": status, "count": count} for status, count in status_counts.items()
+    ]
     
     # Events by channel
-    channel_breakdown = list(events_qs.values('channel').annotate(count=Count('channel')))
+    channel_breakdown = [
+        {"channel": channel, "count": count} for channel, count in channel_counts.items()
+    ]
     
     # Recent activity (last 7 days)
-    recent_events = events_qs.filter(
-        timestamp__gte=timezone.now() - timedelta(days=7)
-    ).count()
+    recent_events = partitions.count(
+        customer_org_id, max(start_date, timezone.now() - timedelta(days=7)), end_date
+    )
     
     stats = {
         "total_events": total_events,
@@ -142,7 +324,17 @@ def dashboard_stats(request):
 
 
 def activity_timeline(request):
-    """Return activity events over time for chart visualization."""
+    """Return activity events over time for chart visualization.
+
+    Query parameters:
+    - customer_org_id (required)
+    - account_id (optional)
+    - days (optional, default: 30)
+    - bucket (optional, default: 'day') - hour, day, week or month
+    - tz (optional, default: 'UTC') - IANA time zone the buckets follow
+    - split_by (optional) - direction, channel or status; adds per-value
+      ``series`` counts to every row
+    """
     customer_org_id = request.GET.get("customer_org_id")
     
     if not customer_org_id:
@@ -150,25 +342,37 @@ def activity_timeline(request):
             {"error": "'customer_org_id' query parameter is required."},
             status=400,
         )
+    try:
+        unit, tz, split_by = _bucket_params(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
     
     # Get date range (default to last 30 days)
     days = int(request.GET.get("days", 30))
     end_date = timezone.now()
     start_date = end_date - timedelta(days=days)
     
-    # Get events grouped by day
-    events_qs = ActivityEvent.objects.filter(
-        customer_org_id=customer_org_id,
-        timestamp__gte=start_date,
-        timestamp__lte=end_date
-    ).extra(
-        select={'day': 'date(timestamp)'}
-    ).values('day').annotate(count=Count('id')).order_by('day')
-    
-    timeline_data = list(events_qs)
+    # Account windows are sliced out of the column store; otherwise bucket the
+    # window's events (both storage tiers).
+    account_id = request.GET.get("account_id")
+    columns = eventstore.columns_for(customer_org_id, account_id)
+    if columns is not None:
+        window = slice(columns.position(start_date), columns.position(end_date, side="right"))
+        stamps = columns.timestamps[window]
+        values = columns.codes[split_by][window] if split_by else None
+        names = columns.labels(split_by) if split_by else None
+    else:
+        stamps, values = partitions.event_arrays(
+            customer_org_id, start_date, end_date, split_by, account_id
+        )
+        names = None
+    timeline_data = bucketing.rows(
+        bucketing.bucket_counts(stamps, unit, tz, values, series_names=names), key="day"
+    )
     
     return JsonResponse({
         "timeline": timeline_data,
+        "bucket": {"unit": unit, "timezone": tz, "split_by": split_by},
         "date_range": {
             "start": start_date.isoformat(),
             "end": end_date.isoformat(),
@@ -177,15 +381,21 @@ def activity_timeline(request):
     })
 
 
+@cached_response
 def all_activity_events(request):
     """Return all ActivityEvent records with pagination for the given customer.
     
     Query parameters:
     - customer_org_id (required)
     - account_id (optional)
+    - team_id (optional)
     - page (optional, default: 1)
     - page_size (optional, default: 10)
     - sort_by (optional, default: '-timestamp')
+    - seek (optional) - ISO date or datetime; returns the page holding the
+      first event at (or, newest first, before) that moment instead of ``page``
+    - grouped (optional) - ``true`` collapses events sharing an
+      ``activity_grouping_id`` into one row each (see ``_grouped_events``)
     """
     customer_org_id = request.GET.get("customer_org_id")
     
@@ -203,28 +413,75 @@ def all_activity_events(request):
     if account_id:
         events_qs = events_qs.filter(account_id=account_id)
     
+    # Optional team_id filter (via the EventTeam index)
+    team_id = request.GET.get("team_id")
+    if team_id:
+        events_qs = _filter_team(events_qs, customer_org_id, team_id)
+    
+    # Collapsed view: one row per activity group
+    if request.GET.get("grouped", "").lower() in ("1", "true", "yes"):
+        if team_id:
+            return JsonResponse(
+                {"error": "'team_id' cannot be combined with 'grouped'."},
+                status=400,
+            )
+        return _grouped_events(request, events_qs, customer_org_id, account_id)
+    
     # Sorting (default: newest first)
     sort_by = request.GET.get("sort_by", "-timestamp")
-    events_qs = events_qs.order_by(sort_by)
     
-    # Get total count before pagination
-    total_count = events_qs.count()
+    # Pagination
+    page = int(request.GET.get("page", 1))
+    page_size = int(request.GET.get("page_size", 10))
+    
+    # Optional jump to the page holding a given moment
+    seek = request.GET.get("seek")
+    if seek:
+        if sort_by not in ("timestamp", "-timestamp"):
+            return JsonResponse(
+                {"error": "'seek' requires sort_by 'timestamp' or '-timestamp'."},
+                status=400,
+            )
+        try:
+            seek = _parse_moment("seek", seek)
+        except ValueError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+    
+    # Time-sorted account pages come from the in-process column store
+    if sort_by in ("timestamp", "-timestamp") and not team_id:
+        columns = eventstore.columns_for(customer_org_id, account_id)
+        if columns is not None:
+            return _events_page_from_store(
+                customer_org_id, columns, sort_by, page, page_size, seek or None
+            )
+    
+    # Listings with archived events span both storage tiers
+    tiers = _listing_tiers(events_qs, customer_org_id, account_id, team_id, sort_by)
+    
+    events_qs = events_qs.order_by(sort_by)
+    if seek:
+        if tiers is not None:
+            before = tiers[0].before(seek)
+        elif sort_by.startswith('-'):
+            before = events_qs.filter(timestamp__gt=seek).count()
+        else:
+            before = events_qs.filter(timestamp__lt=seek).count()
+        page = before // page_size + 1
     
     # Get date range of all events
     date_range = events_qs.aggregate(
         min_date=models.Min('timestamp'),
         max_date=models.Max('timestamp')
     )
+    if tiers is not None:
+        date_range = _widen_range(date_range, tiers[1])
     
-    # Pagination
-    page = int(request.GET.get("page", 1))
-    page_size = int(request.GET.get("page_size", 10))
-    
-    paginator = Paginator(events_qs, page_size)
+    paginator = Paginator(tiers[0] if tiers is not None else events_qs.values(), page_size)
     page_obj = paginator.get_page(page)
+    total_count = paginator.count
     
     # Get events for current page
-    events = list(page_obj.object_list.values())
+    events = list(page_obj.object_list)
     
     # Get date range for current page
     # Note: The order depends on the sort_by parameter
@@ -235,14 +492,14 @@ def all_activity_events(request):
         if is_descending:
             # For descending order (newest first)
             page_date_range = {
-                "start": events[-1]["timestamp"].isoformat(),
-                "end": events[0]["timestamp"].isoformat(),
+                "start": _iso_ms(events[-1]["timestamp"]),
+                "end": _iso_ms(events[0]["timestamp"]),
             }
         else:
             # For ascending order (oldest first)
             page_date_range = {
-                "start": events[0]["timestamp"].isoformat(),
-                "end": events[-1]["timestamp"].isoformat(),
+                "start": _iso_ms(events[0]["timestamp"]),
+                "end": _iso_ms(events[-1]["timestamp"]),
             }
     else:
         page_date_range = {"start": None, "end": None}
@@ -259,120 +516,1037 @@ def all_activity_events(request):
         },
         "date_range": {
             "overall": {
-                "start": date_range["min_date"].isoformat() if date_range["min_date"] else None,
-                "end": date_range["max_date"].isoformat() if date_range["max_date"] else None,
+                "start": _iso_ms(date_range["min_date"]) if date_range["min_date"] else None,
+                "end": _iso_ms(date_range["max_date"]) if date_range["max_date"] else None,
             },
             "current_page": page_date_range
         }
     })
 
 
-def all_events_for_chart(request):
-    """Return all ActivityEvent records aggregated for chart visualization.
-    
-    Query parameters:
-    - customer_org_id (required)
-    - account_id (optional)
+def _events_by_id(customer_org_id, ids, months=None):
+    """``values()`` dicts of the events ``ids``, hot or archived, keyed by id.
+
+    Ids missing from the database are looked up in the archive, in ``months``
+    when the caller knows them.
     """
-    customer_org_id = request.GET.get("customer_org_id")
+    ids = [int(event_id) for event_id in ids]
+    found = {event["id"]: event for event in ActivityEvent.objects.filter(id__in=ids).values()}
+    missing = [event_id for event_id in ids if event_id not in found]
+    if missing and partitions.archived_months():
+        found.update(partitions.archived_values(customer_org_id, missing, months))
+    return found
+
+
+def _rows_for_keys(customer_org_id, keys):
+    """``values()`` rows of ``(timestamp, id)`` keys, in order, from either tier."""
+    by_id = _events_by_id(
+        customer_org_id,
+        [event_id for _, event_id in keys],
+        {partitions.month_of(timestamp) for timestamp, _ in keys},
+    )
+    return [by_id[event_id] for _, event_id in keys if event_id in by_id]
+
+
+class _MonthlyRows:
+    """Paginator-friendly time-sorted rows of a listing that spans both tiers.
+
+    ``counts`` lists ``(month, rows)`` in listing order, built from SQL
+    aggregates and ``EventPartitionCount``, so totals and offsets never read
+    the archive. ``fetch(month, start, stop)`` returns a slice of one month's
+    rows and ``position(month, moment)`` counts the month's rows listed before
+    ``moment``: a page only reads the month(s) it falls in.
+    """
+
+    def __init__(self, counts, descending, fetch, position=None):
+        self.counts = [(month, rows) for month, rows in counts if rows]
+        self.descending = descending
+        self.fetch = fetch
+        self.position = position
+
+    def count(self):
+        return sum(rows for _, rows in self.counts)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        start, stop, _ = index.indices(self.count())
+        rows, offset = [], 0
+        for month, size in self.counts:
+            if offset >= stop:
+                break
+            if offset + size > start:
+                rows += self.fetch(month, max(start - offset, 0), min(stop - offset, size))
+            offset += size
+        return rows
+
+    def before(self, moment):
+        """Number of rows listed before ``moment``."""
+        target = partitions.month_of(moment)
+        total = 0
+        for month, size in self.counts:
+            if month == target:
+                return total + self.position(month, moment)
+            if (month > target) != self.descending:
+                break
+            total += size
+        return total
+
+
+class _MergedRows:
+    """Paginator-friendly merge of two key streams sorted in listing order.
+
+    ``archived(stop)`` and ``hot(stop)`` return the first ``stop`` keys of each
+    tier, ``key`` orders them and ``resolve`` turns the page's keys into rows,
+    so a page reads at most ``stop`` keys per tier.
+    """
+
+    def __init__(self, total, archived, hot, descending, resolve, key=None):
+        self.total = total
+        self.archived = archived
+        self.hot = hot
+        self.descending = descending
+        self.resolve = resolve
+        self.key = key
+
+    def count(self):
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, index):
+        start, stop, _ = index.indices(self.total)
+        merged = heapq.merge(
+            self.archived(stop), self.hot(stop), key=self.key, reverse=self.descending
+        )
+        return self.resolve(list(islice(merged, start, stop)))
+
+
+def _archived_time_keys(customer_org_id, month, account_id, team_id, descending=False):
+    """``(timestamp, id)`` keys of one archived month of a listing, in listing order."""
+    table = partitions.archived_table(
+        customer_org_id, ("timestamp", "id"), account_id=account_id, team_id=team_id, months=[month]
+    )
+    order = "descending" if descending else "ascending"
+    table = table.sort_by([("timestamp", order), ("id", order)])
+    return list(zip(table["timestamp"].to_pylist(), table["id"].to_pylist()))
+
+
+@lru_cache(maxsize=16)
+def _sorted_archived_keys(customer_org_id, account_id, team_id, field, generation):
+    """Archived ``field``, ``id`` and ``timestamp`` of a listing, sorted ascending.
+
+    NULLs come first, as SQLite sorts them. ``generation`` changes whenever
+    ``archive_events`` runs, so the archive is read and sorted once per run,
+    not per page.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    columns = list(dict.fromkeys([field, "id", "timestamp"]))
+    table = partitions.archived_table(
+        customer_org_id, columns, account_id=account_id, team_id=team_id
+    )
+    nulls = pc.is_null(table[field])
+    return pa.concat_tables([
+        table.filter(nulls).sort_by("id"),
+        table.filter(pc.invert(nulls)).sort_by([(field, "ascending"), ("id", "ascending")]),
+    ])
+
+
+def _listing_tiers(events_qs, customer_org_id, account_id, team_id, sort_by):
+    """``(rows, (first, last archived timestamp))`` of a listing, or ``None``.
+
+    ``None`` when none of the listed events is archived. Time sorts page
+    month by month (``_MonthlyRows``) and merge the tiers only within months
+    holding archived rows; other sorts merge the hot rows, in SQL order, with
+    the archived keys sorted by ``_sorted_archived_keys``.
+    """
+    archived = partitions.archived_counts(customer_org_id, account_id, team_id)
+    if not archived:
+        return None
+    bounds = (
+        min(row["first"] for row in archived.values()),
+        max(row["last"] for row in archived.values()),
+    )
+    field = sort_by.lstrip('-')
+    descending = sort_by.startswith('-')
+
+    if field != "timestamp":
+        keys = _sorted_archived_keys(
+            customer_org_id, account_id or None, team_id or None, field,
+            partitions.archive_generation(),
+        )
+        
+        def archived_keys(stop):
+            part = keys.slice(max(keys.num_rows - stop, 0)) if descending else keys.slice(0, stop)
+            rows = list(zip(part[field].to_pylist(), part["id"].to_pylist(), part["timestamp"].to_pylist()))
+            return rows[::-1] if descending else rows
+        
+        def hot_keys(stop):
+            ordering = (sort_by, "-id") if descending else (sort_by, "id")
+            return events_qs.order_by(*ordering).values_list(field, "id", "timestamp")[:stop]
+        
+        rows = _MergedRows(
+            events_qs.count() + keys.num_rows,
+            archived_keys,
+            hot_keys,
+            descending,
+            lambda page: _rows_for_keys(customer_org_id, [(ts, event_id) for _, event_id, ts in page]),
+            # NULLs first, as SQLite sorts them
+            key=lambda key: (key[0] is not None, "" if key[0] is None else key[0], key[1]),
+        )
+        return rows, bounds
     
-    if not customer_org_id:
-        return JsonResponse(
-            {"error": "'customer_org_id' query parameter is required."},
-            status=400,
+    hot = dict(events_qs.order_by().values_list("partition_month").annotate(Count("id")))
+    counts = [
+        (month, hot.get(month, 0) + archived.get(month, {}).get("count", 0))
+        for month in sorted(hot.keys() | archived.keys(), reverse=descending)
+    ]
+    order = ("-timestamp", "-id") if descending else ("timestamp", "id")
+    
+    def fetch(month, start, stop):
+        month_qs = events_qs.filter(partition_month=month)
+        if month not in archived:
+            return list(month_qs.order_by(sort_by).values()[start:stop])
+        merged = heapq.merge(
+            _archived_time_keys(customer_org_id, month, account_id, team_id, descending),
+            month_qs.order_by(*order).values_list("timestamp", "id")[:stop],
+            reverse=descending,
         )
+        return _rows_for_keys(customer_org_id, list(islice(merged, start, stop)))
     
-    # Build query
-    events_qs = ActivityEvent.objects.filter(customer_org_id=customer_org_id)
+    def position(month, moment):
+        month_qs = events_qs.filter(partition_month=month)
+        if month in archived:
+            stamps = [ts for ts, _ in _archived_time_keys(customer_org_id, month, account_id, team_id)]
+        else:
+            stamps = []
+        if descending:
+            return len(stamps) - bisect_right(stamps, moment) + month_qs.filter(timestamp__gt=moment).count()
+        return bisect_left(stamps, moment) + month_qs.filter(timestamp__lt=moment).count()
     
-    # Optional account_id filter
-    account_id = request.GET.get("account_id")
-    if account_id:
-        events_qs = events_qs.filter(account_id=account_id)
+    return _MonthlyRows(counts, descending, fetch, position), bounds
+
+
+def _iso_ms(moment):
+    """``moment.isoformat()`` at the millisecond precision the column store keeps."""
+    return moment.replace(microsecond=moment.microsecond // 1000 * 1000).isoformat()
+
+
+def _widen_range(date_range, bounds):
+    """Extend a ``{"min_date", "max_date"}`` aggregate by ``(first, last)``."""
+    return {
+        "min_date": min(filter(None, (date_range["min_date"], bounds[0]))),
+        "max_date": max(filter(None, (date_range["max_date"], bounds[1]))),
+    }
+
+
+def _events_page_from_store(customer_org_id, columns, sort_by, page, page_size, seek):
+    """``all_activity_events`` for one account, paged over its column store.
+
+    Totals, date ranges and ``seek`` come from the sorted timestamp array
+    (``seek`` is a binary search); only the page's rows are read, by id.
+    """
+    total_count = len(columns)
+    descending = sort_by.startswith('-')
+    if seek is not None:
+        if descending:
+            before = total_count - columns.position(seek, side="right")
+        else:
+            before = columns.position(seek)
+        page = before // page_size + 1
     
-    # Get all events ordered by timestamp
-    events_qs = events_qs.order_by('timestamp')
+    positions = np.arange(total_count)
+    paginator = Paginator(positions[::-1] if descending else positions, page_size)
+    page_obj = paginator.get_page(page)
+    index = page_obj.object_list
     
-    # Get all events with minimal fields for chart
-    events = list(events_qs.values('id', 'timestamp', 'activity', 'channel', 'status'))
+    page_ids = columns.ids[index].tolist()
+    by_id = _events_by_id(
+        customer_org_id, page_ids, {partitions.month_of(columns.datetime_at(i)) for i in index}
+    )
+    events = [by_id[event_id] for event_id in page_ids if event_id in by_id]
     
-    # Get date range
-    if events:
-        date_range = {
-            "start": events[0]["timestamp"].isoformat(),
-            "end": events[-1]["timestamp"].isoformat(),
-        }
-    else:
-        date_range = {"start": None, "end": None}
-    
-    # Group by date for daily counts
-    daily_counts = {}
-    for event in events:
-        date_key = event['timestamp'].date().isoformat()
-        if date_key not in daily_counts:
-            daily_counts[date_key] = 0
-        daily_counts[date_key] += 1
-    
-    # Convert to sorted list
-    daily_data = [
-        {"date": date, "count": count}
-        for date, count in sorted(daily_counts.items())
-    ]
+    def moment(i):
+        return columns.datetime_at(i).isoformat()
     
     return JsonResponse({
-        "events": events,
-        "daily_counts": daily_data,
-        "total_count": len(events),
-        "date_range": date_range
+        "results": events,
+        "pagination": {
+            "total_count": total_count,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": paginator.num_pages,
+            "has_next": page_obj.has_next(),
+            "has_previous": page_obj.has_previous(),
+        },
+        "date_range": {
+            "overall": columns.date_range(),
+            "current_page": {
+                "start": moment(index.min()) if len(index) else None,
+                "end": moment(index.max()) if len(index) else None,
+            },
+        }
     })
 
 
-def all_persons(request):
-    """Return all Person records for the given customer.
-    
-    Query parameters:
-    - customer_org_id (required)
+def _grouped_events(request, events_qs, customer_org_id, account_id):
+    """Paginated collapsed view backing ``all_activity_events?grouped=true``.
+
+    Rows are the precomputed ``ActivityGroup`` summaries unioned with the
+    ungrouped events, ordered by (last) timestamp. Each row carries the group's
+    event count, first/last timestamp, participant union and its latest event;
+    the members of a group are listed by ``activity_group_members``.
     """
-    customer_org_id = request.GET.get("customer_org_id")
-    
-    if not customer_org_id:
+    sort_by = request.GET.get("sort_by", "-timestamp")
+    if sort_by not in ("timestamp", "-timestamp"):
         return JsonResponse(
-            {"error": "'customer_org_id' query parameter is required."},
+            {"error": "Grouped view only supports sort_by 'timestamp' or '-timestamp'."},
             status=400,
         )
-    
-    persons_qs = Person.objects.filter(customer_org_id=customer_org_id)
-    persons = list(persons_qs.values())
-    
+    direction = "-" if sort_by.startswith("-") else ""
+
+    groups_qs = ActivityGroup.objects.filter(customer_org_id=customer_org_id)
+    if account_id:
+        groups_qs = groups_qs.filter(account_id=account_id)
+    # Explicit annotations on both sides keep the union's columns aligned.
+    groups_rows = groups_qs.order_by().annotate(
+        row_type=Value("group"),
+        row_account=F("account_id"),
+        row_group=F("activity_grouping_id"),
+        row_event=F("latest_event_id"),
+        row_ts=F("last_timestamp"),
+        row_first_ts=F("first_timestamp"),
+        row_count=F("event_count"),
+    ).values("row_type", "row_account", "row_group", "row_event", "row_ts", "row_first_ts", "row_count")
+    single_rows = events_qs.filter(activity_grouping_id__isnull=True).order_by().annotate(
+        row_type=Value("event"),
+        row_account=F("account_id"),
+        row_group=F("activity_grouping_id"),
+        row_event=F("id"),
+        row_ts=F("timestamp"),
+        row_first_ts=F("timestamp"),
+        row_count=Value(1),
+    ).values("row_type", "row_account", "row_group", "row_event", "row_ts", "row_first_ts", "row_count")
+    rows_qs = groups_rows.union(single_rows, all=True).order_by(
+        f"{direction}row_ts", f"{direction}row_event"
+    )
+
+    # Summaries cover archived events too; only archived ungrouped events
+    # live outside SQL, and those are merged month by month.
+    archived = partitions.archived_counts(customer_org_id, account_id)
+    if any(row["ungrouped"] for row in archived.values()):
+        rows_qs = _grouped_months(
+            groups_qs, groups_rows, single_rows, events_qs, archived,
+            customer_org_id, account_id, bool(direction),
+        )
+
+    page = int(request.GET.get("page", 1))
+    page_size = int(request.GET.get("page_size", 10))
+    paginator = Paginator(rows_qs, page_size)
+    page_obj = paginator.get_page(page)
+    rows = list(page_obj.object_list)
+
+    events_by_id = _events_by_id(
+        customer_org_id,
+        [row["row_event"] for row in rows],
+        {partitions.month_of(row["row_ts"]) for row in rows},
+    )
+    group_keys = {(row["row_account"], row["row_group"]) for row in rows if row["row_type"] == "group"}
+    participants = {
+        (group["account_id"], group["activity_grouping_id"]): group["participants"]
+        for group in groups_qs.filter(
+            activity_grouping_id__in={grouping_id for _, grouping_id in group_keys}
+        ).values("account_id", "activity_grouping_id", "participants")
+    }
+
+    results = []
+    for row in rows:
+        event = events_by_id.get(row["row_event"])
+        if row["row_type"] == "group":
+            people = participants.get((row["row_account"], row["row_group"]), [])
+        else:
+            people = sorted({p["id"] for p in (event or {}).get("people") or []})
+        results.append({
+            "type": row["row_type"],
+            "activity_grouping_id": row["row_group"],
+            "event_count": row["row_count"],
+            "first_timestamp": row["row_first_ts"],
+            "last_timestamp": row["row_ts"],
+            "participants": people,
+            "event": event,
+        })
+
+    total_count = paginator.count
+    date_range = events_qs.aggregate(
+        min_date=models.Min('timestamp'),
+        max_date=models.Max('timestamp')
+    )
+    if archived:
+        date_range = _widen_range(date_range, (
+            min(row["first"] for row in archived.values()),
+            max(row["last"] for row in archived.values()),
+        ))
+    if results:
+        timestamps = [r["first_timestamp"] for r in results] + [r["last_timestamp"] for r in results]
+        page_date_range = {
+            "start": min(timestamps).isoformat(),
+            "end": max(timestamps).isoformat(),
+        }
+    else:
+        page_date_range = {"start": None, "end": None}
+
     return JsonResponse({
-        "results": persons,
-        "count": len(persons)
+        "results": results,
+        "pagination": {
+            "total_count": total_count,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": paginator.num_pages,
+            "has_next": page_obj.has_next(),
+            "has_previous": page_obj.has_previous(),
+        },
+        "date_range": {
+            "overall": {
+                "start": date_range["min_date"].isoformat() if date_range["min_date"] else None,
+                "end": date_range["max_date"].isoformat() if date_range["max_date"] else None,
+            },
+            "current_page": page_date_range
+        }
     })
 
 
-def channel_breakdown(request):
-    """Return detailed breakdown of events by channel."""
+def _grouped_months(groups_qs, groups_rows, single_rows, events_qs, archived,
+                    customer_org_id, account_id, descending):
+    """``_MonthlyRows`` of the collapsed view when ungrouped events are archived.
+
+    A group is listed in the month of its last event. ``archived`` is the
+    slice's ``partitions.archived_counts``.
+    """
+    direction = "-" if descending else ""
+    counts = Counter({
+        month.date(): rows
+        for month, rows in groups_qs.order_by()
+        .annotate(month=TruncMonth("last_timestamp", tzinfo=dt_timezone.utc))
+        .values_list("month")
+        .annotate(Count("id"))
+    })
+    counts.update(dict(
+        events_qs.filter(activity_grouping_id__isnull=True)
+        .order_by()
+        .values_list("partition_month")
+        .annotate(Count("id"))
+    ))
+    counts.update({month: row["ungrouped"] for month, row in archived.items()})
+    row_key = itemgetter("row_ts", "row_event")
+
+    def fetch(month, start, stop):
+        month_start, month_end = partitions.month_range(month)
+        month_rows = groups_rows.filter(
+            last_timestamp__gte=month_start, last_timestamp__lt=month_end
+        ).union(single_rows.filter(partition_month=month), all=True).order_by(
+            f"{direction}row_ts", f"{direction}row_event"
+        )
+        if not archived.get(month, {}).get("ungrouped"):
+            return list(month_rows[start:stop])
+        table = partitions.archived_table(
+            customer_org_id,
+            ("id", "account_id", "timestamp", "activity_grouping_id"),
+            account_id=account_id,
+            months=[month],
+        )
+        singles = sorted(
+            (
+                {
+                    "row_type": "event",
+                    "row_account": event["account_id"],
+                    "row_group": None,
+                    "row_event": event["id"],
+                    "row_ts": event["timestamp"],
+                    "row_first_ts": event["timestamp"],
+                    "row_count": 1,
+                }
+                for event in table.to_pylist()
+                if not event["activity_grouping_id"]
+            ),
+            key=row_key,
+            reverse=descending,
+        )
+        merged = heapq.merge(singles, month_rows[:stop], key=row_key, reverse=descending)
+        return list(islice(merged, start, stop))
+
+    return _MonthlyRows(sorted(counts.items(), reverse=descending), descending, fetch)
+
+
+@cached_response
+def activity_group_members(request, activity_grouping_id):
+    """Return the events of one activity group, oldest first, paginated.
+
+    Lets clients expand a collapsed row from ``/api/events/?grouped=true``
+    lazily. Served from the ``(org, account, activity_grouping_id, timestamp)``
+    index.
+
+    Query parameters:
+    - customer_org_id (required)
+    - account_id (required)
+    - page (optional, default: 1)
+    - page_size (optional, default: 50)
+    """
     customer_org_id = request.GET.get("customer_org_id")
-    
-    if not customer_org_id:
+    account_id = request.GET.get("account_id")
+
+    if not customer_org_id or not account_id:
         return JsonResponse(
-            {"error": "'customer_org_id' query parameter is required."},
+            {
+                "error": "Both 'customer_org_id' and 'account_id' query parameters are required."
+            },
             status=400,
         )
-    
-    # Get date range (default to last 30 days)
-    days = int(request.GET.get("days", 30))
-    end_date = timezone.now()
-    start_date = end_date - timedelta(days=days)
-    
-    # Get events grouped by channel and status
+
     events_qs = ActivityEvent.objects.filter(
         customer_org_id=customer_org_id,
-        timestamp__gte=start_date,
-        timestamp__lte=end_date
-    ).values('channel', 'status').annotate(count=Count('id')).order_by('channel', 'status')
+        account_id=account_id,
+        activity_grouping_id=activity_grouping_id,
+    ).order_by("timestamp", "id")
+
+    page = int(request.GET.get("page", 1))
+    page_size = int(request.GET.get("page_size", 50))
+
+    # Archived members can only lie in the archived months the group spans
+    span = ActivityGroup.objects.filter(
+        customer_org_id=customer_org_id,
+        account_id=account_id,
+        activity_grouping_id=activity_grouping_id,
+    ).values_list("first_timestamp", "last_timestamp").first()
+    months = partitions.archived_months(*span) if span else []
+    if months:
+        archived = partitions.archived_table(
+            customer_org_id,
+            ("timestamp", "id"),
+            account_id=account_id,
+            filters=[("activity_grouping_id", "=", activity_grouping_id)],
+            months=months,
+        )
+        keys = sorted(zip(archived["timestamp"].to_pylist(), archived["id"].to_pylist()))
+        paginator = Paginator(_MergedRows(
+            events_qs.count() + len(keys),
+            lambda stop: keys[:stop],
+            lambda stop: events_qs.values_list("timestamp", "id")[:stop],
+            False,
+            lambda page_keys: _rows_for_keys(customer_org_id, page_keys),
+        ), page_size)
+        page_obj = paginator.get_page(page)
+        results = list(page_obj.object_list)
+    else:
+        paginator = Paginator(events_qs, page_size)
+        page_obj = paginator.get_page(page)
+        results = list(page_obj.object_list.values())
+
+    return JsonResponse({
+        "activity_grouping_id": activity_grouping_id,
+        "results": results,
+        "pagination": {
+            "total_count": paginator.count,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": paginator.num_pages,
+            "has_next": page_obj.has_next(),
+            "has_previous": page_obj.has_previous(),
+        },
+    })
+
+
+def _chart_events(customer_org_id, account_id, team_id, split_by):
+    """Chart rows, epoch-ms timestamps and ``split_by`` values of both tiers."""
+    # Build query
+    events_qs = ActivityEvent.objects.filter(customer_org_id=customer_org_id)
+    
+    # Optional account_id filter
+    if account_id:
+        events_qs = events_qs.filter(account_id=account_id)
+    
+    # Optional team_id filter (via the EventTeam index)
+    if team_id:
+        events_qs = _filter_team(events_qs, customer_org_id, team_id)
+    
+    # Get all events ordered by timestamp
+    events_qs = events_qs.order_by('timestamp')
+    
+    # Get all events with minimal fields for chart
+    fields = ['id', 'timestamp', 'activity', 'channel', 'status']
+    extra = [split_by] if split_by and split_by not in fields else []
+    events = list(events_qs.values(*fields, *extra))
+    
+    # Archived months are read from their Parquet files
+    archived = partitions.archived_table(
+        customer_org_id, [*fields, *extra], account_id=account_id, team_id=team_id
+    )
+    if archived is not None and archived.num_rows:
+        events = sorted(archived.to_pylist() + events, key=itemgetter('timestamp'))
+    
+    split_values = None
+    if split_by:
+        split_values = [event.pop(split_by) if extra else event[split_by] for event in events]
+    
+    stamps = np.fromiter(
+        (bucketing.epoch_ms(event['timestamp']) for event in events),
+        dtype=np.int64,
+        count=len(events),
+    )
+    return events, stamps, split_values
+
+
+@serves_snapshot("chart")
+@cached_response
+@coalesced
+def all_events_for_chart(request):
+    """Return all ActivityEvent records aggregated for chart visualization.
+    
+    Query parameters:
+    - customer_org_id (required)
+    - account_id (optional)
+    - team_id (optional)
+    - bucket (optional, default: 'day') - hour, day, week or month
+    - tz (optional, default: 'UTC') - IANA time zone the buckets follow
+    - split_by (optional) - direction, channel or status; adds per-value
+      ``series`` counts to every ``daily_counts`` row
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+    
+    if not customer_org_id:
+        return JsonResponse(
+            {"error": "'customer_org_id' query parameter is required."},
+            status=400,
+        )
+    try:
+        unit, tz, split_by = _bucket_params(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    
+    return JsonResponse(chart_payload(
+        customer_org_id,
+        request.GET.get("account_id"),
+        request.GET.get("team_id"),
+        unit,
+        tz,
+        split_by,
+    ))
+
+
+def chart_payload(customer_org_id, account_id=None, team_id=None, unit="day", tz="UTC",
+                  split_by=None):
+    """Body of ``all_events_for_chart`` for already validated parameters.
+
+    The defaults are those of a plain request, which ``api.snapshots`` renders
+    ahead of time.
+    """
+    # Account charts come from the in-process column store when it has room
+    columns = None if team_id else eventstore.columns_for(customer_org_id, account_id)
+    if columns is not None:
+        events = columns.rows()
+        stamps = columns.timestamps
+        split_values = columns.codes[split_by] if split_by else None
+        split_names = columns.labels(split_by) if split_by else None
+        date_range = columns.date_range()
+    else:
+        events, stamps, split_values = _chart_events(customer_org_id, account_id, team_id, split_by)
+        split_names = None
+        
+        # Get date range
+        if events:
+            date_range = {
+                "start": _iso_ms(events[0]["timestamp"]),
+                "end": _iso_ms(events[-1]["timestamp"]),
+            }
+        else:
+            date_range = {"start": None, "end": None}
     
-    breakdown_data = list(events_qs)
+    # Counts per bucket (per UTC day by default); rows keep the "date" key
+    daily_data = bucketing.rows(
+        bucketing.bucket_counts(stamps, unit, tz, split_values, series_names=split_names)
+    )
+    
+    return {
+        "events": events,
+        "daily_counts": daily_data,
+        "bucket": {"unit": unit, "timezone": tz, "split_by": split_by},
+        "total_count": len(events),
+        "date_range": date_range
+    }
+
+
+@cached_response
+def event_minimap(request):
+    """Return the whole event history as at most ``width`` minimap points.
+
+    The level (day, week or month) is the finest with at most a few buckets
+    per point; counts come from the ``EventRollup`` tables and are
+    downsampled with LTTB (see ``api.minimap``), so the payload is bounded by
+    ``width`` however long the history is.
+
+    Query parameters:
+    - customer_org_id (required)
+    - account_id (optional)
+    - width (optional, default: 400, max: 4000) - number of points to return
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+
+    if not customer_org_id:
+        return JsonResponse(
+            {"error": "'customer_org_id' query parameter is required."},
+            status=400,
+        )
+    try:
+        width = _minimap_width(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    account_id = request.GET.get("account_id") or None
+    span = minimap.history(customer_org_id, account_id)
+    if span is None:
+        return JsonResponse({
+            "level": None,
+            "width": width,
+            "source_points": 0,
+            "total_count": 0,
+            "range": {"start": None, "end": None},
+            "points": [],
+        })
+    return JsonResponse(
+        minimap.series(customer_org_id, *span, width, account_id=account_id, levels=minimap.LEVELS[1:])
+    )
+
+
+@cached_response
+def event_minimap_detail(request):
+    """Return minimap points for a zoomed range, down to hourly resolution.
+
+    Same response as ``event_minimap`` for ``[start, end]`` only. Short ranges
+    get hourly buckets, counted live across both storage tiers.
+
+    Query parameters:
+    - customer_org_id (required)
+    - start (required) - ISO date or datetime (UTC unless an offset is given)
+    - end (required) - ISO date (inclusive) or datetime
+    - account_id (optional)
+    - width (optional, default: 400, max: 4000) - number of points to return
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+    start = request.GET.get("start")
+    end = request.GET.get("end")
+
+    if not customer_org_id or not start or not end:
+        return JsonResponse(
+            {
+                "error": "'customer_org_id', 'start' and 'end' query parameters are required."
+            },
+            status=400,
+        )
+    try:
+        width = _minimap_width(request)
+        start = _parse_moment("start", start)
+        end = _parse_moment("end", end, end_of_day=True)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    if end < start:
+        return JsonResponse({"error": "'end' must not be before 'start'."}, status=400)
+
+    account_id = request.GET.get("account_id") or None
+    return JsonResponse(minimap.series(customer_org_id, start, end, width, account_id=account_id))
+
+
+@cached_response
+def first_touchpoints(request):
+    """Return the first event of every person on an account, oldest first.
+
+    Answered from the in-process column store (``api.eventstore``) when it
+    has room for the account, else from one ordered scan of its events in both
+    storage tiers.
+
+    Query parameters:
+    - customer_org_id (required)
+    - account_id (required)
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+    account_id = request.GET.get("account_id")
+
+    if not customer_org_id or not account_id:
+        return JsonResponse(
+            {
+                "error": "Both 'customer_org_id' and 'account_id' query parameters are required."
+            },
+            status=400,
+        )
+
+    columns = eventstore.columns_for(customer_org_id, account_id)
+    if columns is not None:
+        channels = columns.labels("channel")
+        touches = [
+            {
+                "person_id": person_id,
+                "event_id": int(columns.ids[i]),
+                "timestamp": columns.datetime_at(i),
+                "channel": channels[columns.codes["channel"][i]],
+            }
+            for person_id, i in columns.first_touchpoints()
+        ]
+    else:
+        first = {}
+        events = (
+            ActivityEvent.objects.filter(customer_org_id=customer_org_id, account_id=account_id)
+            .order_by("timestamp", "id")
+            .values_list("id", "timestamp", "channel", "people")
+            .iterator()
+        )
+        archived = partitions.archived_table(
+            customer_org_id, ("id", "timestamp", "channel", "people"), account_id=account_id
+        )
+        if archived is not None:
+            archived = archived.sort_by([("timestamp", "ascending"), ("id", "ascending")])
+            archived_events = zip(
+                archived["id"].to_pylist(),
+                archived["timestamp"].to_pylist(),
+                archived["channel"].to_pylist(),
+                (json.loads(text) if text else [] for text in archived["people"].to_pylist()),
+            )
+            # Late hot rows can fall inside archived months; interleave by time.
+            events = heapq.merge(archived_events, events, key=itemgetter(1, 0))
+        for event_id, timestamp, channel, people in events:
+            for person in people if isinstance(people, list) else []:
+                if isinstance(person, dict) and person.get("id") and person["id"] not in first:
+                    first[person["id"]] = {
+                        "person_id": person["id"],
+                        "event_id": event_id,
+                        "timestamp": timestamp,
+                        "channel": channel,
+                    }
+        touches = list(first.values())
+    touches.sort(key=lambda touch: (touch["timestamp"], touch["event_id"], touch["person_id"]))
+
+    return JsonResponse({
+        "customer_org_id": customer_org_id,
+        "account_id": account_id,
+        "count": len(touches),
+        "results": touches,
+    })
+
+
+def event_changes(request):
+    """Return events changed after a per-account watermark (delta sync).
+
+    Every insert, update and delete of an event bumps its account's change
+    sequence (see ``api.changes``). Clients keep the returned ``watermark`` and
+    send it back as ``since`` to receive only what changed in between: changed
+    rows in ``changes`` and deleted rows in ``tombstones``. Both lists are read
+    from ``(customer_org_id, account_id, change_seq)`` indexes.
+
+    Query parameters:
+    - customer_org_id (required)
+    - account_id (required)
+    - since (optional, default: 0) - watermark from a previous response
+    - limit (optional, default: 1000, max: 10000)
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+    account_id = request.GET.get("account_id")
+
+    if not customer_org_id or not account_id:
+        return JsonResponse(
+            {
+                "error": "Both 'customer_org_id' and 'account_id' query parameters are required."
+            },
+            status=400,
+        )
+
+    try:
+        since = int(request.GET.get("since", 0))
+        limit = int(request.GET.get("limit", CHANGES_DEFAULT_LIMIT))
+    except ValueError:
+        return JsonResponse(
+            {"error": "'since' and 'limit' must be integers."}, status=400
+        )
+    limit = max(1, min(limit, CHANGES_MAX_LIMIT))
+
+    account_filter = {
+        "customer_org_id": customer_org_id,
+        "account_id": account_id,
+        "change_seq__gt": since,
+    }
+    # Read one row past the limit from each table; the merged page is cut at
+    # ``limit`` sequence numbers so the watermark never skips a change.
+    rows = list(
+        ActivityEvent.objects.filter(**account_filter)
+        .order_by("change_seq")
+        .values()[: limit + 1]
+    )
+    tombstones = list(
+        ActivityEventTombstone.objects.filter(**account_filter)
+        .order_by("change_seq")
+        .values("event_id", "touchpoint_id", "change_seq")[: limit + 1]
+    )
+
+    seqs = sorted([r["change_seq"] for r in rows] + [t["change_seq"] for t in tombstones])
+    has_more = len(seqs) > limit
+    if has_more:
+        cutoff = seqs[limit - 1]
+        rows = [r for r in rows if r["change_seq"] <= cutoff]
+        tombstones = [t for t in tombstones if t["change_seq"] <= cutoff]
+        watermark = cutoff
+    elif seqs:
+        watermark = seqs[-1]
+    else:
+        # Nothing new; report the current head so idle clients stay put.
+        watermark = max(
+            since,
+            AccountChangeSequence.objects.filter(
+                customer_org_id=customer_org_id, account_id=account_id
+            ).values_list("last_seq", flat=True).first() or 0,
+        )
+
+    return JsonResponse({
+        "changes": rows,
+        "tombstones": [
+            {"id": t["event_id"], "touchpoint_id": t["touchpoint_id"], "change_seq": t["change_seq"]}
+            for t in tombstones
+        ],
+        "watermark": watermark,
+        "has_more": has_more,
+    })
+
+
+@serves_snapshot("people")
+@cached_response
+def all_persons(request):
+    """Return a keyset-paginated page of Person records for the given customer.
+
+    Results are ordered by ``(last_name, first_name, id)`` and every page is
+    answered from the ``person_org_*`` indexes, so the cost of a page does not
+    grow with the size of the organisation. ``count`` stays the number of
+    matching people (not the page length), counted over the same indexes.
+
+    Query parameters:
+    - customer_org_id (required)
+    - q (optional) - case-insensitive prefix matched against first name, last
+      name and email address. "erin po" matches first name "Erin*" and last
+      name "Po*".
+    - cursor (optional) - opaque ``next_cursor`` value from a previous page
+    - page_size (optional, default: 100, max: 1000)
+    - fields (optional) - comma-separated subset of Person fields to return
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+
+    if not customer_org_id:
+        return JsonResponse(
+            {"error": "'customer_org_id' query parameter is required."},
+            status=400,
+        )
+
+    try:
+        page_size = int(request.GET.get("page_size", PEOPLE_DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"error": "'page_size' must be an integer."}, status=400)
+    page_size = max(1, min(page_size, PEOPLE_MAX_PAGE_SIZE))
+
+    fields = PERSON_FIELDS
+    if request.GET.get("fields"):
+        fields = tuple(f.strip() for f in request.GET["fields"].split(",") if f.strip())
+        unknown = sorted(set(fields) - set(PERSON_FIELDS))
+        if unknown:
+            return JsonResponse(
+                {"error": f"Unknown field(s) in 'fields': {', '.join(unknown)}."},
+                status=400,
+            )
+
+    after = None
+    cursor = request.GET.get("cursor")
+    if cursor:
+        try:
+            after = tuple(_decode_cursor(cursor))
+            if len(after) != len(PERSON_CURSOR_FIELDS) or not all(
+                isinstance(value, str) for value in after
+            ):
+                raise ValueError("malformed cursor")
+        except ValueError:
+            return JsonResponse({"error": "Invalid 'cursor'."}, status=400)
+
+    return JsonResponse(people_payload(
+        customer_org_id, request.GET.get("q", "").strip(), after, page_size, fields
+    ))
+
+
+def people_payload(customer_org_id, q="", after=None, page_size=PEOPLE_DEFAULT_PAGE_SIZE,
+                   fields=PERSON_FIELDS):
+    """Body of ``all_persons`` for already validated parameters.
+
+    ``after`` is the decoded cursor, a ``(last_name, first_name, id)`` triple.
+    The defaults are those of a plain request, which ``api.snapshots`` renders
+    ahead of time.
+    """
+    persons_qs = Person.objects.filter(customer_org_id=customer_org_id)
+
+    if q:
+        persons_qs = persons_qs.alias(
+            first_name_lower=Lower("first_name"),
+            last_name_lower=Lower("last_name"),
+            email_address_lower=Lower("email_address"),
+        ).filter(_person_prefix_filter(q))
+
+    total_count = persons_qs.count()
+
+    if after:
+        last_name, first_name, person_id = after
+        persons_qs = persons_qs.filter(
+            Q(last_name__gt=last_name)
+            | Q(last_name=last_name, first_name__gt=first_name)
+            | Q(last_name=last_name, first_name=first_name, id__gt=person_id)
+        )
+
+    # Fetch one extra row to learn whether another page exists.
+    columns = list(dict.fromkeys(fields + PERSON_CURSOR_FIELDS))
+    rows = list(
+        persons_qs.order_by(*PERSON_CURSOR_FIELDS).values(*columns)[: page_size + 1]
+    )
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+
+    next_cursor = None
+    if has_next:
+        last = rows[-1]
+        next_cursor = _encode_cursor([last[f] for f in PERSON_CURSOR_FIELDS])
+
+    persons = [{f: row[f] for f in fields} for row in rows]
+
+    return {
+        "results": persons,
+        "count": total_count,
+        "page_size": page_size,
+        "has_next": has_next,
+        "next_cursor": next_cursor,
+    }
+
+
+@coalesced
+def channel_breakdown(request):
+    """Return detailed breakdown of events by channel."""
+    customer_org_id = request.GET.get("customer_org_id")
+    
+    if not customer_org_id:
+        return JsonResponse(
+            {"error": "'customer_org_id' query parameter is required."},
+            status=400,
+        )
+    
+    # Get date range (default to last 30 days)
+    days = int(request.GET.get("days", 30))
+    end_date = timezone.now()
+    start_date = end_date - timedelta(days=days)
+    
+    # Get events grouped by channel and status
+    breakdown_data = partitions.count_by(
+        customer_org_id, start_date, end_date, ("channel", "status")
+    )
     
     return JsonResponse({
         "breakdown": breakdown_data,
@@ -382,3 +1556,373 @@ def channel_breakdown(request):
             "days": days
         }
     })
+
+
+
+def team_breakdown(request):
+    """Return per-team event counts by day and channel.
+
+    Served from the ``EventTeam`` index rather than by scanning each event's
+    ``involved_team_ids``.
+
+    Query parameters:
+    - customer_org_id (required)
+    - account_id (optional)
+    - team_id (optional) - restrict to one team
+    - days (optional, default: 30)
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+    
+    if not customer_org_id:
+        return JsonResponse(
+            {"error": "'customer_org_id' query parameter is required."},
+            status=400,
+        )
+    
+    # Get date range (default to last 30 days)
+    days = int(request.GET.get("days", 30))
+    end_date = timezone.now()
+    start_date = end_date - timedelta(days=days)
+    
+    breakdown_data = partitions.count_by_team(
+        customer_org_id,
+        start_date,
+        end_date,
+        ("team_id", "day", "channel"),
+        account_id=request.GET.get("account_id"),
+        team_id=request.GET.get("team_id"),
+    )
+    
+    # Per-team totals over the whole window
+    team_totals = Counter()
+    for row in breakdown_data:
+        team_totals[row["team_id"]] += row["count"]
+    
+    return JsonResponse({
+        "breakdown": breakdown_data,
+        "teams": [
+            {"team_id": team_id, "count": count}
+            for team_id, count in sorted(team_totals.items())
+        ],
+        "date_range": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "days": days
+        }
+    })
+
+
+# -----------------------------------------------------------------------------
+# Opportunity Endpoints
+# -----------------------------------------------------------------------------
+
+def opportunity_events(request, opportunity_id):
+    """Return the touchpoints related to an opportunity, newest first.
+
+    Answered from the ``EventOpportunity`` reverse index, which covers both
+    storage tiers, and keyset-paginated on ``(timestamp, event id)``.
+
+    Query parameters:
+    - customer_org_id (required)
+    - cursor (optional) - ``next_cursor`` from a previous page
+    - page_size (optional, default: 50, max: 500)
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+
+    if not customer_org_id:
+        return JsonResponse(
+            {"error": "'customer_org_id' query parameter is required."},
+            status=400,
+        )
+
+    try:
+        page_size = int(request.GET.get("page_size", OPPORTUNITY_DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"error": "'page_size' must be an integer."}, status=400)
+    page_size = max(1, min(page_size, OPPORTUNITY_MAX_PAGE_SIZE))
+
+    links_qs = EventOpportunity.objects.filter(
+        customer_org_id=customer_org_id, opportunity_id=opportunity_id
+    )
+
+    cursor = request.GET.get("cursor")
+    if cursor:
+        try:
+            timestamp, event_id = _decode_cursor(cursor)
+            timestamp = datetime.fromisoformat(timestamp)
+            event_id = int(event_id)
+        except (TypeError, ValueError):
+            return JsonResponse({"error": "Invalid 'cursor'."}, status=400)
+        links_qs = links_qs.filter(
+            Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, event_id__lt=event_id)
+        )
+
+    links = list(
+        links_qs.order_by("-timestamp", "-event_id").values("timestamp", "event_id")[
+            : page_size + 1
+        ]
+    )
+    has_next = len(links) > page_size
+    links = links[:page_size]
+
+    # The index keeps the links of archived events, which are read back by id
+    events_by_id = _events_by_id(
+        customer_org_id,
+        [link["event_id"] for link in links],
+        {partitions.month_of(link["timestamp"]) for link in links},
+    )
+    events = [events_by_id[link["event_id"]] for link in links if link["event_id"] in events_by_id]
+
+    next_cursor = None
+    if has_next:
+        last = links[-1]
+        next_cursor = _encode_cursor([last["timestamp"].isoformat(), last["event_id"]])
+
+    return JsonResponse({
+        "opportunity_id": opportunity_id,
+        "results": events,
+        "count": len(events),
+        "has_next": has_next,
+        "next_cursor": next_cursor,
+    })
+
+
+def opportunity_summary(request, opportunity_id):
+    """Return first/last touch, touch count and channel mix for an opportunity.
+
+    Every figure comes from the ``EventOpportunity`` reverse index: first and
+    last touch are single index seeks, the channel mix a range scan.
+
+    Query parameters:
+    - customer_org_id (required)
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+
+    if not customer_org_id:
+        return JsonResponse(
+            {"error": "'customer_org_id' query parameter is required."},
+            status=400,
+        )
+
+    links_qs = EventOpportunity.objects.filter(
+        customer_org_id=customer_org_id, opportunity_id=opportunity_id
+    )
+    touch_fields = ("event_id", "timestamp", "channel")
+    first_touch = links_qs.order_by("timestamp", "event_id").values(*touch_fields).first()
+    last_touch = links_qs.order_by("-timestamp", "-event_id").values(*touch_fields).first()
+
+    if first_touch is None:
+        return JsonResponse(
+            {"error": f"No events found for opportunity '{opportunity_id}'."},
+            status=404,
+        )
+
+    channel_mix = list(
+        links_qs.order_by().values("channel").annotate(count=Count("id")).order_by("-count", "channel")
+    )
+
+    return JsonResponse({
+        "opportunity_id": opportunity_id,
+        "total_touches": sum(row["count"] for row in channel_mix),
+        "first_touch": first_touch,
+        "last_touch": last_touch,
+        "channel_mix": channel_mix,
+    })
+
+
+def export_events(request):
+    """Stream all matching ActivityEvent records as one CSV or Parquet file.
+
+    Rows are read with a database cursor (and from archived Parquet months)
+    and encoded as they go, so memory use does not grow with the export
+    (see ``api.export``). ``people`` is flattened to ``people_count``,
+    ``people_ids`` and ``people_roles``; list columns are ``;``-joined in CSV.
+
+    Query parameters:
+    - customer_org_id (required)
+    - account_id (optional)
+    - start (optional) - ISO date or datetime (UTC unless an offset is given)
+    - end (optional) - ISO date (inclusive) or datetime
+    - format (optional, default: 'csv') - csv or parquet
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+
+    if not customer_org_id:
+        return JsonResponse(
+            {"error": "'customer_org_id' query parameter is required."},
+            status=400,
+        )
+    try:
+        fmt, start, end = _export_params(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    account_id = request.GET.get("account_id") or None
+    rows = export.event_rows(customer_org_id, account_id, start, end)
+    filename = "-".join(filter(None, ("events", customer_org_id, account_id)))
+    return export.response(request, "events", rows, fmt, filename)
+
+
+def export_people(request):
+    """Stream all matching Person records as one CSV or Parquet file.
+
+    Query parameters:
+    - customer_org_id (required)
+    - q (optional) - same prefix search as ``/api/people/``
+    - account_id (optional) - only people on that account's events
+    - start, end (optional, with account_id) - only events in this range
+    - format (optional, default: 'csv') - csv or parquet
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+
+    if not customer_org_id:
+        return JsonResponse(
+            {"error": "'customer_org_id' query parameter is required."},
+            status=400,
+        )
+    try:
+        fmt, start, end = _export_params(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    persons_qs = Person.objects.filter(customer_org_id=customer_org_id)
+    q = request.GET.get("q", "").strip()
+    if q:
+        persons_qs = persons_qs.alias(
+            first_name_lower=Lower("first_name"),
+            last_name_lower=Lower("last_name"),
+            email_address_lower=Lower("email_address"),
+        ).filter(_person_prefix_filter(q))
+
+    account_id = request.GET.get("account_id") or None
+    rows = export.person_rows(persons_qs, customer_org_id, account_id, start, end)
+    filename = "-".join(filter(None, ("people", customer_org_id, account_id)))
+    return export.response(request, "people", rows, fmt, filename)
+
+
+def coalescing_metrics(request):
+    """Return request-coalescing counters summed over all server processes.
+
+    Per view: ``computed`` (requests that ran the view), ``coalesced_local``
+    and ``coalesced_remote`` (requests answered by an in-flight computation in
+    the same or another process) and ``lock_timeouts``.
+    """
+    return JsonResponse(singleflight.metrics())
+
+# -----------------------------------------------------------------------------
+# Live event stream (Server-Sent Events)
+# -----------------------------------------------------------------------------
+
+def _sse(data, event=None, event_id=None):
+    """Format one Server-Sent Events frame."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _latest_event_id(customer_org_id, account_id):
+    qs = ActivityEvent.objects.filter(customer_org_id=customer_org_id)
+    if account_id:
+        qs = qs.filter(account_id=account_id)
+    return qs.aggregate(latest=Max("id"))["latest"] or 0
+
+
+def _events_after(customer_org_id, account_id, cursor, limit):
+    """Return stream messages for the first ``limit`` events with ``id > cursor``.
+
+    Messages are grouped per account, so one may carry higher ids than the
+    next. Each message's ``cursor`` is where a client can safely resume after
+    it: just below the lowest id still to come, and the highest id read after
+    the last message.
+    """
+    qs = ActivityEvent.objects.filter(customer_org_id=customer_org_id, id__gt=cursor)
+    if account_id:
+        qs = qs.filter(account_id=account_id)
+    events = list(qs.order_by("id")[:limit])
+    messages = pubsub.build_messages(events)
+    resume = events[-1].pk if events else cursor
+    for message in reversed(messages):
+        message["cursor"] = resume
+        resume = min(resume, message["events"][0]["id"] - 1)
+    return messages
+
+
+async def event_stream(request):
+    """Push newly ingested ActivityEvent rows as Server-Sent Events.
+
+    Each ``activity`` frame carries the new events for one (org, account) and
+    their ``daily_count_deltas``; its SSE ``id`` is a cursor below which every
+    event has been delivered. Reconnecting with ``?since=<cursor>`` or the
+    browser's ``Last-Event-ID`` header replays everything missed.
+
+    Events are always read from the database in id order after the stream's
+    cursor; published messages only wake the stream up. SQLite serialises
+    writers, so ids are assigned in commit order and a batch committed (or
+    published) late is still read. Without a cursor the stream starts at the
+    current latest event.
+
+    Intended to be served by the ASGI application (``config.asgi``) so that an
+    idle connection is a parked coroutine rather than a blocked worker thread.
+
+    Query parameters:
+    - customer_org_id (required)
+    - account_id (optional)
+    - since (optional) - cursor to resume from
+    """
+    customer_org_id = request.GET.get("customer_org_id")
+
+    if not customer_org_id:
+        return JsonResponse(
+            {"error": "'customer_org_id' query parameter is required."},
+            status=400,
+        )
+
+    account_id = request.GET.get("account_id") or None
+    since = request.GET.get("since") or request.headers.get("Last-Event-ID")
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return JsonResponse({"error": "'since' must be an integer cursor."}, status=400)
+
+    async def stream():
+        # Subscribe before the first read so that nothing committed in between
+        # goes without a wake-up.
+        subscription = pubsub.hub.subscribe(customer_org_id, account_id)
+        try:
+            cursor = since
+            if cursor is None:
+                cursor = await sync_to_async(_latest_event_id)(customer_org_id, account_id)
+            yield f"retry: {EVENT_STREAM_RETRY_MS}\n\n"
+            yield _sse({"cursor": cursor}, event="ready", event_id=cursor)
+
+            while True:
+                while True:
+                    backlog = await sync_to_async(_events_after)(
+                        customer_org_id, account_id, cursor, EVENT_STREAM_REPLAY_BATCH
+                    )
+                    for message in backlog:
+                        cursor = message["cursor"]
+                        yield _sse(message, event="activity", event_id=cursor)
+                    if sum(len(m["events"]) for m in backlog) < EVENT_STREAM_REPLAY_BATCH:
+                        break
+
+                while True:
+                    try:
+                        await asyncio.wait_for(
+                            subscription.wait(), timeout=settings.EVENT_STREAM_HEARTBEAT_SECONDS
+                        )
+                        break
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,93 @@
+"""Boot-time cache warming for the most active organisations.
+
+``warm`` renders the chart and people responses the dashboard asks for first
+(``api.snapshots.render``) and stores them in the response cache in every
+supported encoding (``api.cache.prime``), so they are served already
+serialized and compressed. Responses a snapshot file answers are skipped. It
+also pays the one-off costs of the first request in a process: view imports,
+the first database connection and query planning. The busiest accounts'
+columns are loaded into the in-process event store (``api.eventstore``) too.
+
+The production entry point (``config/gunicorn.conf.py``) calls it in the master
+after the app is preloaded. With the per-process local-memory cache the warmed
+entries are then inherited by every forked worker; with a shared cache backend
+they are simply there already.
+"""
+
+import logging
+import time
+
+from django.db.models import Count
+
+from . import eventstore, snapshots
+from .cache import data_version, prime
+from .models import ActivityEvent
+
+logger = logging.getLogger(__name__)
+
+
+def most_active_orgs(limit):
+    """Return up to ``limit`` org ids ordered by event count, busiest first."""
+    return list(
+        ActivityEvent.objects.order_by()
+        .values("customer_org_id")
+        .annotate(events=Count("id"))
+        .order_by("-events", "customer_org_id")
+        .values_list("customer_org_id", flat=True)[:limit]
+    )
+
+
+def most_active_accounts(customer_org_id, limit):
+    return list(
+        ActivityEvent.objects.filter(customer_org_id=customer_org_id)
+        .order_by()
+        .values("account_id")
+        .annotate(events=Count("id"))
+        .order_by("-events", "account_id")
+        .values_list("account_id", flat=True)[:limit]
+    )
+
+
+# Snapshot kind -> name of the view whose cache entries it warms.
+VIEW_NAMES = {"chart": "all_events_for_chart", "people": "all_persons"}
+
+
+def requests_for(customer_org_id, accounts_per_org):
+    """Yield the ``(kind, account_id)`` pairs warmed for one organisation."""
+    yield "chart", None
+    for account_id in most_active_accounts(customer_org_id, accounts_per_org):
+        yield "chart", account_id
+    yield "people", None
+
+
+def warm(org_limit, accounts_per_org):
+    """Warm the response cache for the ``org_limit`` busiest organisations.
+
+    Returns the number of responses cached. Failures are logged and never
+    abort server start-up.
+    """
+    started = time.perf_counter()
+    cached = 0
+    try:
+        for customer_org_id in most_active_orgs(org_limit):
+            version = data_version(customer_org_id)
+            for kind, account_id in requests_for(customer_org_id, accounts_per_org):
+                if account_id is not None:
+                    eventstore.columns_for(customer_org_id, account_id)
+                # Requests a snapshot file answers are cheap already.
+                if snapshots.snapshot_path(customer_org_id, version, kind, account_id).exists():
+                    continue
+                params = {"customer_org_id": customer_org_id}
+                if account_id is not None:
+                    params["account_id"] = account_id
+                content = snapshots.render(customer_org_id, kind, account_id)
+                prime(VIEW_NAMES[kind], customer_org_id, version, params, content)
+                cached += 1
+    except Exception:
+        logger.exception("Cache warm-up stopped after %d responses", cached)
+    logger.info(
+        "Warmed %d cached responses in %.0f ms",
+        cached,
+        (time.perf_counter() - started) * 1000,
+    )
+    return cached
@@ -1,8 +1,17 @@
-"""ASGI config for config project."""
+"""ASGI config for config project.
+
+This is the entry point for ``/api/events/stream/``: under an ASGI server each
+open Server-Sent Events connection is a parked coroutine instead of a blocked
+worker thread, so idle subscribers are cheap. Run it with e.g.::
+
+    uvicorn config.asgi:application --host 0.0.0.0 --port 8000
+
+or, in production, with preforked workers via ``config/gunicorn.conf.py``.
+"""
 
 import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
-application = get_asgi_application() 
\ No newline at end of file
+application = get_asgi_application()
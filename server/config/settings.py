@@ -27,9 +27,18 @@ INSTALLED_APPS = [
     "api",  # the empty api app already present in the repo
 ]
 
+# API-only processes (DJANGO_API_ONLY=True, e.g. production workers) leave out
+# the apps only the admin site needs; they cost import and start-up time on
+# every worker but are never used by /api/. Run migrations without the flag.
+API_ONLY = os.getenv("DJANGO_API_ONLY", "False") == "True"
+API_ONLY_DEFERRED_APPS = ["django.contrib.admin", "django.contrib.messages"]
+if API_ONLY:
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_ONLY_DEFERRED_APPS]
+
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "api.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -37,6 +46,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+if API_ONLY:
+    MIDDLEWARE.remove("django.contrib.messages.middleware.MessageMiddleware")
 
 ROOT_URLCONF = "config.urls"
 
@@ -55,6 +66,10 @@ TEMPLATES = [
         },
     },
 ]
+if API_ONLY:
+    TEMPLATES[0]["OPTIONS"]["context_processors"].remove(
+        "django.contrib.messages.context_processors.messages"
+    )
 
 WSGI_APPLICATION = "config.wsgi.application"
 
@@ -67,6 +82,15 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/stable/topics/cache/
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/stable/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -119,4 +143,45 @@ REST_FRAMEWORK = {
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
     ],
-} 
+}
+
+# Live event stream (/api/events/stream/)
+# Ingest commands append to this spool file and every server process tails it;
+# see api/pubsub.py.
+EVENT_STREAM_SPOOL_PATH = Path(
+    os.getenv("EVENT_STREAM_SPOOL_PATH", BASE_DIR / "var" / "event_stream.jsonl")
+)
+EVENT_STREAM_SPOOL_MAX_BYTES = 16 * 1024 * 1024
+EVENT_STREAM_SPOOL_POLL_SECONDS = 0.5
+EVENT_STREAM_QUEUE_SIZE = 256
+EVENT_STREAM_HEARTBEAT_SECONDS = 15
+
+# API response caching and compression (api/cache.py, api/compression.py)
+API_RESPONSE_CACHE_ALIAS = "default"
+# Entries are keyed by data version, so the timeout only bounds memory churn.
+API_RESPONSE_CACHE_TIMEOUT = 60 * 60
+# Responses smaller than this are sent uncompressed.
+API_COMPRESSION_MIN_BYTES = 1024
+API_COMPRESSION_GZIP_LEVEL = 6
+API_COMPRESSION_BROTLI_QUALITY = 5
+
+# Pre-rendered chart/people responses written after each ingest (api/snapshots.py)
+API_SNAPSHOT_DIR = Path(os.getenv("API_SNAPSHOT_DIR", BASE_DIR / "var" / "snapshots"))
+
+# Single-flight coalescing of identical concurrent requests (api/singleflight.py).
+# Lock and result files are shared by every worker process on the host.
+SINGLE_FLIGHT_DIR = Path(os.getenv("SINGLE_FLIGHT_DIR", BASE_DIR / "var" / "singleflight"))
+# Longest a request waits on another's computation before it is served the
+# last stored response or a 503.
+SINGLE_FLIGHT_TIMEOUT = 10
+
+# Cold tier for archived event partitions (api/archive.py, archive_events)
+EVENT_ARCHIVE_DIR = Path(os.getenv("EVENT_ARCHIVE_DIR", BASE_DIR / "var" / "archive"))
+
+# In-process columnar copies of hot accounts' events (api/eventstore.py),
+# per server process; 0 disables the store.
+EVENT_STORE_MAX_BYTES = int(os.getenv("EVENT_STORE_MAX_MB", "256")) * 1024 * 1024
+
+# Boot-time cache warming (api/warmup.py, config/gunicorn.conf.py)
+WARMUP_ORGS = int(os.getenv("WARMUP_ORGS", "5"))
+WARMUP_ACCOUNTS_PER_ORG = int(os.getenv("WARMUP_ACCOUNTS_PER_ORG", "3"))